@@ -7,9 +7,13 @@ Provides commands to analyze token usage across runs and measure optimization im
 import argparse
 import json
 import sys
+from datetime import date
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from run_archive import readable_run_dir
+from run_catalog import RunCatalog
+from token_ledger import GROUP_BY_FIELDS, ledger_path, spend
 from token_tracker import TokenTracker, analyze_token_savings
 
 
@@ -23,25 +27,19 @@ def get_output_root() -> Path:
 def find_runs(phase: Optional[str] = None, limit: int = 10) -> List[Path]:
     """Find recent runs, optionally filtered by phase."""
     output_root = get_output_root()
+    if not output_root.exists():
+        return []
     
-    if phase:
-        phase_dir = output_root / phase
-        if not phase_dir.exists():
-            return []
-        runs = sorted(phase_dir.glob("run_*"), key=lambda p: p.stat().st_mtime, reverse=True)
-    else:
-        runs = []
-        for phase_dir in output_root.iterdir():
-            if phase_dir.is_dir() and not phase_dir.name.startswith('.'):
-                runs.extend(phase_dir.glob("run_*"))
-        runs = sorted(runs, key=lambda p: p.stat().st_mtime, reverse=True)
-    
-    return runs[:limit]
+    with RunCatalog(output_root) as catalog:
+        entries = catalog.list_runs(phase, newest_first=True, limit=limit)
+    return [readable_run_dir(entry.run_dir) for entry in entries]
 
 
 def cmd_summary(args):
     """Show token summary for a specific run."""
-    run_dir = Path(args.run_dir)
+    requested_dir = Path(args.run_dir)
+    run_dir = readable_run_dir(requested_dir)
+    archived = run_dir != requested_dir
     
     if not run_dir.exists():
         print(f"Error: Run directory not found: {run_dir}")
@@ -67,7 +65,9 @@ def cmd_summary(args):
     
     tracker.print_summary(stats)
     
-    if args.save:
+    if args.save and archived:
+        print(f"\n⚠️  {meta['run_id']} is archived; summary not saved.")
+    elif args.save:
         tracker.save_summary(stats)
         print(f"\n✅ Summary saved to: {tracker.summary_file}")
     
@@ -76,8 +76,8 @@ def cmd_summary(args):
 
 def cmd_compare(args):
     """Compare token usage between two runs."""
-    baseline_dir = Path(args.baseline)
-    optimized_dir = Path(args.optimized)
+    baseline_dir = readable_run_dir(Path(args.baseline))
+    optimized_dir = readable_run_dir(Path(args.optimized))
     
     if not baseline_dir.exists():
         print(f"Error: Baseline run not found: {baseline_dir}")
@@ -174,6 +174,85 @@ def cmd_report(args):
     return 0
 
 
+def cmd_spend(args):
+    """Show token spend across all runs from the token ledger's daily rollups."""
+    output_root = get_output_root()
+    if not ledger_path(output_root).exists():
+        print(f"No token ledger found in {output_root}")
+        return 1
+    if args.since and args.until and args.until < args.since:
+        print("Error: --until is before --since")
+        return 1
+    
+    rows = spend(output_root, since=args.since, until=args.until, group_by=args.group_by)
+    
+    print("\n" + "=" * 80)
+    print(f"Token Spend — {args.since or 'first record'} to {args.until or 'latest'}")
+    print("=" * 80)
+    if not rows:
+        print("\nNo token usage recorded in this period.")
+        print("=" * 80)
+        return 0
+    
+    widths = [
+        max([len(name)] + [len(value or "(none)") for value in (row.group[i] for row in rows)])
+        for i, name in enumerate(args.group_by)
+    ]
+    group_header = " ".join(f"{name.title():<{width}}" for name, width in zip(args.group_by, widths))
+    print(f"\n{group_header} {'Ops':>10} {'Tokens':>14} {'Cost':>12}")
+    print("-" * 80)
+    for row in rows:
+        group = " ".join(f"{value or '(none)':<{width}}" for value, width in zip(row.group, widths))
+        print(f"{group} {row.operations:>10,} {row.total_tokens:>14,} ${row.cost_usd:>11.4f}")
+    print("-" * 80)
+    total_label = f"{'TOTAL':<{len(group_header)}}"
+    print(f"{total_label} {sum(r.operations for r in rows):>10,} "
+          f"{sum(r.total_tokens for r in rows):>14,} ${sum(r.cost_usd for r in rows):>11.4f}")
+    print("=" * 80)
+    
+    return 0
+
+
+def _day(value: str) -> str:
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a YYYY-MM-DD date, got {value!r}")
+
+
+def _group_by(value: str) -> List[str]:
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in GROUP_BY_FIELDS]
+    if unknown or not fields:
+        raise argparse.ArgumentTypeError(
+            f"expected a comma-separated list of {', '.join(GROUP_BY_FIELDS)}, got {value!r}"
+        )
+    return fields
+
+
+def cmd_convert(args):
+    """Convert a run's token log from JSONL to the binary format."""
+    run_dir = Path(args.run_dir)
+    if not run_dir.is_dir():
+        print(f"Error: Run directory not found: {run_dir} (archived runs must be unpacked first)")
+        return 1
+    
+    tracker = TokenTracker(run_dir)
+    if tracker.uses_binary_log:
+        print(f"{tracker.binary_log.path} already exists; nothing to convert.")
+        return 0
+    if not tracker.tokens_file.exists():
+        print(f"Error: No token log found in {run_dir}")
+        return 1
+    
+    jsonl_size = tracker.tokens_file.stat().st_size
+    count = tracker.convert_to_binary(keep_jsonl=args.keep_jsonl)
+    binary_size = tracker.binary_log.path.stat().st_size + tracker.binary_log.strings_path.stat().st_size
+    print(f"✅ Converted {count:,} records: {jsonl_size:,} → {binary_size:,} bytes")
+    print(f"   {tracker.binary_log.path}")
+    return 0
+
+
 def cmd_estimate(args):
     """Estimate token usage for a planned run."""
     print("\n" + "=" * 60)
@@ -227,7 +306,7 @@ def main():
     
     # Summary command
     summary_parser = subparsers.add_parser('summary', help='Show token summary for a run')
-    summary_parser.add_argument('run_dir', help='Path to run directory')
+    summary_parser.add_argument('run_dir', help='Path to run directory (or its archive)')
     summary_parser.add_argument('--save', action='store_true', help='Save summary to file')
     
     # Compare command
@@ -240,6 +319,18 @@ def main():
     report_parser.add_argument('--phase', help='Filter by phase')
     report_parser.add_argument('--limit', type=int, default=10, help='Number of runs to show')
     
+    # Spend command
+    spend_parser = subparsers.add_parser('spend', help='Token spend across all runs, from daily rollups')
+    spend_parser.add_argument('--since', type=_day, help='First UTC day to include (YYYY-MM-DD)')
+    spend_parser.add_argument('--until', type=_day, help='Last UTC day to include (YYYY-MM-DD)')
+    spend_parser.add_argument('--group-by', type=_group_by, default=['phase'],
+                              help=f"Comma-separated grouping: {', '.join(GROUP_BY_FIELDS)} (default: phase)")
+    
+    # Convert command
+    convert_parser = subparsers.add_parser('convert', help='Convert a run\'s token log to the binary format')
+    convert_parser.add_argument('run_dir', help='Path to run directory')
+    convert_parser.add_argument('--keep-jsonl', action='store_true', help='Keep tokens.jsonl (no longer updated)')
+    
     # Estimate command
     estimate_parser = subparsers.add_parser('estimate', help='Estimate token usage')
     estimate_parser.add_argument('--iterations', type=int, required=True, help='Number of iterations')
@@ -259,6 +350,10 @@ def main():
         return cmd_compare(args)
     elif args.command == 'report':
         return cmd_report(args)
+    elif args.command == 'spend':
+        return cmd_spend(args)
+    elif args.command == 'convert':
+        return cmd_convert(args)
     elif args.command == 'estimate':
         return cmd_estimate(args)
     
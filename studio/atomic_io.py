@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Process-safe file helpers for Studio output files.
+
+Several Cascade sessions can run `prepare`/`finalize` against the same
+output root at once. Whole-file writes go through a temp file and an atomic
+rename so readers never see a half-written file, and read-modify-write
+updates (index shards, the run log) hold an advisory `fcntl` lock.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Union
+
+try:  # pragma: no cover - fcntl is unavailable on Windows
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+_TMP_COUNTER = itertools.count()
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Replace `path` with `text` via a temp file in the same directory and `os.replace`."""
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unlike mkstemp, os.open honours the umask so the result keeps normal permissions.
+    tmp_name = path.with_name(f".{path.name}.{os.getpid()}.{next(_TMP_COUNTER)}.tmp")
+    fd = os.open(tmp_name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _lock(handle: Union[IO, int], *, blocking: bool = True) -> bool:
+    if fcntl is None:
+        return True
+    flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+    try:
+        fcntl.flock(handle, flags)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _unlock(handle: Union[IO, int]) -> None:
+    if fcntl is not None:
+        fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(lock_path: Path, *, blocking: bool = True) -> Iterator[bool]:
+    """Hold an exclusive advisory lock on `lock_path` (created if missing).
+
+    `flock` locks belong to the open file, so threads in one process exclude
+    each other as well as separate processes. On platforms without `fcntl`
+    this is a no-op. With `blocking=False` the lock is only tried once; the
+    context yields whether it was acquired.
+    """
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as handle:
+        if not _lock(handle, blocking=blocking):
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            _unlock(handle)
+
+
+def locked_append_text(path: Path, text: str, *, header: str = "") -> None:
+    """Append `text` to `path` under an exclusive lock, writing `header` first if the file is empty.
+
+    The entry goes out in a single write on an O_APPEND handle, so concurrent
+    appenders never interleave.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as handle:
+        _lock(handle)
+        try:
+            if header and os.fstat(handle.fileno()).st_size == 0:
+                text = header + text
+            handle.write(text)
+            handle.flush()
+        finally:
+            _unlock(handle)
+
+
+def open_append(path: Path) -> int:
+    """Open `path` for appending (created if missing) and return the raw O_APPEND descriptor."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+
+
+def locked_append_fd(fd: int, data: bytes, *, header: bytes = b"") -> int:
+    """Append `data` to the O_APPEND descriptor `fd` under an exclusive lock; return the bytes written.
+
+    `header` goes first if the file is empty. Everything is written in one
+    `os.write` (looping only on a short write, still under the lock), so
+    concurrent appenders never interleave.
+    """
+    _lock(fd)
+    try:
+        if header and os.fstat(fd).st_size == 0:
+            data = header + data
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        _unlock(fd)
+    return len(data)
+
+
+__all__ = [
+    "atomic_write_bytes",
+    "atomic_write_text",
+    "file_lock",
+    "locked_append_fd",
+    "locked_append_text",
+    "open_append",
+]
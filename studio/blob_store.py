@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Opt-in content-addressed store for repeated run artifacts.
+
+Runs repeat a lot of markdown: `instructions.md` boilerplate, role prompt
+excerpts and near-identical drafts across reruns. With `dedupe_artifacts`
+enabled, finalize moves each markdown artifact into
+`output/.blobs/<sha256[:2]>/<sha256>` and leaves a hardlink in the run
+directory, so identical files share one inode and one copy of their bytes.
+
+Blobs are read-only, and therefore so are the deduplicated files that link
+to them: writing through one link would change the file in every run that
+shares it. A run that needs editing again gets private, writable copies from
+`detach_run` first. A blob's link count is its refcount: once no run links
+to it, `collect_garbage` removes it.
+"""
+from __future__ import annotations
+
+import os
+import stat
+from dataclasses import dataclass
+from pathlib import Path
+from typing import FrozenSet, Iterator, Tuple
+
+BLOB_DIRNAME = ".blobs"
+# Only artifacts that are finished once a run is finalized; run.json and the
+# token logs keep being rewritten or appended to.
+DEDUPE_SUFFIXES = (".md",)
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass
+class DedupeResult:
+    files: int = 0
+    linked: int = 0
+    saved_bytes: int = 0
+
+    def add(self, other: "DedupeResult") -> None:
+        self.files += other.files
+        self.linked += other.linked
+        self.saved_bytes += other.saved_bytes
+
+
+def blob_root(output_root: Path) -> Path:
+    return Path(output_root) / BLOB_DIRNAME
+
+
+def blob_path(output_root: Path, digest: str) -> Path:
+    return blob_root(output_root) / digest[:2] / digest
+
+
+def file_digest(path: Path) -> str:
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dedupe_run(run_dir: Path, output_root: Path) -> DedupeResult:
+    """Replace `run_dir`'s markdown artifacts with hardlinks into the blob store.
+
+    The first copy of some content becomes the blob; later copies are swapped
+    for a link to it with an atomic rename. Files that cannot be linked (for
+    example when the store is on another filesystem) are left as they are.
+    """
+    result = DedupeResult()
+    for path in _artifact_files(Path(run_dir)):
+        result.files += 1
+        try:
+            result.saved_bytes += _link_into_store(path, output_root)
+        except OSError:
+            continue
+        result.linked += 1
+    return result
+
+
+def detach_run(run_dir: Path, output_root: Path) -> int:
+    """Give `run_dir` private, writable copies of its deduplicated artifacts; return how many.
+
+    Each copy replaces its link with an atomic rename, so the blob and the
+    other runs linking to it are left untouched.
+    """
+    blobs = blob_inodes(output_root)
+    detached = 0
+    for path in _artifact_files(Path(run_dir)):
+        file_stat = path.stat()
+        if (file_stat.st_dev, file_stat.st_ino) in blobs:
+            _replace_with_copy(path, stat.S_IMODE(file_stat.st_mode) | stat.S_IWUSR)
+            detached += 1
+    return detached
+
+
+def collect_garbage(output_root: Path) -> Tuple[int, int]:
+    """Remove blobs no run links to any more; return (blobs removed, bytes freed)."""
+    removed = freed = 0
+    for blob in _iter_blobs(output_root):
+        try:
+            st = blob.stat()
+            if st.st_nlink > 1:
+                continue
+            blob.unlink()
+        except OSError:
+            continue
+        removed += 1
+        freed += st.st_size
+    return removed, freed
+
+
+def blob_inodes(output_root: Path) -> FrozenSet[Tuple[int, int]]:
+    """The (st_dev, st_ino) of every blob, to tell deduplicated files from other hardlinks."""
+    inodes = set()
+    for blob in _iter_blobs(output_root):
+        try:
+            st = blob.stat()
+        except OSError:
+            continue
+        inodes.add((st.st_dev, st.st_ino))
+    return frozenset(inodes)
+
+
+def _artifact_files(run_dir: Path) -> Iterator[Path]:
+    for dirpath, _, filenames in os.walk(run_dir):
+        for name in filenames:
+            if name.endswith(DEDUPE_SUFFIXES) and not name.startswith("."):
+                path = Path(dirpath) / name
+                if path.is_file() and not path.is_symlink():
+                    yield path
+
+
+def _iter_blobs(output_root: Path) -> Iterator[Path]:
+    root = blob_root(output_root)
+    if not root.is_dir():
+        return
+    for shard in root.iterdir():
+        if shard.is_dir():
+            yield from (blob for blob in shard.iterdir() if not blob.name.startswith("."))
+
+
+def _replace_with_copy(path: Path, mode: int) -> None:
+    import shutil
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.copy")
+    try:
+        shutil.copyfile(path, tmp_path)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _link_into_store(path: Path, output_root: Path) -> int:
+    """Link `path` to its blob and return the bytes this saved (0 if it became the blob)."""
+    file_stat = path.stat()
+    blob = blob_path(output_root, file_digest(path))
+    try:
+        blob_stat = blob.stat()
+    except FileNotFoundError:
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(path, blob)
+        except FileExistsError:
+            # Another process stored the same content first; link to its blob instead.
+            return _link_into_store(path, output_root)
+        os.chmod(blob, stat.S_IMODE(file_stat.st_mode) & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+        return 0
+    if (blob_stat.st_dev, blob_stat.st_ino) == (file_stat.st_dev, file_stat.st_ino):
+        return 0
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.link")
+    os.link(blob, tmp_path)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+    return file_stat.st_size
+
+
+__all__ = [
+    "BLOB_DIRNAME",
+    "DEDUPE_SUFFIXES",
+    "DedupeResult",
+    "blob_inodes",
+    "blob_path",
+    "blob_root",
+    "collect_garbage",
+    "dedupe_run",
+    "detach_run",
+    "file_digest",
+]
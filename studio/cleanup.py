@@ -1,31 +1,91 @@
 from __future__ import annotations
 
+import heapq
 import json
+import os
 import shutil
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from atomic_io import atomic_write_text
+from config_cache import load_cached
+from blob_store import blob_inodes, blob_root
+from run_archive import ARCHIVE_FORMATS, DEFAULT_ARCHIVE_FORMAT, ArchiveError, archive_path, archive_run
+from run_catalog import CatalogEntry, RunCatalog, flush_run_writes, run_dir_mtime_ns
+from run_trash import move_to_trash, reap_trash
 
 CONFIG_RELATIVE_PATH = Path("config") / "studio_settings.toml"
 DEFAULT_TTL_DAYS = 30
 DEFAULT_SIZE_LIMIT_MB = 900
+DEFAULT_SIZE_WORKERS = 8
+DEFAULT_ARCHIVE_AFTER_DAYS = 0
+DEFAULT_PREPARE_TIME_BUDGET_MS = 250
+CLEANUP_STATE_FILENAME = ".cleanup_state.json"
+CLEANUP_LOCK_FILENAME = ".cleanup.lock"
+# "fifo" ages runs from creation; "lru" from their last access (finalize,
+# validate, rerun reads), falling back to creation for runs never accessed.
+EVICTION_POLICIES = ("fifo", "lru")
+DEFAULT_EVICTION_POLICY = "fifo"
+PHASE_QUOTA_SECTION_PREFIX = "cleanup.phases."
+
+
+@dataclass(frozen=True)
+class PhaseQuota:
+    """Per-phase limits, applied before the global size budget (0 = no limit)."""
+
+    size_limit_mb: int = 0
+    max_runs: int = 0
+
+    @property
+    def size_limit_bytes(self) -> int:
+        return max(0, self.size_limit_mb) * 1024 * 1024
 
 
 @dataclass(frozen=True)
 class CleanupSettings:
     ttl_days: int = DEFAULT_TTL_DAYS
     size_limit_mb: int = DEFAULT_SIZE_LIMIT_MB
+    size_workers: int = DEFAULT_SIZE_WORKERS
+    # 0 disables the archive tier: runs stay live until ttl or budget removes them.
+    archive_after_days: int = DEFAULT_ARCHIVE_AFTER_DAYS
+    archive_format: str = DEFAULT_ARCHIVE_FORMAT
+    # Hardlink finalized markdown artifacts into the output root's blob store.
+    dedupe_artifacts: bool = False
+    # Wall-clock budget for the cleanup pass `prepare` runs before creating a
+    # run (0 = finish every pass). Work left over is picked up by the next pass.
+    prepare_time_budget_ms: int = DEFAULT_PREPARE_TIME_BUDGET_MS
+    # Hand work left over by a time-boxed pass to a detached `cleanup` process.
+    background_cleanup: bool = False
+    eviction_policy: str = DEFAULT_EVICTION_POLICY
+    phase_quotas: Dict[str, PhaseQuota] = field(default_factory=dict)
 
     @property
     def ttl_delta(self) -> timedelta:
         days = max(0, self.ttl_days)
         return timedelta(days=days)
 
+    @property
+    def archive_delta(self) -> timedelta:
+        return timedelta(days=max(0, self.archive_after_days))
+
     @property
     def size_limit_bytes(self) -> int:
         return max(0, self.size_limit_mb) * 1024 * 1024
 
+    @property
+    def prepare_time_budget(self) -> Optional[float]:
+        """Seconds `prepare` may spend on cleanup, or None for no limit."""
+        if self.prepare_time_budget_ms <= 0:
+            return None
+        return self.prepare_time_budget_ms / 1000
+
+    @property
+    def uses_last_access(self) -> bool:
+        return self.eviction_policy == "lru"
+
 
 @dataclass(frozen=True)
 class RunRecord:
@@ -34,16 +94,202 @@ class RunRecord:
     path: Path
     created_at: datetime
     size_bytes: int
+    meta: Optional[Dict] = field(default=None, compare=False, repr=False)
+    # `path` is the archive file once a run has been archived.
+    archived: bool = False
+    # Last finalize, validate or rerun read recorded in the catalog.
+    last_access: Optional[datetime] = field(default=None, compare=False)
+    # Pinned runs (`"pinned": true` in run.json) are never archived or evicted.
+    pinned: bool = field(default=False, compare=False)
 
     @property
     def identifier(self) -> str:
         return f"{self.phase}/{self.run_id}"
 
+    @property
+    def finalized(self) -> bool:
+        return self.meta is not None and (self.meta.get("status") or "PENDING") != "PENDING"
+
+    @property
+    def last_used(self) -> datetime:
+        return self.last_access if self.last_access is not None else self.created_at
+
+
+class RunSnapshot:
+    """Catalog entries and on-disk sizes for one output root.
+
+    Built once per process by `scan_runs` and shared by cleanup, storage stats
+    and index rebuilds. Sizes come from the catalog's size ledger; a run is only
+    re-measured when its `run_dir_mtime_ns` no longer matches the ledger entry.
+    """
+
+    def __init__(
+        self,
+        output_root: Path,
+        entries: List[CatalogEntry],
+        size_workers: int = DEFAULT_SIZE_WORKERS,
+    ):
+        self.output_root = output_root
+        self.entries = entries
+        self.size_workers = size_workers
+        # Stale runs the last `records_within` call left unmeasured.
+        self.unsized = 0
+        self._records: Optional[List[RunRecord]] = None
+
+    @property
+    def records(self) -> List[RunRecord]:
+        return self.records_within(None)
+
+    def records_within(self, deadline: Optional[float]) -> List[RunRecord]:
+        """Like `records`, but stop measuring stale runs once `deadline` (a `time.monotonic()` value) passes.
+
+        Runs left unmeasured carry their last recorded size (0 if they were
+        never measured) and are counted in `unsized`. Only a complete result
+        is kept for later calls; measured sizes are kept either way.
+        """
+        if self._records is None:
+            records = self._build_records(deadline)
+            if self.unsized:
+                return records
+            self._records = records
+        return self._records
+
+    def _build_records(self, deadline: Optional[float] = None) -> List[RunRecord]:
+        # (entry, mtime_ns, archive size) for every run still on disk.
+        current: List[Tuple[CatalogEntry, int, int]] = []
+        for entry in self.entries:
+            try:
+                if entry.archive is not None:
+                    st = entry.archive.stat()
+                    current.append((entry, st.st_mtime_ns, st.st_size))
+                else:
+                    current.append((entry, run_dir_mtime_ns(entry.run_dir), 0))
+            except OSError:
+                continue
+
+        stale = [item for item in current if item[0].ledger_size(item[1]) is None]
+        stale_dirs = [entry for entry, _, _ in stale if entry.archive is None]
+        measured = dict(
+            zip(
+                ((entry.phase, entry.run_id) for entry in stale_dirs),
+                _directory_sizes(
+                    [entry.run_dir for entry in stale_dirs],
+                    self.size_workers,
+                    blob_inodes(self.output_root) if stale_dirs else frozenset(),
+                    deadline,
+                ),
+            )
+        )
+        self.unsized = len(stale_dirs) - len(measured)
+        # An archive's size is the compressed size of its single file.
+        measured.update(
+            ((entry.phase, entry.run_id), size) for entry, _, size in stale if entry.archive is not None
+        )
+        if measured:
+            fresh = [
+                (entry, measured[(entry.phase, entry.run_id)], mtime_ns)
+                for entry, mtime_ns, _ in stale
+                if (entry.phase, entry.run_id) in measured
+            ]
+            with RunCatalog(self.output_root) as catalog:
+                catalog.record_sizes(
+                    [(entry.phase, entry.run_id, size, mtime_ns) for entry, size, mtime_ns in fresh]
+                )
+            # Keep the new ledger values so a later build skips these runs.
+            updated = {
+                (entry.phase, entry.run_id): replace(entry, size_bytes=size, size_mtime_ns=mtime_ns)
+                for entry, size, mtime_ns in fresh
+            }
+            self.entries = [updated.get((entry.phase, entry.run_id), entry) for entry in self.entries]
+
+        records: List[RunRecord] = []
+        for entry, mtime_ns, _ in current:
+            size_bytes = entry.ledger_size(mtime_ns)
+            if size_bytes is None:
+                size_bytes = measured.get((entry.phase, entry.run_id), entry.size_bytes or 0)
+            records.append(
+                RunRecord(
+                    phase=entry.phase,
+                    run_id=entry.run_id,
+                    path=entry.location,
+                    created_at=entry.created_at,
+                    size_bytes=size_bytes,
+                    meta=entry.meta,
+                    archived=entry.archive is not None,
+                    last_access=entry.accessed_at,
+                    pinned=bool((entry.meta or {}).get("pinned")),
+                )
+            )
+        return records
+
+    @property
+    def total_size_bytes(self) -> int:
+        return sum(record.size_bytes for record in self.records)
+
+    def discard(self, keys: Iterable[Tuple[str, str]]) -> None:
+        dropped = set(keys)
+        if not dropped:
+            return
+        self.entries = [e for e in self.entries if (e.phase, e.run_id) not in dropped]
+        if self._records is not None:
+            self._records = [r for r in self._records if (r.phase, r.run_id) not in dropped]
+
+
+_SNAPSHOTS: Dict[Path, RunSnapshot] = {}
+
+
+def scan_runs(output_root: Path, *, size_workers: Optional[int] = None) -> RunSnapshot:
+    """Return this process's snapshot of `output_root`, listing it from the catalog on first use."""
+    output_root = Path(output_root)
+    snapshot = _SNAPSHOTS.get(output_root)
+    if snapshot is None:
+        entries: List[CatalogEntry] = []
+        if output_root.exists():
+            # Writes this process has noted would otherwise look like changes to re-measure.
+            flush_run_writes()
+            with RunCatalog(output_root) as catalog:
+                entries = catalog.list_runs()
+        snapshot = _SNAPSHOTS[output_root] = RunSnapshot(output_root, entries)
+    if size_workers is not None:
+        snapshot.size_workers = size_workers
+    return snapshot
+
+
+def refresh_run_size(
+    output_root: Path, phase: str, run_id: str, *, accessed_iso: Optional[str] = None
+) -> int:
+    """Measure one run directory and store the result in the catalog's size ledger.
+
+    With `accessed_iso`, the run's last-access time is stamped in the same write.
+    """
+    run_dir = Path(output_root) / phase / run_id
+    # Stat before measuring so a concurrent write leaves the entry stale, not wrong.
+    mtime_ns = run_dir_mtime_ns(run_dir)
+    size_bytes = _directory_size(run_dir, blob_inodes(output_root))
+    with RunCatalog(output_root) as catalog:
+        catalog.record_sizes([(phase, run_id, size_bytes, mtime_ns)], accessed_iso=accessed_iso)
+    return size_bytes
+
+
+def invalidate_snapshot(output_root: Optional[Path] = None) -> None:
+    """Forget the cached snapshot for `output_root` (or every root) after runs change on disk."""
+    if output_root is None:
+        _SNAPSHOTS.clear()
+    else:
+        _SNAPSHOTS.pop(Path(output_root), None)
+
 
 @dataclass(frozen=True)
 class DeletionRecord:
     run: RunRecord
-    reason: str  # "ttl" or "budget"
+    reason: str  # "ttl", "quota" or "budget"
+
+
+@dataclass(frozen=True)
+class ArchiveRecord:
+    run: RunRecord  # the live run as it was before archiving
+    archive: Path
+    compressed_bytes: Optional[int] = None  # None for dry runs
 
 
 @dataclass
@@ -54,11 +300,48 @@ class CleanupReport:
     deletions: List[DeletionRecord]
     dry_run: bool
     errors: List[str]
+    archivals: List[ArchiveRecord] = field(default_factory=list)
+    blobs_removed: int = 0
+    blob_bytes_freed: int = 0
+    # Planned deletions and archivals left for a later pass by the time budget.
+    deferred: int = 0
+    # Runs whose stale ledger size the time budget left unmeasured; the quota
+    # and size-cap rules wait for a pass that has measured every run.
+    unsized: int = 0
+    # Deleted runs physically removed from output/.trash/ by this pass, and
+    # those still waiting there.
+    reaped: int = 0
+    trash_pending: int = 0
+    # Deleted runs that repeatedly could not be removed, set aside in
+    # output/.trash/failed/; they need a manual look, not another pass.
+    trash_failed: int = 0
+    # Seconds spent per stage: scan, plan, archive, delete (renames), reap.
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def complete(self) -> bool:
+        return self.deferred == 0 and self.unsized == 0 and self.trash_pending == 0
+
+    @property
+    def deletion_throughput(self) -> Tuple[float, float]:
+        """(runs, bytes) removed per second, counting both the renames and the reaping."""
+        seconds = self.timings.get("delete", 0.0) + self.timings.get("reap", 0.0)
+        if not self.deletions or seconds <= 0:
+            return 0.0, 0.0
+        return len(self.deletions) / seconds, self.freed_bytes / seconds
 
     @property
     def freed_bytes(self) -> int:
         return sum(record.run.size_bytes for record in self.deletions)
 
+    @property
+    def archived_bytes(self) -> Tuple[int, int]:
+        """(uncompressed, compressed) bytes of the runs archived by this pass."""
+        return (
+            sum(record.run.size_bytes for record in self.archivals),
+            sum(record.compressed_bytes or 0 for record in self.archivals),
+        )
+
     def reasons_summary(self) -> Dict[str, int]:
         summary: Dict[str, int] = {}
         for record in self.deletions:
@@ -75,11 +358,14 @@ def load_cleanup_settings(studio_root: Path) -> CleanupSettings:
     if not path.exists():
         return CleanupSettings()
     try:
-        text = path.read_text(encoding="utf-8")
+        parsed = load_cached(
+            path,
+            lambda raw: _parse_cleanup_toml(raw.decode("utf-8")),
+            namespace="cleanup-settings",
+        )
     except OSError as exc:
         raise CleanupError(f"Failed to read cleanup config at {path}: {exc}") from exc
 
-    parsed = _parse_cleanup_toml(text)
     cleanup_section = parsed.get("cleanup", {})
 
     ttl_days = _safe_int(cleanup_section.get("ttl_days"), DEFAULT_TTL_DAYS)
@@ -88,7 +374,48 @@ def load_cleanup_settings(studio_root: Path) -> CleanupSettings:
     )
     if size_limit_mb >= 1024:
         size_limit_mb = 1023
-    return CleanupSettings(ttl_days=ttl_days, size_limit_mb=size_limit_mb)
+    size_workers = max(
+        1, _safe_int(cleanup_section.get("size_workers"), DEFAULT_SIZE_WORKERS)
+    )
+    archive_after_days = _safe_int(
+        cleanup_section.get("archive_after_days"), DEFAULT_ARCHIVE_AFTER_DAYS
+    )
+    archive_format = cleanup_section.get("archive_format", DEFAULT_ARCHIVE_FORMAT)
+    if archive_format not in ARCHIVE_FORMATS:
+        archive_format = DEFAULT_ARCHIVE_FORMAT
+    dedupe_artifacts = _safe_bool(cleanup_section.get("dedupe_artifacts"), False)
+    prepare_time_budget_ms = max(
+        0,
+        _safe_int(
+            cleanup_section.get("prepare_time_budget_ms"), DEFAULT_PREPARE_TIME_BUDGET_MS
+        ),
+    )
+    background_cleanup = _safe_bool(cleanup_section.get("background_cleanup"), False)
+    eviction_policy = str(cleanup_section.get("eviction_policy", DEFAULT_EVICTION_POLICY)).lower()
+    if eviction_policy not in EVICTION_POLICIES:
+        eviction_policy = DEFAULT_EVICTION_POLICY
+    phase_quotas = {}
+    for section_name, section in parsed.items():
+        if not section_name.startswith(PHASE_QUOTA_SECTION_PREFIX):
+            continue
+        quota = PhaseQuota(
+            size_limit_mb=max(0, _safe_int(section.get("size_limit_mb"), 0)),
+            max_runs=max(0, _safe_int(section.get("max_runs"), 0)),
+        )
+        if quota.size_limit_mb or quota.max_runs:
+            phase_quotas[section_name[len(PHASE_QUOTA_SECTION_PREFIX):]] = quota
+    return CleanupSettings(
+        ttl_days=ttl_days,
+        size_limit_mb=size_limit_mb,
+        size_workers=size_workers,
+        archive_after_days=archive_after_days,
+        archive_format=archive_format,
+        dedupe_artifacts=dedupe_artifacts,
+        prepare_time_budget_ms=prepare_time_budget_ms,
+        background_cleanup=background_cleanup,
+        eviction_policy=eviction_policy,
+        phase_quotas=phase_quotas,
+    )
 
 
 def cleanup_runs(
@@ -97,7 +424,23 @@ def cleanup_runs(
     *,
     now: Optional[datetime] = None,
     dry_run: bool = False,
+    time_budget: Optional[float] = None,
 ) -> CleanupReport:
+    """Apply the ttl, archive and size-budget rules to the runs under `output_root`.
+
+    With `time_budget` (seconds) the pass stops archiving and deleting once
+    the budget is spent, always completing at least one action so repeated
+    passes make progress. Whatever is left over is counted in
+    `report.deferred` and recorded in the state file; the next pass plans
+    from the catalog again and carries on. Dry runs ignore the budget.
+
+    The budget also covers measuring runs whose ledger size is stale. Runs
+    it leaves unmeasured are counted in `report.unsized`; TTL expiry and
+    archiving still apply to them, but quota and size-cap deletions wait
+    for a pass that has sized every run.
+    """
+    started = time.monotonic()
+    budget = _PassBudget(None if dry_run else time_budget)
     current_time = now or datetime.now(timezone.utc)
     report = CleanupReport(
         settings=settings,
@@ -108,52 +451,394 @@ def cleanup_runs(
         errors=[],
     )
 
-    run_records = _collect_runs(output_root)
+    snapshot = scan_runs(output_root, size_workers=settings.size_workers)
+    run_records = snapshot.records_within(budget.deadline)
+    report.unsized = snapshot.unsized
+    report.timings["scan"] = time.monotonic() - started
     if not run_records:
+        if not dry_run:
+            _reap(output_root, settings, budget, report)
+            _write_state(output_root, report, started)
         return report
 
     report.total_runs = len(run_records)
-    report.total_size_bytes = sum(record.size_bytes for record in run_records)
-
-    to_delete: List[DeletionRecord] = []
-    cutoff = current_time - settings.ttl_delta
-
-    if settings.ttl_days > 0:
-        for record in run_records:
-            if record.created_at < cutoff:
-                to_delete.append(DeletionRecord(run=record, reason="ttl"))
-
-    remaining = [record for record in run_records if record not in {d.run for d in to_delete}]
-    remaining_size = sum(record.size_bytes for record in remaining)
-
-    size_limit = settings.size_limit_bytes
-    if size_limit and remaining_size > size_limit:
-        sorted_remaining = sorted(remaining, key=lambda rec: rec.created_at)
-        for record in sorted_remaining:
-            if remaining_size <= size_limit:
-                break
-            to_delete.append(DeletionRecord(run=record, reason="budget"))
-            remaining_size -= record.size_bytes
-
+    report.total_size_bytes = snapshot.total_size_bytes
+
+    plan_started = time.monotonic()
+    planner = EvictionPlanner.for_settings(settings, current_time)
+    candidates: Iterable[RunRecord] = run_records
+    if settings.archive_after_days > 0:
+        candidates = _archive_old_runs(output_root, candidates, settings, current_time, report, budget, planner)
+    # Archived runs count at their compressed size.
+    planner.offer(candidates)
+
+    to_delete = [DeletionRecord(run=record, reason="ttl") for record in planner.expired]
+    # With archivals still pending or runs unsized, the budget check would
+    # count the wrong sizes; leave it to the pass that finishes them.
+    if not report.deferred and not report.unsized:
+        to_delete.extend(DeletionRecord(run=record, reason="quota") for record in planner.quota_evictions())
+        to_delete.extend(DeletionRecord(run=record, reason="budget") for record in planner.over_budget())
+    report.timings["plan"] = time.monotonic() - plan_started - report.timings.get("archive", 0.0)
+
+    delete_started = time.monotonic()
     seen_paths = set()
     final_deletions: List[DeletionRecord] = []
     for record in to_delete:
         if record.run.path in seen_paths:
             continue
         seen_paths.add(record.run.path)
+        if not budget.allows():
+            report.deferred += 1
+            continue
+        budget.actions += 1
         final_deletions.append(record)
         try:
             if not dry_run and record.run.path.exists():
-                shutil.rmtree(record.run.path)
+                _delete_run(output_root, record.run)
         except OSError as exc:
             report.errors.append(
                 f"Failed to delete {record.run.path}: {exc}"
             )
+    report.timings["delete"] = time.monotonic() - delete_started
 
     report.deletions = final_deletions
+    if not dry_run:
+        _reap(output_root, settings, budget, report)
+        removed = [
+            (record.run.phase, record.run.run_id)
+            for record in final_deletions
+            if not record.run.path.exists()
+        ]
+        with RunCatalog(output_root) as catalog:
+            catalog.remove_runs(removed)
+        if blob_root(output_root).is_dir():
+            from blob_store import collect_garbage
+
+            report.blobs_removed, report.blob_bytes_freed = collect_garbage(output_root)
+        if report.archivals:
+            # Archived runs moved; let the next scan list them from the catalog again.
+            invalidate_snapshot(output_root)
+        else:
+            snapshot.discard(removed)
+        _write_state(output_root, report, started)
     return report
 
 
+def _delete_run(output_root: Path, record: RunRecord) -> None:
+    """Make `record` vanish from the output root; directories are reaped later from the trash."""
+    if record.archived:
+        record.path.unlink()
+        return
+    try:
+        move_to_trash(record.path, output_root)
+    except OSError:
+        # No rename possible (e.g. the phase directory is another mount); delete in place.
+        shutil.rmtree(record.path)
+
+
+def _reap(output_root: Path, settings: CleanupSettings, budget: "_PassBudget", report: CleanupReport) -> None:
+    result = reap_trash(output_root, workers=settings.size_workers, deadline=budget.deadline)
+    report.reaped = result.reaped
+    report.trash_pending = result.pending
+    report.trash_failed = result.failed
+    report.timings["reap"] = result.seconds
+
+
+class _QuotaWindow:
+    """The newest runs of one phase that fit its quota; older runs are evicted as they stream past."""
+
+    def __init__(self, quota: PhaseQuota, evicted: List[RunRecord]):
+        self.size_limit = quota.size_limit_bytes
+        self.max_runs = quota.max_runs
+        self.evicted = evicted
+        self.kept: List[Tuple[datetime, int, RunRecord]] = []
+        self.used_bytes = 0
+        self.pinned_runs = 0
+        self.floor: Optional[datetime] = None
+
+    def reserve(self, record: RunRecord) -> None:
+        """Count a pinned run against the quota; it is never evicted itself."""
+        self.used_bytes += record.size_bytes
+        self.pinned_runs += 1
+        self._shrink()
+
+    def push(self, key: datetime, sequence: int, record: RunRecord) -> None:
+        if self.floor is not None and key < self.floor:
+            self.evicted.append(record)
+            return
+        heapq.heappush(self.kept, (key, sequence, record))
+        self.used_bytes += record.size_bytes
+        self._shrink()
+
+    def survivors(self) -> Iterator[RunRecord]:
+        return (record for _, _, record in self.kept)
+
+    def _over(self) -> bool:
+        if self.size_limit and self.used_bytes > self.size_limit:
+            return True
+        return bool(self.max_runs) and len(self.kept) + self.pinned_runs > self.max_runs
+
+    def _shrink(self) -> None:
+        while self.kept and self._over():
+            self.floor, _, victim = heapq.heappop(self.kept)
+            self.used_bytes -= victim.size_bytes
+            self.evicted.append(victim)
+
+
+class EvictionPlanner:
+    """Streaming ttl, quota and size-budget plan for one cleanup pass.
+
+    `offer` sets ttl-expired runs aside as records stream past and feeds the
+    rest to a min-heap keyed on age (creation time, or last access under the
+    "lru" policy) that only holds the newest runs still fitting the size
+    limit. Once a run has been evicted, any older run offered later is evicted
+    straight away, so the result is exactly "delete oldest first until the
+    rest fits" without sorting or keeping every record.
+
+    Phases with a quota get their own window, applied first; the runs it keeps
+    join the global heap when the plan is read. Pinned runs are never expired
+    or evicted but still count against their phase quota and the size limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_cutoff: Optional[datetime],
+        size_limit: int,
+        phase_quotas: Optional[Dict[str, PhaseQuota]] = None,
+        use_last_access: bool = False,
+    ):
+        self.ttl_cutoff = ttl_cutoff
+        self.size_limit = size_limit
+        self.use_last_access = use_last_access
+        self.expired: List[RunRecord] = []
+        self.pinned: List[RunRecord] = []
+        self.kept_bytes = 0
+        self._kept: List[Tuple[datetime, int, RunRecord]] = []
+        self._is_heap = False
+        self._evicted: List[RunRecord] = []
+        self._quota_evicted: List[RunRecord] = []
+        self._windows = {
+            phase: _QuotaWindow(quota, self._quota_evicted)
+            for phase, quota in (phase_quotas or {}).items()
+        }
+        # Age of the newest run evicted so far.
+        self._floor: Optional[datetime] = None
+        self._sequence = 0
+
+    @classmethod
+    def for_settings(cls, settings: CleanupSettings, current_time: datetime) -> "EvictionPlanner":
+        cutoff = current_time - settings.ttl_delta if settings.ttl_days > 0 else None
+        return cls(
+            ttl_cutoff=cutoff,
+            size_limit=settings.size_limit_bytes,
+            phase_quotas=settings.phase_quotas,
+            use_last_access=settings.uses_last_access,
+        )
+
+    def age_key(self, record: RunRecord) -> datetime:
+        return record.last_used if self.use_last_access else record.created_at
+
+    def is_expired(self, record: RunRecord) -> bool:
+        if record.pinned or self.ttl_cutoff is None:
+            return False
+        return self.age_key(record) < self.ttl_cutoff
+
+    def offer(self, records: Iterable[RunRecord]) -> None:
+        """Set ttl-expired records aside; keep the rest while they fit the limits, evicting the oldest."""
+        cutoff, limit = self.ttl_cutoff, self.size_limit
+        use_last_access, windows = self.use_last_access, self._windows
+        expired, kept, evicted = self.expired, self._kept, self._evicted
+        kept_bytes, floor, sequence = self.kept_bytes, self._floor, self._sequence
+        is_heap = self._is_heap
+        heappush, heappop = heapq.heappush, heapq.heappop
+        for record in records:
+            key = record.created_at
+            if use_last_access and record.last_access is not None:
+                key = record.last_access
+            if record.pinned:
+                self.pinned.append(record)
+                kept_bytes += record.size_bytes
+                if record.phase in windows:
+                    windows[record.phase].reserve(record)
+                continue
+            if cutoff is not None and key < cutoff:
+                expired.append(record)
+                continue
+            sequence += 1
+            if windows and record.phase in windows:
+                windows[record.phase].push(key, sequence, record)
+                continue
+            if floor is not None and key < floor:
+                # Sequence numbers only grow, so a tie with the floor sorts after it and may stay.
+                evicted.append(record)
+                continue
+            kept_bytes += record.size_bytes
+            if not limit:
+                continue
+            if is_heap:
+                heappush(kept, (key, sequence, record))
+            else:
+                # Plain appends until the limit is first exceeded; most passes never get there.
+                kept.append((key, sequence, record))
+            if kept_bytes <= limit:
+                continue
+            if not is_heap:
+                heapq.heapify(kept)
+                is_heap = True
+            while kept_bytes > limit and kept:
+                floor, _, victim = heappop(kept)
+                kept_bytes -= victim.size_bytes
+                evicted.append(victim)
+        self.kept_bytes, self._floor, self._sequence = kept_bytes, floor, sequence
+        self._is_heap = is_heap
+
+    def quota_evictions(self) -> List[RunRecord]:
+        """Runs evicted to fit their phase quota."""
+        self._finish()
+        return list(self._quota_evicted)
+
+    def over_budget(self) -> List[RunRecord]:
+        """Runs evicted for the global size limit, in the order they were evicted.
+
+        Every one of them goes, so they are not sorted; heap evictions come out
+        oldest first and the rest were older than every run still kept.
+        """
+        self._finish()
+        return list(self._evicted)
+
+    def _finish(self) -> None:
+        """Move the runs each phase quota kept into the global heap, then settle the size limit."""
+        windows, self._windows = self._windows, {}
+        for window in windows.values():
+            self.offer(window.survivors())
+        if self.size_limit and self.kept_bytes > self.size_limit:
+            # Pinned runs offered last can push the total over without a later push to shrink it.
+            if not self._is_heap:
+                heapq.heapify(self._kept)
+                self._is_heap = True
+            while self.kept_bytes > self.size_limit and self._kept:
+                self._floor, _, victim = heapq.heappop(self._kept)
+                self.kept_bytes -= victim.size_bytes
+                self._evicted.append(victim)
+
+
+def plan_evictions(
+    records: Iterable[RunRecord], settings: CleanupSettings, current_time: datetime
+) -> EvictionPlanner:
+    """Plan ttl, quota and size-budget deletions for `records` without touching disk."""
+    planner = EvictionPlanner.for_settings(settings, current_time)
+    planner.offer(records)
+    return planner
+
+
+class _PassBudget:
+    """Wall-clock allowance for one cleanup pass; the first action is always allowed."""
+
+    def __init__(self, seconds: Optional[float]):
+        self.deadline = None if seconds is None else time.monotonic() + seconds
+        self.actions = 0
+
+    def allows(self) -> bool:
+        if self.deadline is None or self.actions == 0:
+            return True
+        return time.monotonic() < self.deadline
+
+
+def cleanup_state_path(output_root: Path) -> Path:
+    return Path(output_root) / CLEANUP_STATE_FILENAME
+
+
+def load_cleanup_state(output_root: Path) -> Optional[Dict]:
+    """Return what the last cleanup pass recorded, or None if there is no readable state."""
+    try:
+        state = json.loads(cleanup_state_path(output_root).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def _write_state(output_root: Path, report: CleanupReport, started: float) -> None:
+    if not Path(output_root).is_dir():
+        return
+    state = {
+        "updated_iso": datetime.now(timezone.utc).isoformat(),
+        "complete": report.complete,
+        "pending": report.deferred,
+        "unsized": report.unsized,
+        "trash_pending": report.trash_pending,
+        "trash_failed": report.trash_failed,
+        "deleted": len(report.deletions),
+        "archived": len(report.archivals),
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    }
+    try:
+        atomic_write_text(cleanup_state_path(output_root), json.dumps(state, indent=2) + "\n")
+    except OSError as exc:
+        report.errors.append(f"Failed to write cleanup state: {exc}")
+
+
+def _archive_old_runs(
+    output_root: Path,
+    records: Iterable[RunRecord],
+    settings: CleanupSettings,
+    current_time: datetime,
+    report: CleanupReport,
+    budget: Optional[_PassBudget] = None,
+    planner: Optional[EvictionPlanner] = None,
+) -> Iterator[RunRecord]:
+    """Archive unpinned live runs older than `archive_after_days`, yielding `records` with archived runs swapped in.
+
+    Only finalized runs are archived: a run still PENDING (or without a
+    run.json) would leave `finalize` nothing to update. Dry runs only record what would be archived; those runs keep their
+    uncompressed size for the budget check. Runs the time budget does not
+    reach stay live and count as deferred, and runs `planner` is about to
+    expire are passed through untouched. The catalog is updated once the
+    stream is exhausted.
+    """
+    cutoff = current_time - settings.archive_delta
+    archived_rows: List[Tuple[str, str, Path, int, int]] = []
+    for record in records:
+        age = record.last_used if settings.uses_last_access else record.created_at
+        if (
+            record.archived
+            or record.pinned
+            or not record.finalized
+            or age >= cutoff
+            or (planner and planner.is_expired(record))
+        ):
+            yield record
+            continue
+        target = archive_path(output_root, record.phase, record.run_id, settings.archive_format)
+        if report.dry_run:
+            report.archivals.append(ArchiveRecord(run=record, archive=target))
+            yield record
+            continue
+        if budget is not None:
+            if not budget.allows():
+                report.deferred += 1
+                yield record
+                continue
+            budget.actions += 1
+        archive_started = time.monotonic()
+        try:
+            compressed = archive_run(record.path, target)
+            mtime_ns = target.stat().st_mtime_ns
+        except (ArchiveError, OSError) as exc:
+            report.errors.append(f"Failed to archive {record.path}: {exc}")
+            compressed = None
+        report.timings["archive"] = report.timings.get("archive", 0.0) + time.monotonic() - archive_started
+        if compressed is None:
+            yield record
+            continue
+        report.archivals.append(ArchiveRecord(run=record, archive=target, compressed_bytes=compressed))
+        archived_rows.append((record.phase, record.run_id, target, compressed, mtime_ns))
+        yield replace(record, path=target, size_bytes=compressed, archived=True)
+    if archived_rows:
+        with RunCatalog(output_root) as catalog:
+            catalog.mark_archived(archived_rows)
+
+
 def format_bytes(num_bytes: int) -> str:
     units = ["B", "KB", "MB", "GB", "TB"]
     value = float(num_bytes)
@@ -171,59 +856,74 @@ def _safe_int(value, default: int) -> int:
         return default
 
 
-def _collect_runs(output_root: Path) -> List[RunRecord]:
-    records: List[RunRecord] = []
-    if not output_root.exists():
-        return records
-
-    for phase_dir in sorted(output_root.iterdir()):
-        if not phase_dir.is_dir():
-            continue
-        for run_dir in sorted(phase_dir.glob("run_*")):
-            if not run_dir.is_dir():
-                continue
-            record = _build_run_record(phase_dir.name, run_dir)
-            if record:
-                records.append(record)
-    return records
+def _safe_bool(value, default: bool) -> bool:
+    if value is None:
+        return default
+    return str(value).strip().lower() in {"1", "true", "yes", "on"}
 
 
-def _build_run_record(phase: str, run_dir: Path) -> Optional[RunRecord]:
-    run_id = run_dir.name
-    meta_path = run_dir / "run.json"
-    created_at = None
-    if meta_path.exists():
-        try:
-            meta = json.loads(meta_path.read_text(encoding="utf-8"))
-            created_iso = meta.get("created_iso")
-            if created_iso:
-                created_at = datetime.fromisoformat(created_iso)
-        except Exception:
-            created_at = None
-    if created_at is None:
-        created_at = datetime.fromtimestamp(run_dir.stat().st_mtime, timezone.utc)
-
-    size_bytes = _directory_size(run_dir)
-    return RunRecord(
-        phase=phase,
-        run_id=run_id,
-        path=run_dir,
-        created_at=created_at,
-        size_bytes=size_bytes,
-    )
+def _collect_runs(output_root: Path) -> List[RunRecord]:
+    return list(scan_runs(output_root).records)
 
 
-def _directory_size(path: Path) -> int:
+def _directory_size(path: Path, blobs: FrozenSet[Tuple[int, int]] = frozenset()) -> int:
+    """Bytes under `path`; files linked into the blob store (inodes in `blobs`) count a share."""
     total = 0
-    for child in path.rglob("*"):
+    pending = [os.fspath(path)]
+    while pending:
         try:
-            if child.is_file():
-                total += child.stat().st_size
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            # DirEntry caches stat results, so each file costs one syscall.
+                            st = entry.stat()
+                            if st.st_nlink > 1 and (st.st_dev, st.st_ino) in blobs:
+                                # Deduplicated artifact: split the blob across the runs
+                                # linking it (one of its links is the blob store's).
+                                total += st.st_size // (st.st_nlink - 1)
+                            else:
+                                total += st.st_size
+                    except OSError:
+                        continue
         except OSError:
             continue
     return total
 
 
+def _directory_sizes(
+    paths: List[Path],
+    workers: int,
+    blobs: FrozenSet[Tuple[int, int]] = frozenset(),
+    deadline: Optional[float] = None,
+) -> List[int]:
+    """Size many run directories, fanning out across threads when worthwhile.
+
+    With `deadline` (a `time.monotonic()` value) no new batch of `workers`
+    directories is started once it has passed, and only the sizes of the
+    leading paths measured so far are returned. The first batch always runs.
+    """
+    batch = max(1, workers) if deadline is not None else max(1, len(paths))
+    sizes: List[int] = []
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            if sizes and deadline is not None and time.monotonic() >= deadline:
+                break
+            sizes.append(_directory_size(path, blobs))
+        return sizes
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        for start in range(0, len(paths), batch):
+            if sizes and deadline is not None and time.monotonic() >= deadline:
+                break
+            chunk = paths[start:start + batch]
+            sizes.extend(pool.map(_directory_size, chunk, [blobs] * len(chunk)))
+    return sizes
+
+
 def _parse_cleanup_toml(text: str) -> Dict[str, Dict[str, str]]:
     data: Dict[str, Dict[str, str]] = {}
     current_section: Optional[str] = None
@@ -247,10 +947,21 @@ def _parse_cleanup_toml(text: str) -> Dict[str, Dict[str, str]]:
 
 
 __all__ = [
+    "ArchiveRecord",
     "CleanupSettings",
     "CleanupReport",
     "CleanupError",
+    "EvictionPlanner",
+    "PhaseQuota",
+    "RunRecord",
+    "RunSnapshot",
     "cleanup_runs",
+    "cleanup_state_path",
     "format_bytes",
+    "invalidate_snapshot",
     "load_cleanup_settings",
+    "load_cleanup_state",
+    "plan_evictions",
+    "refresh_run_size",
+    "scan_runs",
 ]
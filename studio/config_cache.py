@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Parsed-config cache shared by Studio's config loaders.
+
+The manifest, role packs, scopes/validation TOML and studio_settings.toml
+are read on almost every command, and a long-lived process (the
+`run_phase.py serve` daemon) reads them for every request. `load_cached`
+memoizes each parsed file keyed by (path, mtime, size), so an unchanged
+file is one `stat()` and an edited one is re-parsed on its next use.
+
+Setting `STUDIO_CONFIG_CACHE_DIR` additionally keeps a marshal-compiled copy
+of each parsed file on disk, which lets a cold process skip the parse (and
+the `tomllib` import) entirely. Every call returns its own deep copy of
+the cached value, so a caller that modifies its result cannot change what
+later callers (or later daemon requests) see.
+"""
+from __future__ import annotations
+
+import copy
+import marshal
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from atomic_io import atomic_write_bytes
+
+CACHE_DIR_ENV = "STUDIO_CONFIG_CACHE_DIR"
+# Marshal's format is tied to the interpreter version.
+_DISK_FORMAT = ("studio-config-cache", 1, sys.version_info[:2])
+
+Stamp = Tuple[int, int]
+_MISSING = object()
+_MEMORY: Dict[Tuple[str, str], Tuple[Stamp, Any]] = {}
+
+
+def file_stamp(path: Path) -> Stamp:
+    """(mtime_ns, size) of `path`; raises OSError if it cannot be stat'ed."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_cached(path: Path, parse: Callable[[bytes], Any], *, namespace: str) -> Any:
+    """Return `parse(<file bytes>)` for `path`, reusing the last result while the file is unchanged.
+
+    `namespace` names the parser so one file read two ways is cached twice.
+    Parse errors propagate and are not cached. The result is a fresh copy
+    that the caller is free to modify.
+    """
+    key = (namespace, os.path.abspath(path))
+    stamp = file_stamp(path)
+    cached = _MEMORY.get(key)
+    if cached is not None and cached[0] == stamp:
+        return copy.deepcopy(cached[1])
+
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    disk_path = _disk_path(Path(cache_dir), key) if cache_dir else None
+    value = _read_disk(disk_path, key, stamp) if disk_path else _MISSING
+    if value is _MISSING:
+        with open(path, "rb") as handle:
+            raw = handle.read()
+        value = parse(raw)
+        # Only trust the parse if the file did not change while it was being read.
+        if file_stamp(path) != stamp:
+            return value
+        if disk_path:
+            _write_disk(disk_path, key, stamp, value)
+    _MEMORY[key] = (stamp, value)
+    return copy.deepcopy(value)
+
+
+def load_json(path: Path) -> Any:
+    import json
+
+    return load_cached(path, json.loads, namespace="json")
+
+
+def load_toml(path: Path) -> Dict:
+    return load_cached(path, _parse_toml, namespace="toml")
+
+
+def clear_config_cache() -> None:
+    """Forget every in-memory entry (the on-disk cache revalidates itself)."""
+    _MEMORY.clear()
+
+
+def _parse_toml(raw: bytes) -> Dict:
+    import tomllib
+
+    return tomllib.loads(raw.decode("utf-8"))
+
+
+def _disk_path(cache_dir: Path, key: Tuple[str, str]) -> Path:
+    import hashlib
+
+    digest = hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()[:20]
+    return cache_dir / f"{key[0]}-{digest}.marshal"
+
+
+def _read_disk(disk_path: Path, key: Tuple[str, str], stamp: Stamp) -> Any:
+    try:
+        with open(disk_path, "rb") as handle:
+            header, cached_key, cached_stamp, value = marshal.load(handle)
+    except (OSError, EOFError, ValueError, TypeError):
+        return _MISSING
+    if header != _DISK_FORMAT or tuple(cached_key) != key or tuple(cached_stamp) != stamp:
+        return _MISSING
+    return value
+
+
+def _write_disk(disk_path: Path, key: Tuple[str, str], stamp: Stamp, value: Any) -> None:
+    try:
+        payload = marshal.dumps((_DISK_FORMAT, key, stamp, value))
+    except ValueError:
+        # Values marshal cannot encode (e.g. TOML datetimes) stay memory-only.
+        return
+    try:
+        atomic_write_bytes(disk_path, payload)
+    except OSError:
+        pass
+
+
+__all__ = [
+    "CACHE_DIR_ENV",
+    "clear_config_cache",
+    "file_stamp",
+    "load_cached",
+    "load_json",
+    "load_toml",
+]
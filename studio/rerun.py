@@ -13,6 +13,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import List
 
+from run_archive import readable_run_dir
+from run_catalog import note_run_access
+
 
 @dataclass
 class RejectionContext:
@@ -40,11 +43,12 @@ def detect_rerun_mode(run_dir: Path) -> bool:
     Detect if this is a rerun by checking for existing contrarian files.
     
     Args:
-        run_dir: Path to the Studio run directory
+        run_dir: Path to the Studio run directory (archived runs are read from their archive)
         
     Returns:
         True if previous contrarian files exist, False otherwise
     """
+    run_dir = readable_run_dir(run_dir)
     if not run_dir.exists():
         return False
     
@@ -58,12 +62,13 @@ def find_latest_rejection(run_dir: Path, role: str | None = None) -> Path | None
     Find the most recent contrarian file containing a REJECTED verdict.
     
     Args:
-        run_dir: Path to the Studio run directory
+        run_dir: Path to the Studio run directory (archived runs are read from their archive)
         role: Optional role name for studio phase (e.g., "product", "engineering")
         
     Returns:
         Path to the latest rejection file, or None if no rejections found
     """
+    run_dir = readable_run_dir(run_dir)
     if not run_dir.exists():
         return None
     
@@ -218,6 +223,7 @@ def load_rejection_context(run_dir: Path, role: str | None = None) -> RejectionC
     rejection_file = find_latest_rejection(run_dir, role)
     if not rejection_file:
         return None
+    note_run_access(run_dir)
     
     content = rejection_file.read_text(encoding="utf-8")
     reasons = extract_rejection_reasons(content)
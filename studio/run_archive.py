@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Compressed archive tier for Studio runs.
+
+Cleanup can pack an old run directory into a single archive under
+`output/.archive/<phase>/<run_id>.tar.xz` (or `.zip`) instead of deleting it.
+Markdown artifacts compress well, so the same size budget holds far more
+history. Archived runs stay in the run catalog; readers (`rerun`,
+`analyze_tokens`, `validate`) call `readable_run_dir`, which hands back the
+live directory or a private, read-only extraction of the archive.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+ARCHIVE_DIRNAME = ".archive"
+ARCHIVE_FORMATS = {"tar.xz": ".tar.xz", "zip": ".zip"}
+DEFAULT_ARCHIVE_FORMAT = "tar.xz"
+# run.json is stored first so catalog rebuilds can read it without unpacking the rest.
+META_FILENAME = "run.json"
+
+# Extractions kept per process; a long-lived daemon drops the least recently used.
+MAX_EXTRACTED = 8
+
+_EXTRACTED: "OrderedDict[Tuple[Path, int], Path]" = OrderedDict()
+_EXTRACT_ROOT: Optional[Path] = None
+
+
+class ArchiveError(RuntimeError):
+    """Raised when a run cannot be archived or read back."""
+
+
+def archive_root(output_root: Path) -> Path:
+    return Path(output_root) / ARCHIVE_DIRNAME
+
+
+def archive_path(output_root: Path, phase: str, run_id: str, fmt: str = DEFAULT_ARCHIVE_FORMAT) -> Path:
+    return archive_root(output_root) / phase / f"{run_id}{_suffix(fmt)}"
+
+
+def find_archive(output_root: Path, phase: str, run_id: str) -> Optional[Path]:
+    """Return the archive holding `phase/run_id`, whichever format it was written in."""
+    for fmt in ARCHIVE_FORMATS:
+        candidate = archive_path(output_root, phase, run_id, fmt)
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def is_archive_file(path: Path) -> bool:
+    return any(Path(path).name.endswith(suffix) for suffix in ARCHIVE_FORMATS.values())
+
+
+def archived_run_id(path: Path) -> str:
+    name = Path(path).name
+    for suffix in ARCHIVE_FORMATS.values():
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def iter_archived_runs(output_root: Path) -> Iterator[Tuple[str, str, Path]]:
+    """Yield (phase, run_id, archive) for every archived run, in sorted order."""
+    root = archive_root(output_root)
+    if not root.is_dir():
+        return
+    for phase_dir in sorted(root.iterdir()):
+        if not phase_dir.is_dir() or phase_dir.name.startswith("."):
+            continue
+        for archive in sorted(phase_dir.iterdir()):
+            if archive.name.startswith("run_") and is_archive_file(archive):
+                yield phase_dir.name, archived_run_id(archive), archive
+
+
+def archive_run(run_dir: Path, archive: Path) -> int:
+    """Pack `run_dir` into `archive`, remove the directory and return the archive's size.
+
+    The archive is written under a temporary name and renamed into place, so
+    a crash leaves either the directory or a complete archive. Once the
+    archive exists it is authoritative, even if some of the directory could
+    not be removed.
+    """
+    run_dir = Path(run_dir)
+    archive = Path(archive)
+    archive.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = archive.with_name(f".{archive.name}.{os.getpid()}.tmp")
+    try:
+        if archive.name.endswith(ARCHIVE_FORMATS["zip"]):
+            _write_zip(run_dir, tmp_path)
+        else:
+            _write_tar_xz(run_dir, tmp_path)
+        os.replace(tmp_path, archive)
+    except BaseException as exc:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        if isinstance(exc, OSError):
+            raise ArchiveError(f"Failed to archive {run_dir}: {exc}") from exc
+        raise
+    shutil.rmtree(run_dir, ignore_errors=True)
+    return archive.stat().st_size
+
+
+def read_archived_meta(archive: Path) -> Optional[Dict]:
+    """Return the run.json stored in `archive`, or None if it is missing or unreadable."""
+    import json
+
+    try:
+        data = _read_member(Path(archive), f"{archived_run_id(archive)}/{META_FILENAME}")
+    except ArchiveError:
+        return None
+    if data is None:
+        return None
+    try:
+        return json.loads(data.decode("utf-8"))
+    except ValueError:
+        return None
+
+
+def readable_run_dir(run_dir: Path) -> Path:
+    """Return a directory holding `run_dir`'s files, extracting its archive if it was archived.
+
+    `run_dir` may be the run's usual location under the output root or the
+    archive file itself. Extractions are private to this process, cached per
+    archive (up to `MAX_EXTRACTED` of them) and removed at exit; writes to
+    them are not persisted. Paths that
+    are neither a directory nor archived are returned unchanged.
+    """
+    run_dir = Path(run_dir)
+    if is_archive_file(run_dir) and run_dir.is_file():
+        archive: Optional[Path] = run_dir
+    else:
+        archive = find_archive(run_dir.parent.parent, run_dir.parent.name, run_dir.name)
+    if archive is None:
+        return run_dir
+    return _extract_cached(archive)
+
+
+def _suffix(fmt: str) -> str:
+    try:
+        return ARCHIVE_FORMATS[fmt]
+    except KeyError:
+        raise ArchiveError(
+            f"Unknown archive format '{fmt}' (expected one of: {', '.join(ARCHIVE_FORMATS)})"
+        ) from None
+
+
+def _ordered_files(run_dir: Path) -> Iterator[Path]:
+    meta = run_dir / META_FILENAME
+    if meta.is_file():
+        yield meta
+    for path in sorted(run_dir.rglob("*")):
+        if path != meta:
+            yield path
+
+
+def _write_tar_xz(run_dir: Path, target: Path) -> None:
+    import tarfile
+
+    with tarfile.open(target, "w:xz") as tar:
+        tar.add(run_dir, arcname=run_dir.name, recursive=False)
+        for path in _ordered_files(run_dir):
+            tar.add(path, arcname=f"{run_dir.name}/{path.relative_to(run_dir).as_posix()}", recursive=False)
+
+
+def _write_zip(run_dir: Path, target: Path) -> None:
+    import zipfile
+
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for path in _ordered_files(run_dir):
+            bundle.write(path, f"{run_dir.name}/{path.relative_to(run_dir).as_posix()}")
+
+
+def _read_member(archive: Path, name: str) -> Optional[bytes]:
+    try:
+        if archive.name.endswith(ARCHIVE_FORMATS["zip"]):
+            import zipfile
+
+            with zipfile.ZipFile(archive) as bundle:
+                try:
+                    return bundle.read(name)
+                except KeyError:
+                    return None
+        import tarfile
+
+        with tarfile.open(archive, "r:*") as tar:
+            for member in tar:
+                if member.name == name and member.isfile():
+                    handle = tar.extractfile(member)
+                    return handle.read() if handle else None
+        return None
+    except _read_errors() as exc:
+        raise ArchiveError(f"Failed to read {name} from {archive}: {exc}") from exc
+
+
+def _read_errors() -> Tuple[type, ...]:
+    import lzma
+    import tarfile
+    import zipfile
+
+    return (OSError, EOFError, ValueError, lzma.LZMAError, tarfile.TarError, zipfile.BadZipFile)
+
+
+def _extract_cached(archive: Path) -> Path:
+    global _EXTRACT_ROOT
+    key = (archive.resolve(), archive.stat().st_mtime_ns)
+    cached = _EXTRACTED.get(key)
+    if cached is not None and cached.is_dir():
+        _EXTRACTED.move_to_end(key)
+        return cached
+    # Earlier extractions of this archive are out of date (or gone).
+    for stale in [other for other in _EXTRACTED if other[0] == key[0]]:
+        _discard_extraction(stale)
+    import tempfile
+
+    if _EXTRACT_ROOT is None:
+        _EXTRACT_ROOT = Path(tempfile.mkdtemp(prefix="studio-archive-"))
+        atexit.register(shutil.rmtree, _EXTRACT_ROOT, True)
+    destination = Path(tempfile.mkdtemp(dir=_EXTRACT_ROOT))
+    try:
+        if archive.name.endswith(ARCHIVE_FORMATS["zip"]):
+            import zipfile
+
+            with zipfile.ZipFile(archive) as bundle:
+                bundle.extractall(destination)
+        else:
+            import tarfile
+
+            with tarfile.open(archive, "r:*") as tar:
+                if hasattr(tarfile, "data_filter"):
+                    tar.extractall(destination, filter="data")
+                else:  # pragma: no cover - Python without extraction filters
+                    tar.extractall(destination)
+    except _read_errors() as exc:
+        shutil.rmtree(destination, ignore_errors=True)
+        raise ArchiveError(f"Failed to extract {archive}: {exc}") from exc
+    extracted = destination / archived_run_id(archive)
+    _EXTRACTED[key] = extracted
+    while len(_EXTRACTED) > MAX_EXTRACTED:
+        _discard_extraction(next(iter(_EXTRACTED)))
+    return extracted
+
+
+def _discard_extraction(key: Tuple[Path, int]) -> None:
+    # Each extraction has its own temporary directory around the run folder.
+    shutil.rmtree(_EXTRACTED.pop(key).parent, ignore_errors=True)
+
+
+__all__ = [
+    "ARCHIVE_DIRNAME",
+    "ARCHIVE_FORMATS",
+    "ArchiveError",
+    "DEFAULT_ARCHIVE_FORMAT",
+    "archive_path",
+    "archive_root",
+    "archive_run",
+    "archived_run_id",
+    "find_archive",
+    "is_archive_file",
+    "iter_archived_runs",
+    "read_archived_meta",
+    "readable_run_dir",
+]
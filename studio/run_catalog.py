@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+"""
+Persistent run catalog for Studio output roots.
+
+Keeps one SQLite row per run (live or archived) so the index writer, storage stats,
+cleanup and token reports can list runs without walking every phase folder
+and parsing every run.json. The catalog is derived data: it is rebuilt from
+disk automatically when missing and on demand via `run_phase.py reindex`.
+The exception is each run's last-access time, which rebuilds carry over.
+"""
+from __future__ import annotations
+
+import atexit
+import base64
+import binascii
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from run_archive import iter_archived_runs, read_archived_meta
+
+CATALOG_FILENAME = ".catalog.sqlite"
+# Bumped inside a run directory by writers that change its files in place.
+SIZE_STAMP_FILENAME = ".size_stamp"
+SCHEMA_VERSION = 6
+BUSY_TIMEOUT_SECONDS = 30.0
+
+_SCHEMA = (
+    """
+    CREATE TABLE runs (
+        phase TEXT NOT NULL,
+        run_id TEXT NOT NULL,
+        created_iso TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT '',
+        verdict TEXT NOT NULL DEFAULT '',
+        meta_json TEXT,
+        size_bytes INTEGER,
+        size_mtime_ns INTEGER,
+        archive_path TEXT,
+        accessed_iso TEXT,
+        PRIMARY KEY (phase, run_id)
+    )
+    """,
+    "CREATE INDEX runs_by_created ON runs (created_iso)",
+    "CREATE INDEX runs_by_phase_created ON runs (phase, created_iso)",
+    "CREATE INDEX runs_by_status_created ON runs (status, created_iso)",
+    "CREATE INDEX runs_by_verdict_created ON runs (verdict, created_iso)",
+)
+_ENTRY_COLUMNS = (
+    "phase, run_id, created_iso, status, verdict, meta_json, size_bytes, size_mtime_ns, archive_path,"
+    " accessed_iso"
+)
+_UPSERT = (
+    "INSERT INTO runs (phase, run_id, created_iso, status, verdict, meta_json, archive_path)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT (phase, run_id) DO UPDATE SET created_iso = excluded.created_iso,"
+    " status = excluded.status, verdict = excluded.verdict, meta_json = excluded.meta_json,"
+    " archive_path = excluded.archive_path"
+)
+
+
+class CatalogError(RuntimeError):
+    """Raised when the run catalog cannot be opened or updated."""
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    phase: str
+    run_id: str
+    run_dir: Path
+    created_iso: str
+    status: str
+    verdict: str
+    meta: Optional[Dict]
+    size_bytes: Optional[int] = None
+    size_mtime_ns: Optional[int] = None
+    archive: Optional[Path] = None
+    # Last time finalize, validate or a rerun read the run; None until then.
+    accessed_iso: Optional[str] = None
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromisoformat(self.created_iso)
+
+    @property
+    def accessed_at(self) -> Optional[datetime]:
+        return datetime.fromisoformat(self.accessed_iso) if self.accessed_iso else None
+
+    @property
+    def location(self) -> Path:
+        """Where the run's bytes live: its directory, or its archive once archived."""
+        return self.archive if self.archive is not None else self.run_dir
+
+    def ledger_size(self, mtime_ns: int) -> Optional[int]:
+        """Return the recorded size if it was measured at the location's current mtime.
+
+        For run directories that is `run_dir_mtime_ns`; for archived runs it is
+        the archive file's mtime and the size is its compressed size.
+        """
+        if self.size_bytes is None or self.size_mtime_ns != mtime_ns:
+            return None
+        return self.size_bytes
+
+
+def encode_cursor(entry: CatalogEntry) -> str:
+    """Opaque pagination token pointing just past `entry` in newest-first order."""
+    raw = json.dumps([entry.created_iso, entry.run_id, entry.phase], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_iso, run_id, phase = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as exc:
+        raise CatalogError(f"Invalid cursor: {cursor!r}") from exc
+    return str(created_iso), str(run_id), str(phase)
+
+
+def catalog_path(output_root: Path) -> Path:
+    return Path(output_root) / CATALOG_FILENAME
+
+
+def iter_run_dirs(output_root: Path) -> Iterator[Tuple[str, Path]]:
+    """Yield (phase, run_dir) for every run directory on disk, in sorted order."""
+    if not output_root.exists():
+        return
+    for phase_dir in sorted(output_root.iterdir()):
+        if not phase_dir.is_dir() or phase_dir.name.startswith("."):
+            continue
+        for run_dir in sorted(phase_dir.glob("run_*")):
+            if run_dir.is_dir():
+                yield phase_dir.name, run_dir
+
+
+def run_dir_mtime_ns(run_dir: Path) -> int:
+    """The size ledger's freshness key for `run_dir`: the newer of its mtime and its size stamp's.
+
+    A directory's mtime moves when entries are added, removed or renamed.
+    Writers that change a file in place (token logs, summaries) report it via
+    `note_run_write`, which bumps the run's `.size_stamp`. Either way a run is
+    checked with two `stat` calls however many artifacts it holds. In-place
+    edits that bypass `note_run_write`, such as an editor rewriting a file or
+    a change inside a subdirectory, are not seen until something else in the
+    run changes.
+    """
+    newest = os.stat(run_dir).st_mtime_ns
+    try:
+        return max(newest, os.stat(os.path.join(run_dir, SIZE_STAMP_FILENAME)).st_mtime_ns)
+    except FileNotFoundError:
+        return newest
+
+
+def read_run_meta(run_dir: Path) -> Optional[Dict]:
+    meta_path = run_dir / "run.json"
+    if not meta_path.exists():
+        return None
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _created_iso_for(run_dir: Path, meta: Optional[Dict]) -> str:
+    created_iso = (meta or {}).get("created_iso")
+    if created_iso:
+        try:
+            datetime.fromisoformat(created_iso)
+            return created_iso
+        except (TypeError, ValueError):
+            pass
+    mtime = run_dir.stat().st_mtime
+    return datetime.fromtimestamp(mtime, timezone.utc).isoformat(timespec="seconds")
+
+
+class RunCatalog:
+    """SQLite-backed listing of every run under one output root."""
+
+    def __init__(self, output_root: Path):
+        self.output_root = Path(output_root)
+        self.path = catalog_path(self.output_root)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def __enter__(self) -> "RunCatalog":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        assert self._conn is not None
+        return self._conn
+
+    def open(self) -> "RunCatalog":
+        if self._conn is not None:
+            return self
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        try:
+            conn = sqlite3.connect(
+                self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None
+            )
+        except sqlite3.Error as exc:
+            raise CatalogError(f"Failed to open run catalog at {self.path}: {exc}") from exc
+        self._conn = conn
+        try:
+            self._ensure_schema()
+        except sqlite3.Error as exc:
+            self.close()
+            raise CatalogError(f"Failed to initialise run catalog at {self.path}: {exc}") from exc
+        return self
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _ensure_schema(self) -> None:
+        conn = self._conn
+        assert conn is not None
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        # Take the write lock before re-checking so concurrent first opens only
+        # populate the catalog once.
+        with self._transaction():
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                accessed = self._access_times()
+                conn.execute("DROP TABLE IF EXISTS runs")
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                self._populate_from_disk()
+                self._touch_each(accessed)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _access_times(self) -> List[Tuple[str, str, str]]:
+        """(accessed_iso, phase, run_id) for every run with a recorded access.
+
+        Access times exist nowhere else on disk, so they are carried over when
+        the catalog is rebuilt from the run directories.
+        """
+        try:
+            return self.conn.execute(
+                "SELECT accessed_iso, phase, run_id FROM runs WHERE accessed_iso IS NOT NULL"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            # A new catalog, or one from before access times were recorded.
+            return []
+
+    def _touch_each(self, accessed: List[Tuple[str, str, str]]) -> None:
+        self.conn.executemany("UPDATE runs SET accessed_iso = ? WHERE phase = ? AND run_id = ?", accessed)
+
+    def _populate_from_disk(self) -> int:
+        rows = []
+        archived = set()
+        for phase, run_id, archive in iter_archived_runs(self.output_root):
+            rows.append(self._row(phase, run_id, archive, read_archived_meta(archive), archive))
+            archived.add((phase, run_id))
+        # A directory left next to its archive is an interrupted archive run; the archive wins.
+        for phase, run_dir in iter_run_dirs(self.output_root):
+            if (phase, run_dir.name) not in archived:
+                rows.append(self._row(phase, run_dir.name, run_dir, read_run_meta(run_dir)))
+        self.conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def _row(
+        self,
+        phase: str,
+        run_id: str,
+        run_dir: Path,
+        meta: Optional[Dict],
+        archive: Optional[Path] = None,
+    ) -> Tuple:
+        meta_json = json.dumps(meta) if meta is not None else None
+        return (
+            phase,
+            run_id,
+            _created_iso_for(run_dir, meta),
+            (meta or {}).get("status") or "",
+            (meta or {}).get("verdict") or "",
+            meta_json,
+            archive.relative_to(self.output_root).as_posix() if archive is not None else None,
+        )
+
+    def reindex(self) -> int:
+        """Drop every row and rebuild the catalog from the run directories on disk.
+
+        Recorded access times are kept for the runs that are still there.
+        """
+        with self._transaction():
+            accessed = self._access_times()
+            self.conn.execute("DELETE FROM runs")
+            count = self._populate_from_disk()
+            self._touch_each(accessed)
+            return count
+
+    def upsert_run(self, phase: str, run_id: str, meta: Optional[Dict]) -> None:
+        self.upsert_runs([(phase, run_id, meta)])
+
+    def upsert_runs(
+        self, runs: List[Tuple[str, str, Optional[Dict]]], *, accessed_iso: Optional[str] = None
+    ) -> None:
+        """Upsert several (phase, run_id, meta) rows in a single transaction.
+
+        With `accessed_iso`, the runs are also marked as used at that time.
+        """
+        rows = [
+            self._row(phase, run_id, self.output_root / phase / run_id, meta)
+            for phase, run_id, meta in runs
+        ]
+        with self._transaction():
+            self.conn.executemany(_UPSERT, rows)
+            if accessed_iso is not None:
+                self._touch([(phase, run_id) for phase, run_id, _ in runs], accessed_iso)
+
+    def record_sizes(
+        self, rows: List[Tuple[str, str, int, int]], *, accessed_iso: Optional[str] = None
+    ) -> None:
+        """Store measured (phase, run_id, size_bytes, dir_mtime_ns) values in the size ledger.
+
+        With `accessed_iso`, the runs are also marked as used at that time.
+        """
+        if not rows:
+            return
+        with self._transaction():
+            self.conn.executemany(
+                "UPDATE runs SET size_bytes = ?, size_mtime_ns = ? WHERE phase = ? AND run_id = ?",
+                [(size, mtime_ns, phase, run_id) for phase, run_id, size, mtime_ns in rows],
+            )
+            if accessed_iso is not None:
+                self._touch([(phase, run_id) for phase, run_id, _, _ in rows], accessed_iso)
+
+    def mark_archived(self, rows: List[Tuple[str, str, Path, int, int]]) -> None:
+        """Record (phase, run_id, archive, size_bytes, archive_mtime_ns) for newly archived runs."""
+        if not rows:
+            return
+        with self._transaction():
+            self.conn.executemany(
+                "UPDATE runs SET archive_path = ?, size_bytes = ?, size_mtime_ns = ?"
+                " WHERE phase = ? AND run_id = ?",
+                [
+                    (Path(archive).relative_to(self.output_root).as_posix(), size, mtime_ns, phase, run_id)
+                    for phase, run_id, archive, size, mtime_ns in rows
+                ],
+            )
+
+    def touch_runs(self, keys: List[Tuple[str, str]], accessed_iso: str) -> None:
+        """Record that the (phase, run_id) runs were used at `accessed_iso`."""
+        if not keys:
+            return
+        with self._transaction():
+            self._touch(keys, accessed_iso)
+
+    def _touch(self, keys: List[Tuple[str, str]], accessed_iso: str) -> None:
+        self._touch_each([(accessed_iso, phase, run_id) for phase, run_id in keys])
+
+    def add_sizes(self, rows: List[Tuple[str, str, int, int, int]]) -> None:
+        """Apply known writes, as (phase, run_id, delta_bytes, mtime_before_ns, mtime_after_ns), to the ledger.
+
+        A row is a no-op unless the entry was fresh at `mtime_before_ns`.
+        """
+        if not rows:
+            return
+        with self._transaction():
+            self.conn.executemany(
+                "UPDATE runs SET size_bytes = size_bytes + ?, size_mtime_ns = ?"
+                " WHERE phase = ? AND run_id = ? AND size_mtime_ns = ? AND size_bytes IS NOT NULL",
+                [(delta, after, phase, run_id, before) for phase, run_id, delta, before, after in rows],
+            )
+
+    def remove_runs(self, keys: List[Tuple[str, str]]) -> None:
+        if not keys:
+            return
+        with self._transaction():
+            self.conn.executemany(
+                "DELETE FROM runs WHERE phase = ? AND run_id = ?", keys
+            )
+
+    def list_runs(
+        self,
+        phase: Optional[str] = None,
+        *,
+        month: Optional[str] = None,
+        newest_first: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[CatalogEntry]:
+        query = f"SELECT {_ENTRY_COLUMNS} FROM runs"
+        clauses: List[str] = []
+        params: List = []
+        if phase:
+            clauses.append("phase = ?")
+            params.append(phase)
+        if month:
+            # Range form ("2026-10" <= created < "2026-10~") keeps the index usable.
+            clauses.append("created_iso >= ? AND created_iso < ?")
+            params.extend([month, month + "~"])
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        if newest_first:
+            query += " ORDER BY created_iso DESC, run_id DESC"
+        else:
+            query += " ORDER BY phase, run_id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [self._entry(row) for row in self.conn.execute(query, params)]
+
+    def query_runs(
+        self,
+        *,
+        phase: Optional[str] = None,
+        status: Optional[str] = None,
+        verdict: Optional[str] = None,
+        since: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[CatalogEntry], Optional[str]]:
+        """Return one newest-first page of runs matching the filters, plus the next page's cursor.
+
+        Pages are keyset-paginated on (created_iso, run_id, phase), so each page
+        is an index range scan whose cost does not grow with the page number.
+        """
+        if limit < 1:
+            raise CatalogError("limit must be at least 1")
+        clauses: List[str] = []
+        params: List = []
+        for column, value in (("phase", phase), ("status", status), ("verdict", verdict)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("created_iso >= ?")
+            params.append(since)
+        if cursor:
+            clauses.append("(created_iso, run_id, phase) < (?, ?, ?)")
+            params.extend(decode_cursor(cursor))
+        query = f"SELECT {_ENTRY_COLUMNS} FROM runs"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        # Fetch one extra row to learn whether another page exists.
+        query += " ORDER BY created_iso DESC, run_id DESC, phase DESC LIMIT ?"
+        params.append(limit + 1)
+        entries = [self._entry(row) for row in self.conn.execute(query, params)]
+        next_cursor = encode_cursor(entries[limit - 1]) if len(entries) > limit else None
+        return entries[:limit], next_cursor
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def month_counts(self) -> List[Tuple[str, str, int]]:
+        """Return (phase, YYYY-MM, runs) for every month that has runs with metadata."""
+        rows = self.conn.execute(
+            "SELECT phase, substr(created_iso, 1, 7) AS month, COUNT(*) FROM runs"
+            " WHERE meta_json IS NOT NULL GROUP BY phase, month ORDER BY month DESC, phase"
+        )
+        return [(phase, month, count) for phase, month, count in rows]
+
+    def _entry(self, row: Tuple) -> CatalogEntry:
+        (
+            phase, run_id, created_iso, status, verdict, meta_json, size_bytes, size_mtime_ns, archive,
+            accessed_iso,
+        ) = row
+        return CatalogEntry(
+            phase=phase,
+            run_id=run_id,
+            run_dir=self.output_root / phase / run_id,
+            created_iso=created_iso,
+            status=status,
+            verdict=verdict,
+            meta=json.loads(meta_json) if meta_json else None,
+            size_bytes=size_bytes,
+            size_mtime_ns=size_mtime_ns,
+            archive=self.output_root / archive if archive else None,
+            accessed_iso=accessed_iso,
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+# Writes `note_run_write` has seen but not yet committed, per absolute run
+# directory: [freshness key before the first write (None once another writer
+# interleaved), key after the last write, bytes written].
+_PENDING_WRITES: Dict[str, List] = {}
+_PENDING_LOCK = threading.Lock()
+
+
+def _bump_size_stamp(run_dir: str, newer_than_ns: int) -> int:
+    """Move the run's size stamp past `newer_than_ns` and return the new freshness key."""
+    path = os.path.join(run_dir, SIZE_STAMP_FILENAME)
+    try:
+        previous = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        open(path, "ab").close()
+        previous = 0
+    # Always move forward, even on clocks too coarse to tell two writes apart.
+    stamp = max(time.time_ns(), newer_than_ns + 1, previous + 1)
+    os.utime(path, ns=(stamp, stamp))
+    return run_dir_mtime_ns(run_dir)
+
+
+def note_run_write(run_dir: Path, delta_bytes: int, mtime_before_ns: int) -> None:
+    """Account for a write of `delta_bytes` into the run's size ledger, if the run is catalogued.
+
+    Callers take `run_dir_mtime_ns` before writing and pass it in. The run's
+    size stamp is bumped right away, so scans re-measure the run until the
+    ledger hears about the write. The bytes join a running total for the run
+    that `flush_run_writes` commits in one transaction; consecutive writes
+    extend it as long as nothing else changed the run in between.
+    Ledger upkeep is best-effort: failures never surface to the writer.
+    """
+    # Absolute, since the totals may be committed after the working directory
+    # changed; plain strings, since this runs for every logged operation.
+    run_dir = os.path.abspath(run_dir)
+    if not os.path.exists(os.path.join(os.path.dirname(os.path.dirname(run_dir)), CATALOG_FILENAME)):
+        return
+    try:
+        mtime_after_ns = _bump_size_stamp(run_dir, mtime_before_ns)
+    except OSError:
+        return
+    with _PENDING_LOCK:
+        pending = _PENDING_WRITES.get(run_dir)
+        if pending is None:
+            _PENDING_WRITES[run_dir] = [mtime_before_ns, mtime_after_ns, delta_bytes]
+        elif pending[1] == mtime_before_ns:
+            pending[1] = mtime_after_ns
+            pending[2] += delta_bytes
+        else:
+            # Someone else changed the run since our last write; the total is
+            # no longer the whole story, so leave the run to be re-measured.
+            _PENDING_WRITES[run_dir] = [None, mtime_after_ns, 0]
+
+
+def flush_run_writes(run_dir: Optional[Path] = None) -> None:
+    """Commit the running totals `note_run_write` collected, for `run_dir` or for every run."""
+    with _PENDING_LOCK:
+        if run_dir is None:
+            pending = dict(_PENDING_WRITES)
+            _PENDING_WRITES.clear()
+        else:
+            key = os.path.abspath(run_dir)
+            item = _PENDING_WRITES.pop(key, None)
+            pending = {key: item} if item is not None else {}
+    by_root: Dict[Path, List[Tuple[str, str, int, int, int]]] = {}
+    for key, (before, after, delta) in pending.items():
+        if before is not None:
+            path = Path(key)
+            by_root.setdefault(path.parent.parent, []).append(
+                (path.parent.name, path.name, delta, before, after)
+            )
+    for output_root, rows in by_root.items():
+        try:
+            with RunCatalog(output_root) as catalog:
+                catalog.add_sizes(rows)
+        except (OSError, sqlite3.Error, CatalogError):
+            continue
+
+
+atexit.register(flush_run_writes)
+
+
+def note_run_access(run_dir: Path) -> None:
+    """Stamp the run's last-access time in the catalog for LRU retention.
+
+    Like `note_run_write`, this is best-effort and never fails the reader.
+    """
+    run_dir = Path(run_dir)
+    output_root = run_dir.parent.parent
+    if not catalog_path(output_root).exists():
+        return
+    try:
+        with RunCatalog(output_root) as catalog:
+            catalog.touch_runs(
+                [(run_dir.parent.name, run_dir.name)], datetime.now(timezone.utc).isoformat()
+            )
+    except (OSError, sqlite3.Error, CatalogError):
+        return
+
+
+__all__ = [
+    "CATALOG_FILENAME",
+    "CatalogEntry",
+    "CatalogError",
+    "RunCatalog",
+    "SIZE_STAMP_FILENAME",
+    "catalog_path",
+    "decode_cursor",
+    "encode_cursor",
+    "flush_run_writes",
+    "iter_run_dirs",
+    "note_run_access",
+    "note_run_write",
+    "read_run_meta",
+    "run_dir_mtime_ns",
+]
@@ -3,57 +3,77 @@
 Studio run instruction helper.
 
 Prepares per-phase Cascade instructions, creates run directories, and keeps
-output/index.md in sync so every Studio request can be executed agentically
-through Cascade (no CLI round trips required).
+the run index (monthly shards under output/index/<phase>/ plus the
+output/index.md summary) in sync so every Studio request can be executed
+agentically through Cascade (no CLI round trips required).
 """
 from __future__ import annotations
 
 import argparse
+import contextlib
+import importlib
 import json
 import os
+import re
 import sys
 import textwrap
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Sequence, Tuple
+from string import Template
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from atomic_io import atomic_write_text, file_lock, locked_append_text
+from run_catalog import CatalogEntry, RunCatalog, note_run_access
+
+if TYPE_CHECKING:
+    from run_phase_roles import RoleDetails
+
+# Subcommand dependencies are imported where they are used so a `finalize`
+# does not pay for scopes/rerun/validator/TOML imports it never touches.
+# These names stay reachable as `run_phase.<name>` for existing callers.
+_LAZY_EXPORTS = {
+    "cleanup_runs": "cleanup",
+    "format_bytes": "cleanup",
+    "invalidate_snapshot": "cleanup",
+    "load_cleanup_settings": "cleanup",
+    "refresh_run_size": "cleanup",
+    "scan_runs": "cleanup",
+    "RoleConfigError": "run_phase_roles",
+    "RoleDetails": "run_phase_roles",
+    "build_role_details": "run_phase_roles",
+    "collect_role_artifacts": "run_phase_roles",
+    "default_role_pack_name": "run_phase_roles",
+    "load_manifest": "run_phase_roles",
+    "load_role_pack": "run_phase_roles",
+    "normalize_role_filename": "run_phase_roles",
+    "parse_iteration_from_filename": "run_phase_roles",
+    "resolve_role_list": "run_phase_roles",
+    "allocate_iterations": "scopes",
+    "generate_scope_instructions": "scopes",
+    "load_scopes_config": "scopes",
+    "detect_rerun_mode": "rerun",
+    "generate_rerun_instructions": "rerun",
+    "load_rejection_context": "rerun",
+    "DocumentValidator": "validators.document_validator",
+    "CodeValidator": "validators.code_validator",
+}
 
-from cleanup import (
-    cleanup_runs,
-    format_bytes,
-    load_cleanup_settings,
-)
-from run_phase_roles import (
-    RoleConfigError,
-    RoleDetails,
-    build_role_details,
-    collect_role_artifacts,
-    default_role_pack_name,
-    load_manifest,
-    load_role_pack,
-    normalize_role_filename,
-    parse_iteration_from_filename,
-    resolve_role_list,
-)
-from scopes import (
-    allocate_iterations,
-    generate_scope_instructions,
-    load_scopes_config,
-)
-from rerun import (
-    detect_rerun_mode,
-    generate_rerun_instructions,
-    load_rejection_context,
-)
-from validators.document_validator import DocumentValidator
-from validators.code_validator import CodeValidator
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name), name)
 
 
 def get_storage_stats() -> dict:
     """Get simple storage statistics for user awareness."""
+    from cleanup import load_cleanup_settings, scan_runs
+
     try:
-        from cleanup import _collect_runs
         output_root = get_output_root()
-        runs = _collect_runs(output_root)
+        settings = load_cleanup_settings(get_studio_root())
+        runs = scan_runs(output_root, size_workers=settings.size_workers).records
         
         if not runs:
             return {
@@ -161,8 +181,18 @@ INDEX_HEADER = [
     "| --- | --- | --- | --- | --- | --- |",
 ]
 
+TOP_INDEX_HEADER = [
+    "# Studio Run Index",
+    "",
+    "| Phase | Month | Runs | Shard |",
+    "| --- | --- | --- | --- |",
+]
+INDEX_DIRNAME = "index"
+INDEX_LOCK_FILENAME = ".index.lock"
+
 CLEANUP_SKIP_ENV = "STUDIO_SKIP_CLEANUP"
 CLEANUP_DRY_ENV = "STUDIO_CLEANUP_DRY_RUN"
+CLEANUP_LOG_FILENAME = ".cleanup.log"
 ARTIFACT_ROOT_ENV = "STUDIO_ARTIFACT_ROOT"
 
 PREPARE_OPTION_FLAGS = {
@@ -178,7 +208,7 @@ PREPARE_OPTION_FLAGS = {
     "--cleanup-dry-run",
 }
 
-SUBCOMMANDS = {"prepare", "finalize", "cleanup", "validate"}
+SUBCOMMANDS = {"prepare", "finalize", "cleanup", "validate", "reindex", "dedupe", "pin", "list", "serve"}
 
 
 def _resolve_env_path(value: str) -> Path:
@@ -237,30 +267,80 @@ def sanitize_cell(text: str) -> str:
 
 
 def write_json(path: Path, payload: Dict) -> None:
-    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    atomic_write_text(path, json.dumps(payload, indent=2) + "\n")
 
 
 def load_json(path: Path) -> Dict:
     return json.loads(path.read_text(encoding="utf-8"))
 
 
+def open_catalog(base_output: Path | None = None) -> RunCatalog:
+    return RunCatalog(base_output or get_output_root())
+
+
+def record_run(meta: Dict, *, accessed: bool = False) -> None:
+    """Upsert a run's metadata into the catalog and drop the stale in-process snapshot.
+
+    `accessed` also stamps the run's last-access time (for LRU cleanup) in the same write.
+    """
+    record_runs([meta], accessed=accessed)
+
+
+def record_runs(metas: Sequence[Dict], *, accessed: bool = False) -> None:
+    from cleanup import invalidate_snapshot
+
+    base_output = get_output_root()
+    with open_catalog(base_output) as catalog:
+        catalog.upsert_runs(
+            [(meta["phase"], meta["run_id"], meta) for meta in metas],
+            accessed_iso=utc_now().isoformat() if accessed else None,
+        )
+    invalidate_snapshot(base_output)
+
+
 def collect_runs(base_output: Path) -> List[Dict]:
     entries: List[Dict] = []
     if not base_output.exists():
         return entries
 
-    for phase_dir in sorted(base_output.iterdir()):
-        if not phase_dir.is_dir():
-            continue
-        for run_dir in sorted(phase_dir.glob("run_*")):
-            meta_path = run_dir / "run.json"
-            if meta_path.exists():
-                meta = load_json(meta_path)
-                meta["run_dir"] = run_dir.as_posix()
-                entries.append(meta)
+    with open_catalog(base_output) as catalog:
+        for entry in catalog.list_runs():
+            if entry.meta is None:
+                continue
+            meta = index_entry(entry)
+            meta["run_dir"] = entry.run_dir.as_posix()
+            entries.append(meta)
     return entries
 
 
+def index_entry(entry: CatalogEntry) -> Dict:
+    """The index data for a catalogued run: its run.json, plus where its archive lives once archived."""
+    meta = dict(entry.meta or {})
+    if entry.archive is not None:
+        meta["archive_path"] = entry.archive.as_posix()
+    return meta
+
+
+def format_index_row(entry: Dict) -> str:
+    summary_cell = entry.get("summary_path") or "_pending_"
+    if entry.get("archive_path"):
+        # The summary went into the archive with the rest of the run.
+        summary_cell = f"[archive]({entry['archive_path']})"
+    elif summary_cell not in ("", "_pending_"):
+        summary_cell = f"[summary]({summary_cell})"
+    elif summary_cell == "":
+        summary_cell = "_pending_"
+
+    return "| {run_id} | {phase} | {created} | {status} | {input} | {summary} |".format(
+        run_id=entry["run_id"],
+        phase=entry["phase"],
+        created=entry.get("created_display", entry.get("created_iso", "")),
+        status=entry.get("status", "PENDING"),
+        input=sanitize_cell(entry.get("input", "")),
+        summary=summary_cell,
+    )
+
+
 def write_index(entries: List[Dict], index_path: Path) -> None:
     lines = INDEX_HEADER.copy()
     entries_sorted = sorted(
@@ -268,26 +348,122 @@ def write_index(entries: List[Dict], index_path: Path) -> None:
         key=lambda item: item.get("created_iso", ""),
         reverse=True,
     )
-    for entry in entries_sorted:
-        summary_cell = entry.get("summary_path") or "_pending_"
-        if summary_cell not in ("", "_pending_"):
-            summary_cell = f"[summary]({summary_cell})"
-        elif summary_cell == "":
-            summary_cell = "_pending_"
-
-        lines.append(
-            "| {run_id} | {phase} | {created} | {status} | {input} | {summary} |".format(
-                run_id=entry["run_id"],
-                phase=entry["phase"],
-                created=entry.get("created_display", entry.get("created_iso", "")),
-                status=entry.get("status", "PENDING"),
-                input=sanitize_cell(entry.get("input", "")),
-                summary=summary_cell,
-            )
+    lines.extend(format_index_row(entry) for entry in entries_sorted)
+    atomic_write_text(index_path, "\n".join(lines) + "\n")
+
+
+def _index_row_key(run_id: str, phase: str) -> str:
+    return f"| {run_id} | {phase} |"
+
+
+def _index_row_key_of(row: str) -> str:
+    parts = row.split(" | ", 2)
+    return f"{parts[0]} | {parts[1]} |" if len(parts) > 2 else row
+
+
+def _index_row_created(row: str) -> str:
+    # Created is the third cell; the cells before it never contain escaped pipes.
+    parts = row.split(" | ", 3)
+    return parts[2] if len(parts) > 3 else ""
+
+
+def _read_index_body(index_path: Path) -> str | None:
+    """Return the table rows of an existing index as text, or None if it is missing or corrupt."""
+    if not index_path.exists():
+        return None
+    try:
+        text = index_path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    header = "\n".join(INDEX_HEADER) + "\n"
+    if not text.startswith(header):
+        return None
+    body = text[len(header):]
+    if not body:
+        return body
+    # Every line must be a complete table row; counted with str methods to stay O(n) in C.
+    line_count = body.count("\n")
+    if not (
+        body.startswith("| ")
+        and body.endswith(" |\n")
+        and body.count(" |\n") == line_count
+        and body.count("\n| ") == line_count - 1
+    ):
+        return None
+    return body
+
+
+def _find_index_row(body: str, key: str) -> Tuple[int, int] | None:
+    if body.startswith(key):
+        start = 0
+    else:
+        start = body.find("\n" + key)
+        if start == -1:
+            return None
+        start += 1
+    return start, body.find("\n", start) + 1
+
+
+def update_index(
+    index_path: Path,
+    *,
+    rebuild_entries: Callable[[], List[Dict]],
+    upsert: Dict | None = None,
+    upserts: Sequence[Dict] = (),
+    remove: Sequence[Tuple[str, str]] = (),
+) -> None:
+    """Patch index rows in place, falling back to a full rewrite if the file is unusable.
+
+    `upsert` (and each of `upserts`) replaces the row for its run or inserts it
+    at its sorted position; `remove` drops rows by (phase, run_id).
+    `rebuild_entries` supplies every entry for the fallback rewrite, so it must
+    already reflect the change.
+    """
+    upserts = ([upsert] if upsert is not None else []) + list(upserts)
+    body = _read_index_body(index_path)
+    if body is None:
+        write_index(rebuild_entries(), index_path)
+        return
+
+    if remove:
+        removed_keys = {_index_row_key(run_id, phase) for phase, run_id in remove}
+        body = "".join(
+            row
+            for row in body.splitlines(keepends=True)
+            if _index_row_key_of(row) not in removed_keys
         )
 
-    index_path.parent.mkdir(parents=True, exist_ok=True)
-    index_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    for entry in upserts:
+        new_row = format_index_row(entry) + "\n"
+        span = _find_index_row(body, _index_row_key(entry["run_id"], entry["phase"]))
+        if span:
+            body = body[: span[0]] + new_row + body[span[1]:]
+        else:
+            body = _insert_index_row(body, new_row)
+
+    if not body and remove and not upserts:
+        index_path.unlink()
+        return
+    atomic_write_text(index_path, "\n".join(INDEX_HEADER) + "\n" + body)
+
+
+def _insert_index_row(body: str, new_row: str) -> str:
+    created = _index_row_created(new_row)
+    first_row = body[: body.find("\n") + 1]
+    if not body or _index_row_created(first_row) <= created:
+        # Common case: a freshly prepared run is the newest entry.
+        return new_row + body
+    rows = body.splitlines(keepends=True)
+    # Rows are newest first; binary search for the first row not newer than ours.
+    lo, hi = 0, len(rows)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _index_row_created(rows[mid]) > created:
+            lo = mid + 1
+        else:
+            hi = mid
+    rows.insert(lo, new_row)
+    return "".join(rows)
 
 
 def _env_flag(name: str) -> bool:
@@ -295,6 +471,8 @@ def _env_flag(name: str) -> bool:
 
 
 def _log_cleanup_report(report) -> None:
+    from cleanup import format_bytes
+
     if report.total_runs == 0:
         print("Cleanup: no prior runs detected.")
         return
@@ -303,6 +481,20 @@ def _log_cleanup_report(report) -> None:
         f"Cleanup: scanned {report.total_runs} runs "
         f"({format_bytes(report.total_size_bytes)})"
     )
+    if report.archivals:
+        uncompressed, compressed = report.archived_bytes
+        if report.dry_run:
+            print(f"- Would archive {len(report.archivals)} runs ({format_bytes(uncompressed)})")
+        else:
+            print(
+                f"- Archived {len(report.archivals)} runs "
+                f"({format_bytes(uncompressed)} -> {format_bytes(compressed)})"
+            )
+    if report.blobs_removed:
+        print(
+            f"- Removed {report.blobs_removed} unreferenced blobs "
+            f"({format_bytes(report.blob_bytes_freed)})"
+        )
     if report.deletions:
         reason_counts = report.reasons_summary()
         reason_str = ", ".join(f"{k}={v}" for k, v in sorted(reason_counts.items()))
@@ -311,19 +503,99 @@ def _log_cleanup_report(report) -> None:
             f"- {verb} {len(report.deletions)} runs "
             f"({format_bytes(report.freed_bytes)}) [{reason_str}]"
         )
+        if not report.dry_run:
+            seconds = report.timings.get("delete", 0.0) + report.timings.get("reap", 0.0)
+            runs_per_second, bytes_per_second = report.deletion_throughput
+            print(
+                f"- Deletion took {seconds:.2f}s "
+                f"({runs_per_second:.0f} runs/s, {format_bytes(int(bytes_per_second))}/s)"
+            )
     else:
         print("- No deletions required.")
+    if report.deferred:
+        print(f"- Deferred {report.deferred} cleanup actions to the next pass (time budget reached).")
+    if report.unsized:
+        print(f"- Deferred sizing {report.unsized} changed runs to the next pass (time budget reached).")
+    if report.trash_pending:
+        print(f"- {report.trash_pending} deleted runs are still waiting in the trash for the next pass.")
+    if report.trash_failed:
+        print(
+            f"- {report.trash_failed} deleted runs could not be removed; "
+            "they are set aside in .trash/failed/ for manual cleanup."
+        )
     if report.errors:
         for msg in report.errors:
             print(f"- Cleanup warning: {msg}")
 
 
-def _maybe_run_cleanup(*, dry_run: bool = False) -> None:
+def _maybe_run_cleanup(
+    *, dry_run: bool = False, refresh: bool = True, time_boxed: bool = False
+) -> List[Tuple[str, str, str]]:
+    """Run cleanup and return removed (phase, run_id, month) runs.
+
+    With `refresh=False` the index is left for the caller to update alongside
+    its own changes. `time_boxed` passes (the ones `prepare` runs) stop after
+    `prepare_time_budget_ms` and skip cleanup entirely while another pass
+    holds the cleanup lock, so a large backlog never delays run creation.
+    """
+    from cleanup import CLEANUP_LOCK_FILENAME, cleanup_runs, load_cleanup_settings
+
     studio_root = get_studio_root()
     output_root = get_output_root()
     settings = load_cleanup_settings(studio_root)
-    report = cleanup_runs(output_root, settings, dry_run=dry_run)
+    time_budget = settings.prepare_time_budget if time_boxed else None
+    with file_lock(output_root / CLEANUP_LOCK_FILENAME, blocking=not time_boxed) as acquired:
+        if not acquired:
+            print("Cleanup: another cleanup pass is running; skipped.")
+            return []
+        report = cleanup_runs(output_root, settings, dry_run=dry_run, time_budget=time_budget)
     _log_cleanup_report(report)
+    if not report.complete and settings.background_cleanup:
+        _spawn_background_cleanup(output_root)
+    archived = [
+        {**record.run.meta, "archive_path": record.archive.as_posix()}
+        for record in report.archivals
+        if record.compressed_bytes is not None and record.run.meta is not None
+    ]
+    if archived:
+        # Archiving keeps the run, so only its row's link changes.
+        refresh_index(upserts=archived, counts_changed=False)
+    removed: List[Tuple[str, str, str]] = []
+    if report.deletions and not dry_run:
+        removed = [
+            (record.run.phase, record.run.run_id, record.run.created_at.strftime("%Y-%m"))
+            for record in report.deletions
+            if not record.run.path.exists()
+        ]
+        if refresh:
+            refresh_index(removed=removed)
+    return removed
+
+
+def _spawn_background_cleanup(output_root: Path) -> None:
+    """Finish a deferred cleanup in a detached `run_phase.py cleanup` process.
+
+    The child waits for the cleanup lock, so at most one full pass runs at a
+    time; its output goes to `.cleanup.log` in the output root.
+    """
+    import subprocess
+
+    env = dict(os.environ)
+    env[ARTIFACT_ROOT_ENV] = str(get_artifact_root())
+    try:
+        with open(output_root / CLEANUP_LOG_FILENAME, "a", encoding="utf-8") as log:
+            subprocess.Popen(
+                [sys.executable, str(Path(__file__).resolve()), "cleanup"],
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                env=env,
+                start_new_session=True,
+            )
+    except OSError as exc:
+        print(f"- Cleanup warning: failed to start background cleanup: {exc}")
+        return
+    print("- Finishing cleanup in the background.")
 
 
 def _ensure_summary_path(meta: Dict, run_dir: Path) -> Path:
@@ -343,6 +615,8 @@ def _validate_artifacts(
     missing_roles: List[str] = []
 
     if phase == "studio":
+        from run_phase_roles import collect_role_artifacts, parse_iteration_from_filename
+
         studio_meta = (meta or {}).get("studio_roles") or {}
         invited_roles = studio_meta.get("invited") or []
         if not invited_roles:
@@ -402,9 +676,6 @@ def _validate_artifacts(
 
 def _append_run_log(meta: Dict) -> None:
     log_path = get_knowledge_log_path()
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    if not log_path.exists():
-        log_path.write_text("# Studio Run Log\n\n", encoding="utf-8")
 
     summary_path = meta.get("summary_path", "")
     summary_cell = (
@@ -419,35 +690,115 @@ def _append_run_log(meta: Dict) -> None:
         f"- Summary: {summary_cell}",
         "",
     ]
-    with log_path.open("a", encoding="utf-8") as log_file:
-        log_file.write("\n".join(lines))
+    locked_append_text(log_path, "\n".join(lines), header="# Studio Run Log\n\n")
+
+
+# Run-specific fields of the instruction doc; everything else is precompiled.
+_INSTRUCTION_FIELDS = ("run_id", "run_dir", "max_iterations", "input", "budget_cap", "created", "rerun")
+INSTRUCTION_TEMPLATE_CACHE_SIZE = 64
+_WHITESPACE_ONLY_LINE = re.compile(r"^[ \t]+$", re.MULTILINE)
+_INSTRUCTION_TEMPLATES: Dict[Tuple, Template] = {}
 
 
 def build_instruction_doc(
     meta: Dict, run_dir: Path, studio_roles: List[RoleDetails] | None = None,
     scopes_config=None, scopes_allocations: Dict[str, int] | None = None
 ) -> str:
+    """Render instructions.md for a run.
+
+    The phase, role menu and scope sections only depend on (phase, role pack,
+    scopes config), so they are compiled once into a `string.Template` and a
+    prepare only substitutes the run's own fields and rerun context.
+    """
+    from rerun import detect_rerun_mode, generate_rerun_instructions
+
+    rerun = ""
+    if detect_rerun_mode(run_dir):
+        rerun = "\n" + "\n".join([generate_rerun_instructions(run_dir), ""])
+    values = {
+        "run_id": meta["run_id"],
+        "run_dir": run_dir.as_posix(),
+        "max_iterations": str(meta["max_iterations"]),
+        "input": str(meta["input"]),
+        "budget_cap": str(meta.get("budget_cap", "")),
+        "created": str(meta["created_display"]),
+        "rerun": rerun,
+    }
+    template = _instruction_template(meta, studio_roles, scopes_config, scopes_allocations)
+    doc = template.substitute(values)
+    if any("\n" in value for value in values.values()):
+        # The doc starts with an unindented heading, so the dedent applied to the
+        # static text only blanks whitespace-only lines; do the same for the values.
+        doc = _WHITESPACE_ONLY_LINE.sub("", doc)
+    return doc
+
+
+def _instruction_template(
+    meta: Dict,
+    studio_roles: List[RoleDetails] | None,
+    scopes_config,
+    scopes_allocations: Dict[str, int] | None,
+) -> Template:
     phase = meta["phase"]
+    studio_info = meta.get("studio_roles") or {}
+    key = (
+        phase,
+        studio_info.get("pack"),
+        tuple(studio_info.get("overrides") or []),
+        repr(studio_roles),
+        repr(scopes_config),
+        repr(sorted((scopes_allocations or {}).items())),
+    )
+    template = _INSTRUCTION_TEMPLATES.get(key)
+    if template is not None:
+        return template
+
+    scope_text = None
+    if scopes_config and scopes_allocations:
+        from scopes import generate_scope_instructions
+
+        scope_text = generate_scope_instructions(scopes_config, scopes_allocations)
+    markers = {name: f"\0{name}\0" for name in _INSTRUCTION_FIELDS}
+    text = _compose_instruction_doc(phase, markers, studio_info, studio_roles, scope_text)
+    text = text.replace("$", "$$")
+    for name, marker in markers.items():
+        text = text.replace(marker, "${" + name + "}")
+    template = Template(text)
+    if len(_INSTRUCTION_TEMPLATES) >= INSTRUCTION_TEMPLATE_CACHE_SIZE:
+        _INSTRUCTION_TEMPLATES.clear()
+    _INSTRUCTION_TEMPLATES[key] = template
+    return template
+
+
+def _compose_instruction_doc(
+    phase: str,
+    values: Dict[str, str],
+    studio_info: Dict,
+    studio_roles: List[RoleDetails] | None,
+    scope_text: str | None,
+) -> str:
+    """Lay out the instruction doc from `values` (real values or template markers)."""
+    from run_phase_roles import normalize_role_filename
+
     info = PHASE_DETAILS[phase]
-    rel_dir = run_dir.as_posix()
+    rel_dir = values["run_dir"]
     base_section = [
-        f"# Studio Cascade Instructions — {meta['run_id']}",
+        f"# Studio Cascade Instructions — {values['run_id']}",
         "",
         f"- **Phase:** {phase.title()}",
         f"- **Run directory:** `{rel_dir}`",
-        f"- **Max iterations:** {meta['max_iterations']}",
-        f"- **Input:** {meta['input']}",
+        f"- **Max iterations:** {values['max_iterations']}",
+        f"- **Input:** {values['input']}",
     ]
     if phase == "studio":
-        base_section.append(f"- **Budget Cap:** {meta['budget_cap']}")
-        studio_info = meta.get("studio_roles") or {}
+        base_section.append(f"- **Budget Cap:** {values['budget_cap']}")
         pack = studio_info.get("pack", "n/a")
         overrides = studio_info.get("overrides") or []
         overrides_display = ", ".join(overrides) if overrides else "none"
         base_section.append(f"- **Role pack:** {pack} (overrides: {overrides_display})")
     base_section.extend(
         [
-            f"- **Created:** {meta['created_display']} (UTC)",
+            f"- **Created:** {values['created']} (UTC)",
             "- **Artifacts:**",
         ]
     )
@@ -474,16 +825,8 @@ def build_instruction_doc(
 
     # Add scope instructions if scopes are configured
     scope_section: List[str] = []
-    if scopes_config and scopes_allocations:
-        scope_instructions = generate_scope_instructions(scopes_config, scopes_allocations)
-        scope_section.append(scope_instructions)
-    
-    # Add rerun context if previous rejections exist
-    rerun_section: List[str] = []
-    if detect_rerun_mode(run_dir):
-        rerun_instructions = generate_rerun_instructions(run_dir)
-        rerun_section.append(rerun_instructions)
-        rerun_section.append("")
+    if scope_text:
+        scope_section.append(scope_text)
 
     roles_section = [
         "",
@@ -591,7 +934,7 @@ def build_instruction_doc(
     finalize_snippet = textwrap.dedent(
         f"""
         ```
-        python run_phase.py finalize --phase {phase} --run-id {meta['run_id']} --status completed --verdict <APPROVED|REJECTED|N/A>
+        python run_phase.py finalize --phase {phase} --run-id {values['run_id']} --status completed --verdict <APPROVED|REJECTED|N/A>
         ```
         """
     ).strip()
@@ -603,70 +946,140 @@ def build_instruction_doc(
         "- Summarize the entire run (inputs, iterations, verdict, key recommendations, next actions) in `summary.md`.",
         "- When finished, finalize the index entry:",
         finalize_snippet,
-        "- `finalize` will update `output/index.md` so other projects can discover this run.",
+        f"- `finalize` will update this run's row in `output/{INDEX_DIRNAME}/{phase}/<YYYY-MM>.md`, "
+        "which `output/index.md` links to, so other projects can discover this run.",
     ]
 
-    return (
-        textwrap.dedent(
-            "\n".join(
-                base_section
-                + scope_section
-                + rerun_section
-                + roles_section
-                + loop_section
-                + role_menu_section
-                + integrator_duel_section
-                + summary_section
-            )
-        ).strip()
-        + "\n"
+    # Rerun context (if previous rejections exist) follows the scopes section.
+    head = "\n".join(base_section + scope_section)
+    tail = "\n".join(
+        roles_section
+        + loop_section
+        + role_menu_section
+        + integrator_duel_section
+        + summary_section
     )
+    return textwrap.dedent(head + values["rerun"] + "\n" + tail).strip() + "\n"
 
 
 def prepare_run(args: argparse.Namespace) -> str:
-    phase = args.phase.lower()
-    if phase not in PHASE_DETAILS:
-        raise ValueError(f"Unsupported phase '{phase}'.")
-    text = args.text.strip()
-    if not text:
-        raise ValueError("Input text cannot be empty.")
+    if getattr(args, "batch", None):
+        manifest = prepare_batch(args)
+        return manifest["runs"][-1]["run_id"] if manifest["runs"] else ""
+
+    phase, text = _validate_prepare_input(args.phase, args.text)
 
     skip_cleanup = getattr(args, "skip_cleanup", False) or _env_flag(CLEANUP_SKIP_ENV)
     cleanup_dry = getattr(args, "cleanup_dry_run", False) or _env_flag(CLEANUP_DRY_ENV)
     if not skip_cleanup:
-        _maybe_run_cleanup(dry_run=cleanup_dry)
+        _maybe_run_cleanup(dry_run=cleanup_dry, time_boxed=True)
 
-    now = utc_now()
-    timestamp_slug = now.strftime("%Y%m%d_%H%M%S")
-    run_id = f"run_{phase}_{timestamp_slug}"
-    run_dir = get_output_root() / phase / run_id
+    # Add storage information for user awareness
+    storage_stats = get_storage_stats()
+    meta, run_dir, instructions_path = _create_run(args, phase, text, storage_stats)
+    record_run(meta)
+    refresh_index(upsert=meta)
+
+    run_id = meta["run_id"]
+    scopes_meta = meta.get("scopes")
+    print(f"Prepared {run_id} ({phase})")
+    print(f"- Run directory: {run_dir.resolve()}")
+    print(f"- Instructions: {instructions_path.resolve()}")
     
-    # Check for concurrent run collision BEFORE creating directory
-    if run_dir.exists():
-        raise RuntimeError(
-            f"Run directory {run_id} already exists. "
-            f"This may be due to concurrent prepare commands or a timestamp collision. "
-            f"Wait 1 second and retry, or use a different phase/text combination."
-        )
+    # Contextual hints for feature discovery
+    if scopes_meta:
+        print(f"\n💡 Tip: Scopes are active. Work through {scopes_meta['scopes'][0]['name']} scope first.")
+    else:
+        print(f"\n💡 Tip: Want to optimize iteration budgets? Create .studio/scopes.toml")
+        print(f"   See: docs/SCOPES_GUIDE.md")
     
-    run_dir.mkdir(parents=True, exist_ok=False)
-    run_dir_abs = run_dir.resolve()
+    # Storage awareness hint
+    if storage_stats.get("cleanup_suggested", False):
+        print(f"\n🧹 Storage Tip: You have {storage_stats['total_size_mb']}MB of Studio artifacts")
+        print(f"   (oldest: {storage_stats['oldest_artifact_days']} days ago). Consider cleanup:")
+        print(f"   python run_phase.py cleanup --dry-run  # Preview what would be deleted")
+        print(f"   python run_phase.py cleanup           # Execute cleanup")
+    
+    return run_id
+
+
+RUN_ID_MAX_ATTEMPTS = 10_000
+_LAST_RUN_STAMPS: Dict[str, datetime] = {}
+
+
+def allocate_run_dir(output_root: Path, phase: str, now: datetime) -> Tuple[str, Path]:
+    """Create a fresh run directory for `phase` and return (run_id, run_dir).
+
+    Run ids are `run_<phase>_<YYYYmmdd_HHMMSS>_<microseconds>`, so they sort by
+    creation time. Each candidate is claimed with a plain `mkdir`, which is
+    atomic: a prepare that loses a race (in this or another process) steps to
+    the next microsecond and tries again instead of failing.
+    """
+    phase_dir = output_root / phase
+    phase_dir.mkdir(parents=True, exist_ok=True)
+    stamp = now
+    last = _LAST_RUN_STAMPS.get(phase)
+    if last is not None and stamp <= last:
+        stamp = last + timedelta(microseconds=1)
+    for _ in range(RUN_ID_MAX_ATTEMPTS):
+        run_id = f"run_{phase}_{stamp.strftime('%Y%m%d_%H%M%S_%f')}"
+        run_dir = phase_dir / run_id
+        try:
+            run_dir.mkdir()
+        except FileExistsError:
+            stamp += timedelta(microseconds=1)
+            continue
+        _LAST_RUN_STAMPS[phase] = stamp
+        return run_id, run_dir
+    raise RuntimeError(
+        f"Could not allocate a run directory under {phase_dir} after "
+        f"{RUN_ID_MAX_ATTEMPTS} attempts."
+    )
+
+
+def _validate_prepare_input(phase: str | None, text: str | None) -> Tuple[str, str]:
+    phase = (phase or "").lower()
+    if phase not in PHASE_DETAILS:
+        raise ValueError(f"Unsupported phase '{phase}'.")
+    text = (text or "").strip()
+    if not text:
+        raise ValueError("Input text cannot be empty.")
+    return phase, text
+
+
+def _create_run(
+    args: argparse.Namespace, phase: str, text: str, storage_stats: Dict
+) -> Tuple[Dict, Path, Path]:
+    """Create one run directory with its instructions and run.json.
+
+    Catalog and index updates are left to the caller so batches can apply
+    them once.
+    """
+    now = utc_now()
+    run_id, run_dir = allocate_run_dir(get_output_root(), phase, now)
 
     studio_role_meta: Dict | None = None
     studio_role_details: List[RoleDetails] | None = None
     if phase == "studio":
+        from run_phase_roles import (
+            RoleConfigError,
+            default_role_pack_name,
+            load_manifest,
+            resolve_role_details,
+        )
+
         studio_root = get_studio_root()
         manifest = load_manifest(studio_root)
         try:
             pack_name = args.role_pack or default_role_pack_name(manifest)
-            pack_data = load_role_pack(studio_root, pack_name)
             overrides = list(args.roles or [])
-            invited_roles = resolve_role_list(manifest, pack_data, overrides)
+            invited_roles, studio_role_details = resolve_role_details(
+                studio_root, pack_name, overrides
+            )
             if not invited_roles:
                 raise RoleConfigError(
                     "Studio role selection resolved to zero roles. Adjust the pack or overrides."
                 )
-            studio_role_details = build_role_details(manifest, invited_roles)
             studio_role_meta = {
                 "pack": pack_name,
                 "overrides": overrides,
@@ -698,6 +1111,8 @@ def prepare_run(args: argparse.Namespace) -> str:
             scopes_path = default_scopes if default_scopes.exists() else None
         
         if scopes_path:
+            from scopes import allocate_iterations, load_scopes_config
+
             try:
                 scopes_config = load_scopes_config(scopes_path)
                 scopes_allocations = allocate_iterations(scopes_config, args.max_iterations)
@@ -755,40 +1170,114 @@ def prepare_run(args: argparse.Namespace) -> str:
     if scopes_meta:
         meta["scopes"] = scopes_meta
     
-    # Add storage information for user awareness
-    storage_stats = get_storage_stats()
     meta["storage"] = storage_stats
     
     instructions = build_instruction_doc(meta, run_dir, studio_role_details, scopes_config, scopes_allocations)
     instructions_path = run_dir / "instructions.md"
     instructions_path.write_text(instructions, encoding="utf-8")
-    instructions_abs_path = instructions_path.resolve()
-
     write_json(run_dir / "run.json", meta)
-    rebuild_index()
+    return meta, run_dir, instructions_path
+
+
+BATCH_FIELDS = (
+    "phase",
+    "text",
+    "budget",
+    "max_iterations",
+    "role_pack",
+    "roles",
+    "scopes",
+    "no_scopes",
+)
 
-    print(f"Prepared {run_id} ({phase})")
-    print(f"- Run directory: {run_dir_abs}")
-    print(f"- Instructions: {instructions_abs_path}")
-    
-    # Contextual hints for feature discovery
-    if scopes_meta:
-        print(f"\n💡 Tip: Scopes are active. Work through {scopes_meta['scopes'][0]['name']} scope first.")
-    else:
-        print(f"\n💡 Tip: Want to optimize iteration budgets? Create .studio/scopes.toml")
-        print(f"   See: docs/SCOPES_GUIDE.md")
-    
-    # Storage awareness hint
-    if storage_stats.get("cleanup_suggested", False):
-        print(f"\n🧹 Storage Tip: You have {storage_stats['total_size_mb']}MB of Studio artifacts")
-        print(f"   (oldest: {storage_stats['oldest_artifact_days']} days ago). Consider cleanup:")
-        print(f"   python run_phase.py cleanup --dry-run  # Preview what would be deleted")
-        print(f"   python run_phase.py cleanup           # Execute cleanup")
-    
-    return run_id
+
+def load_batch_requests(batch_path: Path, defaults: argparse.Namespace) -> List[argparse.Namespace]:
+    """Parse a JSONL batch file into per-run prepare arguments.
+
+    Each line is a JSON object using the `prepare` flag names (`phase`, `text`,
+    `budget`, `max_iterations`, `role_pack`, `roles`, `scopes`, `no_scopes`);
+    fields a line omits fall back to the command-line values. Every line is
+    validated before any run is created.
+    """
+    try:
+        lines = Path(batch_path).read_text(encoding="utf-8").splitlines()
+    except OSError as exc:
+        raise RuntimeError(f"Failed to read batch file {batch_path}: {exc}") from exc
+
+    requests: List[argparse.Namespace] = []
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f"{batch_path}:{line_no}: invalid JSON ({exc})") from exc
+        if not isinstance(item, dict):
+            raise ValueError(f"{batch_path}:{line_no}: expected a JSON object")
+        unknown = sorted(set(item) - set(BATCH_FIELDS))
+        if unknown:
+            raise ValueError(f"{batch_path}:{line_no}: unknown fields {', '.join(unknown)}")
+        values = {field: item.get(field, getattr(defaults, field, None)) for field in BATCH_FIELDS}
+        if isinstance(values["roles"], str):
+            values["roles"] = values["roles"].split()
+        try:
+            values["phase"], values["text"] = _validate_prepare_input(values["phase"], values["text"])
+        except ValueError as exc:
+            raise ValueError(f"{batch_path}:{line_no}: {exc}") from exc
+        if values["max_iterations"] is None:
+            values["max_iterations"] = 3
+        requests.append(argparse.Namespace(**values))
+    return requests
+
+
+def prepare_batch(args: argparse.Namespace) -> Dict:
+    """Create every run listed in `args.batch` with one cleanup pass and one index update.
+
+    Progress goes to stderr; the JSON manifest of created runs is printed to
+    stdout (and written to `args.manifest` when given).
+    """
+    requests = load_batch_requests(args.batch, args)
+    skip_cleanup = getattr(args, "skip_cleanup", False) or _env_flag(CLEANUP_SKIP_ENV)
+    cleanup_dry = getattr(args, "cleanup_dry_run", False) or _env_flag(CLEANUP_DRY_ENV)
+
+    created: List[Tuple[Dict, Path, Path]] = []
+    removed: List[Tuple[str, str, str]] = []
+    with contextlib.redirect_stdout(sys.stderr):
+        if not skip_cleanup:
+            removed = _maybe_run_cleanup(dry_run=cleanup_dry, refresh=False, time_boxed=True)
+        storage_stats = get_storage_stats()
+        try:
+            for request in requests:
+                created.append(_create_run(request, request.phase, request.text, storage_stats))
+                print(f"Prepared {created[-1][0]['run_id']} ({request.phase})")
+        finally:
+            # Runs created before a failure still get catalogued and indexed.
+            metas = [meta for meta, _, _ in created]
+            if metas:
+                record_runs(metas)
+            if metas or removed:
+                refresh_index(upserts=metas, removed=removed)
+
+    manifest = {
+        "runs": [
+            {
+                "run_id": meta["run_id"],
+                "phase": meta["phase"],
+                "run_dir": run_dir.resolve().as_posix(),
+                "instructions": instructions_path.resolve().as_posix(),
+            }
+            for meta, run_dir, instructions_path in created
+        ]
+    }
+    if getattr(args, "manifest", None):
+        write_json(Path(args.manifest), manifest)
+    print(json.dumps(manifest, indent=2))
+    return manifest
 
 
 def finalize_run(args: argparse.Namespace) -> None:
+    from cleanup import load_cleanup_settings, refresh_run_size
+
     phase = args.phase.lower()
     run_id = args.run_id
     run_dir = get_output_root() / phase / run_id
@@ -823,7 +1312,13 @@ def finalize_run(args: argparse.Namespace) -> None:
     meta["updated_iso"] = utc_now().isoformat(timespec="seconds")
 
     write_json(meta_path, meta)
-    rebuild_index()
+    record_run(meta, accessed=True)
+    if load_cleanup_settings(get_studio_root()).dedupe_artifacts:
+        from blob_store import dedupe_run
+
+        dedupe_run(run_dir, get_output_root())
+    refresh_run_size(get_output_root(), phase, run_id)
+    refresh_index(upsert=meta, counts_changed=False)
     _append_run_log(meta)
 
     print(f"Finalized {run_id} ({phase}) → {meta['status']}")
@@ -842,10 +1337,227 @@ def finalize_run(args: argparse.Namespace) -> None:
         print(f"   3. Rerun will automatically inject failure context")
 
 
+def index_shard_path(base_output: Path, phase: str, month: str) -> Path:
+    return base_output / INDEX_DIRNAME / phase / f"{month}.md"
+
+
+def _shard_entries(base_output: Path, phase: str, month: str) -> List[Dict]:
+    with open_catalog(base_output) as catalog:
+        entries = catalog.list_runs(phase, month=month)
+    return [index_entry(entry) for entry in entries if entry.meta is not None]
+
+
+def write_top_index(base_output: Path, month_counts: Iterable[Tuple[str, str, int]]) -> None:
+    lines = TOP_INDEX_HEADER.copy()
+    for phase, month, count in month_counts:
+        shard = f"{INDEX_DIRNAME}/{phase}/{month}.md"
+        lines.append(f"| {phase} | {month} | {count} | [{shard}]({shard}) |")
+    atomic_write_text(base_output / "index.md", "\n".join(lines) + "\n")
+
+
+def refresh_index(
+    *,
+    upsert: Dict | None = None,
+    upserts: Sequence[Dict] = (),
+    removed: Sequence[Tuple[str, str, str]] = (),
+    counts_changed: bool = True,
+) -> None:
+    """Update only the shards touched by upserted runs and/or removed (phase, run_id, month) runs."""
+    base_output = get_output_root()
+    by_shard: Dict[Tuple[str, str], Tuple[List[Dict], List[Tuple[str, str]]]] = {}
+    for phase, run_id, month in removed:
+        by_shard.setdefault((phase, month), ([], []))[1].append((phase, run_id))
+    for meta in ([upsert] if upsert is not None else []) + list(upserts):
+        by_shard.setdefault((meta["phase"], meta["created_iso"][:7]), ([], []))[0].append(meta)
+
+    with index_lock(base_output):
+        for (phase, month), (shard_upserts, remove) in by_shard.items():
+            update_index(
+                index_shard_path(base_output, phase, month),
+                rebuild_entries=lambda phase=phase, month=month: _shard_entries(base_output, phase, month),
+                upserts=shard_upserts,
+                remove=remove,
+            )
+
+        if counts_changed or not (base_output / "index.md").exists():
+            with open_catalog(base_output) as catalog:
+                write_top_index(base_output, catalog.month_counts())
+
+
+def index_lock(base_output: Path):
+    """Exclusive lock serialising index updates across processes."""
+    return file_lock(base_output / INDEX_LOCK_FILENAME)
+
+
 def rebuild_index() -> None:
+    """Rewrite every index shard and the top-level index from the run snapshot."""
+    from cleanup import scan_runs
+
     base_output = get_output_root()
-    entries = collect_runs(base_output)
-    write_index(entries, base_output / "index.md")
+    shards: Dict[Path, List[Dict]] = {}
+    month_counts: Dict[Tuple[str, str], int] = {}
+    for entry in scan_runs(base_output).entries:
+        if entry.meta is None:
+            continue
+        month = entry.created_iso[:7]
+        shards.setdefault(index_shard_path(base_output, entry.phase, month), []).append(index_entry(entry))
+        month_counts[(entry.phase, month)] = month_counts.get((entry.phase, month), 0) + 1
+
+    ordered_counts = sorted(month_counts.items(), key=lambda item: item[0][0])
+    ordered_counts.sort(key=lambda item: item[0][1], reverse=True)
+    with index_lock(base_output):
+        for shard, entries in shards.items():
+            write_index(entries, shard)
+        for stale in set((base_output / INDEX_DIRNAME).glob("*/*.md")) - set(shards):
+            stale.unlink()
+        write_top_index(base_output, [(phase, month, count) for (phase, month), count in ordered_counts])
+
+
+def reindex_runs() -> int:
+    """Rebuild the run catalog from disk, then regenerate the index from it."""
+    from cleanup import invalidate_snapshot
+
+    with open_catalog() as catalog:
+        count = catalog.reindex()
+    invalidate_snapshot(get_output_root())
+    rebuild_index()
+    print(f"Reindexed {count} runs under {get_output_root()}")
+    return count
+
+
+def dedupe_runs() -> int:
+    """Hardlink every finalized run's markdown artifacts into the blob store; return bytes saved.
+
+    Runs still `PENDING` are skipped: their artifacts are being written, and
+    deduplicated files are read-only.
+    """
+    from blob_store import DedupeResult, dedupe_run
+    from cleanup import format_bytes, invalidate_snapshot
+    from run_catalog import iter_run_dirs, read_run_meta
+
+    output_root = get_output_root()
+    total = DedupeResult()
+    runs = 0
+    for _, run_dir in iter_run_dirs(output_root):
+        meta = read_run_meta(run_dir)
+        if meta is None or (meta.get("status") or "PENDING") == "PENDING":
+            continue
+        total.add(dedupe_run(run_dir, output_root))
+        runs += 1
+    # Linked run directories changed, so their ledger sizes are re-measured on the next scan.
+    invalidate_snapshot(output_root)
+    print(
+        f"Deduplicated {total.linked}/{total.files} artifacts across {runs} runs, "
+        f"saving {format_bytes(total.saved_bytes)}"
+    )
+    return total.saved_bytes
+
+
+def detach_run_artifacts(args: argparse.Namespace) -> int:
+    """Replace one run's deduplicated artifacts with writable copies; return how many."""
+    from blob_store import detach_run
+    from cleanup import invalidate_snapshot
+
+    phase = args.phase.lower()
+    run_dir = get_output_root() / phase / args.run_id
+    if not run_dir.is_dir():
+        raise FileNotFoundError(
+            f"Could not find run directory {run_dir} (archived runs must be unpacked first)"
+        )
+    detached = detach_run(run_dir, get_output_root())
+    invalidate_snapshot(get_output_root())
+    print(f"Detached {detached} artifacts of {args.run_id} ({phase}); they can be edited in place")
+    return detached
+
+
+def pin_run(args: argparse.Namespace) -> Dict:
+    """Set or clear a run's pin; pinned runs are never archived or removed by cleanup."""
+    phase = args.phase.lower()
+    run_id = args.run_id
+    meta_path = get_output_root() / phase / run_id / "run.json"
+    if not meta_path.exists():
+        raise FileNotFoundError(
+            f"Could not find metadata for {run_id} at {meta_path} (archived runs must be unpacked first)"
+        )
+    meta = load_json(meta_path)
+    if args.unpin:
+        meta.pop("pinned", None)
+    else:
+        meta["pinned"] = True
+    write_json(meta_path, meta)
+    record_run(meta)
+    print(f"{'Unpinned' if args.unpin else 'Pinned'} {run_id} ({phase})")
+    return meta
+
+
+def _catalog_time(value: str) -> str:
+    """Normalise an ISO date or datetime to the UTC isoformat the catalog stores.
+
+    Dates mean midnight UTC, and datetimes without an offset are taken as UTC.
+    """
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError as exc:
+        raise ValueError(f"--since must be an ISO date or datetime, got '{value}'.") from exc
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc).isoformat()
+    return moment.astimezone(timezone.utc).isoformat()
+
+
+def list_runs(args: argparse.Namespace) -> Dict:
+    """Print one page of runs matching the filters, newest first, straight from the catalog."""
+    since = _catalog_time(args.since) if args.since else None
+
+    base_output = get_output_root()
+    entries = []
+    next_cursor = None
+    if base_output.exists():
+        with open_catalog(base_output) as catalog:
+            entries, next_cursor = catalog.query_runs(
+                phase=args.phase,
+                status=args.status.upper() if args.status else None,
+                verdict=args.verdict.upper() if args.verdict else None,
+                since=since,
+                limit=args.limit,
+                cursor=args.cursor,
+            )
+    page = {
+        "runs": [
+            {
+                "run_id": entry.run_id,
+                "phase": entry.phase,
+                "created_iso": entry.created_iso,
+                "status": entry.status,
+                "verdict": entry.verdict,
+                "input": (entry.meta or {}).get("input", ""),
+                "run_dir": entry.run_dir.as_posix(),
+            }
+            for entry in entries
+        ],
+        "next_cursor": next_cursor,
+    }
+
+    if args.json:
+        print(json.dumps(page, indent=2))
+        return page
+    if not entries:
+        print("No matching runs.")
+        return page
+    for run in page["runs"]:
+        print(
+            f"{run['run_id']}  {run['phase']:<7} {run['created_iso'][:16].replace('T', ' ')}  "
+            f"{run['status'] or '-':<10} {run['verdict'] or '-':<9} {run['input'][:60]}"
+        )
+    if next_cursor:
+        print(f"\nMore runs: add --cursor {next_cursor}")
+    return page
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
 
 
 def _normalize_prepare_roles_tokens(argv: Sequence[str]) -> List[str]:
@@ -891,11 +1603,29 @@ def _normalize_cli_args(argv: Sequence[str]) -> List[str]:
     return _normalize_prepare_roles_tokens(argv)
 
 
+_PARSER: argparse.ArgumentParser | None = None
+
+
 def parse_cli_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
-    parser = build_parser()
+    global _PARSER
+    if _PARSER is None:
+        # Building the parser costs more than parsing; a long-lived daemon reuses it.
+        _PARSER = build_parser()
+    parser = _PARSER
     raw_args = list(argv) if argv is not None else sys.argv[1:]
     normalized_args = _normalize_cli_args(raw_args)
-    return parser.parse_args(normalized_args)
+    args = parser.parse_args(normalized_args)
+    if args.command == "prepare" and not args.batch:
+        missing = [flag for flag in ("phase", "text") if getattr(args, flag) is None]
+        if missing:
+            parser.error(
+                "prepare requires "
+                + " and ".join(f"--{flag}" for flag in missing)
+                + " unless --batch is given"
+            )
+    if args.command == "dedupe" and args.detach and not (args.phase and args.run_id):
+        parser.error("dedupe --detach requires --phase and --run-id")
+    return args
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -905,14 +1635,24 @@ def build_parser() -> argparse.ArgumentParser:
     prepare_parser = subparsers.add_parser("prepare", help="Create a new run_id and instructions.")
     prepare_parser.add_argument(
         "--phase",
-        required=True,
         choices=sorted(PHASE_DETAILS.keys()),
-        help="Studio phase to run.",
+        help="Studio phase to run (required unless every --batch line sets one).",
     )
     prepare_parser.add_argument(
         "--text",
-        required=True,
-        help="Idea/objective text that seeds the run.",
+        help="Idea/objective text that seeds the run (required unless --batch is used).",
+    )
+    prepare_parser.add_argument(
+        "--batch",
+        type=Path,
+        default=None,
+        help="JSONL file with one prepare request per line; creates every run in one pass.",
+    )
+    prepare_parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="With --batch: also write the JSON manifest of created runs to this path.",
     )
     prepare_parser.add_argument(
         "--budget",
@@ -1031,16 +1771,113 @@ def build_parser() -> argparse.ArgumentParser:
         help="Path to validation config TOML (default: .studio/validation.toml).",
     )
 
+    subparsers.add_parser(
+        "reindex",
+        help="Rebuild the run catalog and index from the run directories on disk.",
+    )
+
+    dedupe_parser = subparsers.add_parser(
+        "dedupe",
+        help="Hardlink identical markdown artifacts of finalized runs into the blob store.",
+    )
+    dedupe_parser.add_argument(
+        "--detach",
+        action="store_true",
+        help="Instead, give one run (--phase/--run-id) writable copies of its deduplicated artifacts.",
+    )
+    dedupe_parser.add_argument(
+        "--phase",
+        choices=sorted(PHASE_DETAILS.keys()),
+        help="Phase of the run to detach.",
+    )
+    dedupe_parser.add_argument("--run-id", help="Run to detach.")
+
+    pin_parser = subparsers.add_parser(
+        "pin", help="Exempt a run from archiving and cleanup (or lift that with --unpin)."
+    )
+    pin_parser.add_argument(
+        "--phase",
+        required=True,
+        choices=sorted(PHASE_DETAILS.keys()),
+        help="Phase the run belongs to.",
+    )
+    pin_parser.add_argument(
+        "--run-id",
+        required=True,
+        help="Run identifier to pin.",
+    )
+    pin_parser.add_argument(
+        "--unpin",
+        action="store_true",
+        help="Remove the pin so the run follows the normal retention rules again.",
+    )
+
+    list_parser = subparsers.add_parser(
+        "list", help="List runs from the run catalog, newest first, with filters."
+    )
+    list_parser.add_argument(
+        "--phase",
+        choices=sorted(PHASE_DETAILS.keys()),
+        help="Only runs from this phase.",
+    )
+    list_parser.add_argument("--status", help="Only runs with this status (e.g. COMPLETED).")
+    list_parser.add_argument("--verdict", help="Only runs with this verdict (APPROVED/REJECTED).")
+    list_parser.add_argument(
+        "--since",
+        help=(
+            "Only runs created on or after this ISO date/datetime (e.g. 2026-09-01);"
+            " times without an offset are UTC."
+        ),
+    )
+    list_parser.add_argument(
+        "--limit",
+        type=_positive_int,
+        default=20,
+        help="Page size (default: 20).",
+    )
+    list_parser.add_argument(
+        "--cursor",
+        help="Continue after the page that printed this cursor.",
+    )
+    list_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the page as JSON ({runs, next_cursor}).",
+    )
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Serve prepare/finalize/validate/cleanup/list over a local Unix socket (see run_phase_daemon.py).",
+    )
+    serve_parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="Socket path (default: $STUDIO_DAEMON_SOCKET or a per-user path in the temp dir).",
+    )
+    serve_parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=600.0,
+        help="Exit after this many seconds without a request (default: 600).",
+    )
+
     return parser
 
 
 def validate_run(args: argparse.Namespace) -> None:
     """Validate Studio run outputs."""
-    import tomllib
+    from cleanup import refresh_run_size
+    from config_cache import load_toml
+    from run_archive import readable_run_dir
+    from validators.document_validator import DocumentValidator
     
     phase = args.phase.lower()
     run_id = args.run_id
-    run_dir = get_output_root() / phase / run_id
+    live_dir = get_output_root() / phase / run_id
+    # Archived runs are validated from a private extraction of their archive.
+    run_dir = readable_run_dir(live_dir)
+    archived = run_dir != live_dir
     
     if not run_dir.exists():
         raise FileNotFoundError(f"Run directory not found: {run_dir}")
@@ -1055,12 +1892,11 @@ def validate_run(args: argparse.Namespace) -> None:
         print("Using default validation rules.")
         config = {}
     else:
-        with open(config_path, "rb") as f:
-            config = tomllib.load(f)
+        config = load_toml(config_path)
     
     # Validate discussion phase (documents)
     print(f"\n{'='*60}")
-    print(f"Validating {run_id} ({phase} phase)")
+    print(f"Validating {run_id} ({phase} phase{', archived' if archived else ''})")
     print(f"{'='*60}\n")
     
     doc_validator = DocumentValidator()
@@ -1090,6 +1926,7 @@ def validate_run(args: argparse.Namespace) -> None:
         for warning in result.warnings:
             print(f"  ⚠ {warning}")
     
+    size_refreshed = False
     # Check for implementation artifacts (code validation)
     impl_key = f"{phase}_phase.implementation"
     if impl_key in config:
@@ -1100,6 +1937,8 @@ def validate_run(args: argparse.Namespace) -> None:
         timeout = impl_config.get("timeout", 60)
         
         if checks:
+            from validators.code_validator import CodeValidator
+
             code_validator = CodeValidator(timeout=timeout)
             
             # Look for implementation.md or integrator.md
@@ -1130,14 +1969,23 @@ def validate_run(args: argparse.Namespace) -> None:
                         for line in error_lines:
                             if line.strip():
                                 print(f"      {line}")
+
+                # Checks may leave caches or build output behind in the run directory.
+                if not archived:
+                    refresh_run_size(
+                        get_output_root(), phase, run_id, accessed_iso=utc_now().isoformat()
+                    )
+                    size_refreshed = True
     
+    if not size_refreshed:
+        note_run_access(live_dir)
     print(f"\n{'='*60}")
     print("Validation complete")
     print(f"{'='*60}\n")
 
 
-def main() -> None:
-    args = parse_cli_args()
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_cli_args(argv)
 
     if args.command == "prepare":
         prepare_run(args)
@@ -1148,6 +1996,21 @@ def main() -> None:
         _maybe_run_cleanup(dry_run=dry_run or _env_flag(CLEANUP_DRY_ENV))
     elif args.command == "validate":
         validate_run(args)
+    elif args.command == "reindex":
+        reindex_runs()
+    elif args.command == "dedupe":
+        if args.detach:
+            detach_run_artifacts(args)
+        else:
+            dedupe_runs()
+    elif args.command == "pin":
+        pin_run(args)
+    elif args.command == "list":
+        list_runs(args)
+    elif args.command == "serve":
+        from run_phase_daemon import serve
+
+        sys.exit(serve(args.socket, idle_timeout=args.idle_timeout))
     else:
         raise ValueError("Unknown command")
 
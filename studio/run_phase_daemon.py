@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Optional long-lived server for `run_phase.py` commands.
+
+`python run_phase.py serve` keeps Studio's modules imported and serves
+prepare/finalize/validate/cleanup/list requests over a local Unix socket, so a
+command costs a socket round trip instead of a fresh interpreter importing
+everything again. This module is also the thin client:
+
+    python run_phase_daemon.py finalize --phase market --run-id run_...
+
+forwards the command (with the caller's cwd and environment) to the daemon,
+starting one in the background if none is listening, and falls back to
+running `run_phase.py` in-process if the daemon cannot be reached.
+
+The client half only imports the standard library modules it needs so its
+own startup stays small.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+SOCKET_ENV = "STUDIO_DAEMON_SOCKET"
+DAEMON_COMMANDS = {"prepare", "finalize", "validate", "cleanup", "list"}
+DEFAULT_IDLE_TIMEOUT_SECONDS = 600.0
+START_TIMEOUT_SECONDS = 10.0
+REQUEST_TIMEOUT_SECONDS = 30.0
+_RUN_PHASE_PATH = Path(__file__).resolve().parent / "run_phase.py"
+
+
+class DaemonUnavailable(RuntimeError):
+    """Raised when no daemon answers on the socket; the request was never delivered."""
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon took a request but gave no usable reply.
+
+    The command may already have run, so it must not be retried elsewhere.
+    """
+
+
+def default_socket_path() -> Path:
+    """Per-user socket path, keyed by the Studio checkout so checkouts don't share a daemon."""
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return Path(override)
+    import hashlib
+    import tempfile
+
+    checkout = hashlib.sha1(str(_RUN_PHASE_PATH.parent).encode("utf-8")).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"studio-run-phase-{os.getuid()}-{checkout}.sock"
+
+
+def _source_mtimes() -> Dict[str, int]:
+    """mtimes of the Studio modules the daemon has loaded, used to spot code changes."""
+    studio_dir = str(_RUN_PHASE_PATH.parent)
+    mtimes: Dict[str, int] = {}
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if path and path.startswith(studio_dir):
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = -1
+    return mtimes
+
+
+def _sources_changed(loaded: Dict[str, int]) -> bool:
+    for path, mtime_ns in loaded.items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime_ns:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+# --- Server -------------------------------------------------------------------
+
+
+def _error_reply(message: str, exit_code: int = 2) -> Dict:
+    return {"exit_code": exit_code, "stdout": "", "stderr": message + "\n"}
+
+
+def _is_str_map(value) -> bool:
+    return isinstance(value, dict) and all(
+        isinstance(key, str) and isinstance(item, str) for key, item in value.items()
+    )
+
+
+def _run_request(request: Dict) -> Dict:
+    """Execute one forwarded command with the client's cwd/env and captured output.
+
+    The cwd, `os.environ` and stdout/stderr belong to the whole daemon
+    process, so they are swapped in for the command and restored after it.
+    That is only sound because `serve` runs one request at a time; a thread a
+    command leaves running would see the next request's cwd and environment.
+    """
+    import contextlib
+    import io
+    import traceback
+
+    import run_phase
+    from cleanup import invalidate_snapshot
+    from run_catalog import flush_run_writes
+    from token_ledger import fold_ledgers
+
+    argv = request.get("argv")
+    cwd = request.get("cwd")
+    env = request.get("env")
+    if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+        return _error_reply("run_phase daemon request has no argv list")
+    if not argv or argv[0] not in DAEMON_COMMANDS:
+        return _error_reply(f"run_phase daemon only serves: {', '.join(sorted(DAEMON_COMMANDS))}")
+    if not (cwd is None or isinstance(cwd, str)) or not (env is None or _is_str_map(env)):
+        return _error_reply("run_phase daemon request has a malformed cwd or env")
+    stdout, stderr = io.StringIO(), io.StringIO()
+    saved_env = dict(os.environ)
+    saved_cwd = os.getcwd()
+    exit_code = 0
+    try:
+        os.environ.clear()
+        os.environ.update(env or saved_env)
+        try:
+            os.chdir(cwd or saved_cwd)
+        except OSError as exc:
+            return _error_reply(f"run_phase daemon cannot enter {cwd}: {exc}", exit_code=1)
+        # Other processes may have changed the tree since the last request.
+        invalidate_snapshot()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                run_phase.main(argv)
+            except SystemExit as exc:
+                if isinstance(exc.code, int):
+                    exit_code = exc.code
+                elif exc.code is not None:
+                    print(exc.code, file=sys.stderr)
+                    exit_code = 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        # Size-ledger totals and token rollups would otherwise wait for the daemon to exit.
+        flush_run_writes()
+        fold_ledgers()
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+    return {"exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def _recv_line(conn: socket.socket) -> bytes:
+    chunks: List[bytes] = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks)
+
+
+def _reply(conn: socket.socket, response: Dict) -> None:
+    try:
+        conn.sendall(json.dumps(response).encode("utf-8") + b"\n")
+    except OSError:
+        pass  # the client went away; nothing else depends on the reply
+
+
+def serve(
+    socket_path: Optional[Path] = None,
+    *,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+) -> int:
+    """Serve forwarded commands until idle for `idle_timeout` seconds or asked to stop.
+
+    Requests are handled one at a time: commands change the working directory
+    and environment, and the run catalog and index already serialise writers
+    from other processes. Returns 0, or 1 if another daemon owns the socket.
+    """
+    import fcntl
+
+    # Import everything a command can need up front; that is the point of the daemon.
+    import run_phase
+    import cleanup  # noqa: F401
+    import rerun  # noqa: F401
+    import run_phase_roles  # noqa: F401
+    import scopes  # noqa: F401
+    import tomllib  # noqa: F401
+    import validators.code_validator  # noqa: F401
+    import validators.document_validator  # noqa: F401
+
+    socket_path = Path(socket_path or default_socket_path())
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_handle = open(f"{socket_path}.lock", "a")
+    try:
+        fcntl.flock(lock_handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_handle.close()
+        print(f"run_phase daemon already running on {socket_path}", file=sys.stderr)
+        return 1
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        if socket_path.exists():
+            socket_path.unlink()
+        old_umask = os.umask(0o077)
+        try:
+            server.bind(str(socket_path))
+        finally:
+            os.umask(old_umask)
+        server.listen(64)
+        server.settimeout(idle_timeout)
+        loaded = _source_mtimes()
+        print(f"run_phase daemon (pid {os.getpid()}) listening on {socket_path}", file=sys.stderr)
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+            with conn:
+                conn.settimeout(REQUEST_TIMEOUT_SECONDS)
+                # A client that stalls, hangs up or sends garbage only loses its own request.
+                try:
+                    request = json.loads(_recv_line(conn) or b"{}")
+                except (OSError, ValueError):
+                    continue
+                if not isinstance(request, dict):
+                    _reply(conn, _error_reply("run_phase daemon requests must be JSON objects"))
+                    continue
+                if request.get("shutdown"):
+                    _reply(conn, {"ok": True})
+                    break
+                if _sources_changed(loaded):
+                    # Studio code changed on disk: let the client start a fresh daemon.
+                    _reply(conn, {"stale": True})
+                    break
+                _reply(conn, _run_request(request) if "argv" in request else {"ok": True})
+    finally:
+        server.close()
+        try:
+            socket_path.unlink()
+        except OSError:
+            pass
+        lock_handle.close()
+    return 0
+
+
+# --- Client -------------------------------------------------------------------
+
+
+def _send(socket_path: Path, payload: Dict, timeout: Optional[float] = None) -> Dict:
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(timeout)
+        try:
+            client.connect(str(socket_path))
+            # The daemon only acts on a complete line, so a failed send delivered nothing.
+            client.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        except OSError as exc:
+            raise DaemonUnavailable(f"No run_phase daemon on {socket_path}: {exc}") from exc
+        try:
+            reply = _recv_line(client)
+        except OSError as exc:
+            raise DaemonError(f"run_phase daemon on {socket_path} failed to reply: {exc}") from exc
+    finally:
+        client.close()
+    if not reply:
+        raise DaemonError(f"run_phase daemon on {socket_path} closed the connection")
+    try:
+        return json.loads(reply)
+    except ValueError as exc:
+        raise DaemonError(f"run_phase daemon on {socket_path} sent a malformed reply") from exc
+
+
+def start_daemon(socket_path: Path, *, idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS) -> None:
+    """Launch `run_phase.py serve` in the background and wait until it answers."""
+    import subprocess
+
+    log_path = Path(f"{socket_path}.log")
+    with open(log_path, "ab") as log:
+        subprocess.Popen(
+            [
+                sys.executable,
+                str(_RUN_PHASE_PATH),
+                "serve",
+                "--socket",
+                str(socket_path),
+                "--idle-timeout",
+                str(idle_timeout),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        try:
+            _send(socket_path, {"ping": True}, timeout=1.0)
+            return
+        except (DaemonUnavailable, DaemonError):
+            time.sleep(0.02)
+    raise DaemonUnavailable(f"run_phase daemon did not start on {socket_path} (see {log_path})")
+
+
+def request(
+    argv: Sequence[str],
+    *,
+    socket_path: Optional[Path] = None,
+    autostart: bool = True,
+) -> Dict:
+    """Run `argv` on the daemon and return its {exit_code, stdout, stderr} reply.
+
+    Raises `DaemonUnavailable` if no daemon could be reached (the command did
+    not run) and `DaemonError` if one took the request but did not answer.
+    """
+    socket_path = Path(socket_path or default_socket_path())
+    payload = {"argv": list(argv), "cwd": os.getcwd(), "env": dict(os.environ)}
+    for _ in range(3):
+        try:
+            reply = _send(socket_path, payload)
+        except DaemonUnavailable:
+            if not autostart:
+                raise
+            start_daemon(socket_path)
+            continue
+        if reply.get("stale"):
+            if not autostart:
+                raise DaemonUnavailable(f"run_phase daemon on {socket_path} is running old code")
+            # The stale daemon removes its socket as it exits; start a fresh one after that.
+            deadline = time.monotonic() + START_TIMEOUT_SECONDS
+            while socket_path.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            start_daemon(socket_path)
+            continue
+        return reply
+    raise DaemonUnavailable(f"Could not get a reply from the run_phase daemon on {socket_path}")
+
+
+def stop_daemon(socket_path: Optional[Path] = None) -> bool:
+    """Ask the daemon to exit; returns False if none was running."""
+    try:
+        _send(Path(socket_path or default_socket_path()), {"shutdown": True}, timeout=5.0)
+    except (DaemonUnavailable, DaemonError):
+        return False
+    return True
+
+
+def client_main(argv: Optional[Sequence[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in DAEMON_COMMANDS:
+        # Anything the daemon does not serve (help, reindex, serve) runs locally.
+        import run_phase
+
+        run_phase.main(argv)
+        return 0
+    try:
+        reply = request(argv)
+    except DaemonUnavailable:
+        # Nothing reached a daemon, so running the command here cannot run it twice.
+        import run_phase
+
+        run_phase.main(argv)
+        return 0
+    except DaemonError as exc:
+        print(f"Error: {exc}; the command may or may not have completed.", file=sys.stderr)
+        return 1
+    sys.stdout.write(reply.get("stdout", ""))
+    sys.stderr.write(reply.get("stderr", ""))
+    return int(reply.get("exit_code", 1))
+
+
+__all__ = [
+    "DAEMON_COMMANDS",
+    "DaemonError",
+    "DaemonUnavailable",
+    "client_main",
+    "default_socket_path",
+    "request",
+    "serve",
+    "start_daemon",
+    "stop_daemon",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(client_main())
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import copy
 import json
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Sequence, Tuple
 
+from config_cache import file_stamp, load_json
+
 
 MANIFEST_FILENAME = "studio.manifest.json"
 ROLE_PACKS_DIRNAME = "role_packs"
@@ -38,7 +41,7 @@ def load_manifest(studio_root: Path) -> Dict:
     if not path.exists():
         raise RoleConfigError(f"Expected manifest at {path}, but it was not found.")
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return load_json(path)
     except json.JSONDecodeError as exc:
         raise RoleConfigError(f"Manifest at {path} is not valid JSON: {exc}") from exc
 
@@ -72,7 +75,7 @@ def load_role_pack(studio_root: Path, pack_name: str) -> Dict:
     if not pack_path.exists():
         raise RoleConfigError(f"Role pack '{pack_name}' not found at {pack_path}.")
     try:
-        return json.loads(pack_path.read_text(encoding="utf-8"))
+        return load_json(pack_path)
     except json.JSONDecodeError as exc:
         raise RoleConfigError(f"Role pack '{pack_name}' is invalid JSON: {exc}") from exc
 
@@ -108,6 +111,39 @@ def build_role_details(manifest: Dict, role_names: Sequence[str]) -> List[RoleDe
     return [get_role_spec(manifest, name) for name in role_names]
 
 
+_RESOLVED_ROLES: Dict[Tuple, Tuple[List[str], List[RoleDetails]]] = {}
+
+
+def resolve_role_details(
+    studio_root: Path, pack_name: str, overrides: Sequence[str] | None = None
+) -> Tuple[List[str], List[RoleDetails]]:
+    """Load the manifest and pack, apply overrides, and return (invited roles, their details).
+
+    Results are memoized per (pack, overrides) until the manifest or pack file changes.
+    """
+    overrides = tuple(overrides or ())
+    manifest = load_manifest(studio_root)
+    pack_data = load_role_pack(studio_root, pack_name)
+    pack_path = _packs_dir(studio_root) / f"{pack_name}.json"
+    try:
+        key = (
+            str(studio_root),
+            pack_name,
+            overrides,
+            file_stamp(_manifest_path(studio_root)),
+            file_stamp(pack_path),
+        )
+    except OSError:
+        key = None
+    cached = _RESOLVED_ROLES.get(key) if key else None
+    if cached is None:
+        invited = resolve_role_list(manifest, pack_data, overrides)
+        cached = (invited, build_role_details(manifest, invited))
+        if key:
+            _RESOLVED_ROLES[key] = cached
+    return copy.deepcopy(cached)
+
+
 def normalize_role_filename(role: str, iteration: int, kind: str) -> str:
     slug = role.replace(" ", "-")
     return f"{kind}--{slug}--{iteration:02d}.md"
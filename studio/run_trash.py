@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Rename-then-reap deletion for Studio run directories.
+
+Deleting a large run with `shutil.rmtree` can take a long time, and runs
+deleted by cleanup should disappear from every scan at once. Cleanup
+therefore first renames each victim into `output/.trash/`, which is a
+single atomic `rename` on the same filesystem. The directories are removed
+afterwards by `reap_trash`, on a thread pool and optionally under a
+deadline. Whatever a pass does not reap stays in the trash for the next one.
+An entry that survives `REAP_ATTEMPTS` reaps (a permission problem, say) is
+set aside in `output/.trash/failed/` so it stops counting as pending work.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+TRASH_DIRNAME = ".trash"
+FAILED_DIRNAME = "failed"
+REAP_ATTEMPTS = 3
+
+_TRASH_COUNTER = itertools.count()
+
+
+@dataclass
+class ReapResult:
+    reaped: int = 0
+    pending: int = 0
+    # Entries set aside in the failed directory, including earlier passes'.
+    failed: int = 0
+    seconds: float = 0.0
+
+
+def trash_root(output_root: Path) -> Path:
+    return Path(output_root) / TRASH_DIRNAME
+
+
+def failed_root(output_root: Path) -> Path:
+    return trash_root(output_root) / FAILED_DIRNAME
+
+
+def move_to_trash(run_dir: Path, output_root: Path) -> Path:
+    """Atomically move `run_dir` into the trash and return its new location.
+
+    The trash name keeps the phase and run id for anyone looking at the
+    directory, plus a per-process suffix so repeated deletions never collide.
+    """
+    run_dir = Path(run_dir)
+    root = trash_root(output_root)
+    root.mkdir(parents=True, exist_ok=True)
+    target = root / f"{run_dir.parent.name}--{run_dir.name}--{os.getpid()}.{next(_TRASH_COUNTER)}"
+    os.rename(run_dir, target)
+    return target
+
+
+def trash_entries(output_root: Path) -> List[Path]:
+    """Entries still waiting to be reaped (not those set aside as failed)."""
+    root = trash_root(output_root)
+    try:
+        return sorted(entry for entry in root.iterdir() if entry.name != FAILED_DIRNAME)
+    except OSError:
+        return []
+
+
+def failed_entries(output_root: Path) -> List[Path]:
+    try:
+        return sorted(failed_root(output_root).iterdir())
+    except OSError:
+        return []
+
+
+def _reap_attempts(entry: Path) -> Tuple[str, int]:
+    """The entry's trash name without its attempt suffix, and the failed reaps it records."""
+    base, _, attempts = entry.name.rpartition("~")
+    if base and attempts.isdigit():
+        return base, int(attempts)
+    return entry.name, 0
+
+
+def _note_failed_reap(entry: Path, output_root: Path) -> bool:
+    """Record one more failed reap in the entry's name; True once it is set aside as failed."""
+    base, attempts = _reap_attempts(entry)
+    attempts += 1
+    try:
+        if attempts >= REAP_ATTEMPTS:
+            failed_root(output_root).mkdir(exist_ok=True)
+            os.rename(entry, failed_root(output_root) / base)
+            return True
+        os.rename(entry, entry.with_name(f"{base}~{attempts}"))
+    except OSError:
+        pass
+    return False
+
+
+def reap_trash(
+    output_root: Path, *, workers: int = 1, deadline: Optional[float] = None
+) -> ReapResult:
+    """Physically delete everything in the trash, fanning out across `workers` threads.
+
+    `deadline` is a `time.monotonic()` value: entries not started by then are
+    left for a later reap. An entry that is already being deleted is always
+    finished. Entries that cannot be removed are retried by later reaps and
+    moved to the failed directory after `REAP_ATTEMPTS` tries.
+    """
+    started = time.monotonic()
+    entries = trash_entries(output_root)
+    result = ReapResult()
+    if not entries:
+        result.failed = len(failed_entries(output_root))
+        return result
+
+    def reap(entry: Path) -> str:
+        if deadline is not None and time.monotonic() >= deadline:
+            return "pending"
+        if entry.is_dir() and not entry.is_symlink():
+            shutil.rmtree(entry, ignore_errors=True)
+        else:
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+        if not os.path.lexists(entry):
+            return "reaped"
+        return "failed" if _note_failed_reap(entry, output_root) else "pending"
+
+    if workers <= 1 or len(entries) <= 1:
+        outcomes = [reap(entry) for entry in entries]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(entries))) as pool:
+            outcomes = list(pool.map(reap, entries))
+    result.reaped = outcomes.count("reaped")
+    result.pending = outcomes.count("pending")
+    result.failed = len(failed_entries(output_root))
+    result.seconds = time.monotonic() - started
+    return result
+
+
+__all__ = [
+    "FAILED_DIRNAME",
+    "REAP_ATTEMPTS",
+    "ReapResult",
+    "TRASH_DIRNAME",
+    "failed_entries",
+    "failed_root",
+    "move_to_trash",
+    "reap_trash",
+    "trash_entries",
+    "trash_root",
+]
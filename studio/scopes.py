@@ -8,7 +8,6 @@ on low-level polish (expensive to change).
 """
 from __future__ import annotations
 
-import tomllib
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List
@@ -76,10 +75,11 @@ def load_scopes_config(config_path: Path) -> ScopesConfig:
     if not config_path.exists():
         raise FileNotFoundError(f"Scopes config not found: {config_path}")
     
+    from config_cache import load_toml
+
     try:
-        with open(config_path, "rb") as f:
-            data = tomllib.load(f)
-    except tomllib.TOMLDecodeError as e:
+        data = load_toml(config_path)
+    except ValueError as e:  # tomllib.TOMLDecodeError
         raise ValueError(f"Invalid TOML in {config_path}: {e}") from e
     
     if "scopes" not in data:
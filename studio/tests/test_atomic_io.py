@@ -0,0 +1,55 @@
+"""Tests for the process-safe file helpers."""
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from atomic_io import atomic_write_text, file_lock, locked_append_text
+
+
+def test_atomic_write_text_replaces_file_without_leaving_temp_files(tmp_path):
+    target = tmp_path / "nested" / "run.json"
+    atomic_write_text(target, "first\n")
+    atomic_write_text(target, "second\n")
+
+    assert target.read_text(encoding="utf-8") == "second\n"
+    assert [path.name for path in target.parent.iterdir()] == ["run.json"]
+
+
+def test_locked_append_text_writes_header_once_under_contention(tmp_path):
+    log_path = tmp_path / "run_log.md"
+
+    def append(worker):
+        for i in range(50):
+            locked_append_text(log_path, f"entry {worker}-{i}\n", header="# Log\n\n")
+
+    threads = [threading.Thread(target=append, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lines = log_path.read_text(encoding="utf-8").splitlines()
+    assert lines[:2] == ["# Log", ""]
+    assert len(lines) == 402
+    assert all(line.startswith("entry ") for line in lines[2:])
+
+
+def test_file_lock_serialises_read_modify_write(tmp_path):
+    counter = tmp_path / "counter.txt"
+    counter.write_text("0", encoding="utf-8")
+
+    def bump():
+        for _ in range(100):
+            with file_lock(tmp_path / ".lock"):
+                value = int(counter.read_text(encoding="utf-8"))
+                atomic_write_text(counter, str(value + 1))
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.read_text(encoding="utf-8") == "400"
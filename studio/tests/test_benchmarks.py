@@ -208,6 +208,679 @@ def test_benchmark_file_size_check(temp_files, benchmark_info=True):
     assert result['avg'] < 0.0001, f"File size check too slow: {result['avg']*1000:.2f}ms"
 
 
+@pytest.mark.benchmark
+def test_benchmark_incremental_index_update(tmp_path, benchmark_info=True):
+    """Benchmark patching one row of a 50k-row index shard."""
+    index_path = tmp_path / "index.md"
+    entries = [
+        {
+            "run_id": f"run_market_{i:06d}",
+            "phase": "market",
+            "created_iso": f"2026-01-01T00:00:{i:06d}",
+            "created_display": f"2026-01-01 {i:06d}",
+            "status": "PENDING",
+            "input": "Synthetic idea",
+            "summary_path": "",
+        }
+        for i in range(50_000)
+    ]
+    run_phase.write_index(entries, index_path)
+    finalized = dict(entries[25_000], status="COMPLETED", summary_path="summary.md")
+    
+    result = benchmark(
+        run_phase.update_index,
+        index_path,
+        rebuild_entries=lambda: entries,
+        upsert=finalized,
+        iterations=10
+    )
+    
+    if benchmark_info:
+        print(f"\n📊 Incremental index update (50k rows):")
+        print(f"   Average: {result['avg']*1000:.2f}ms")
+        print(f"   Min: {result['min']*1000:.2f}ms, Max: {result['max']*1000:.2f}ms")
+    
+    assert "| run_market_025000 | market | 2026-01-01 025000 | COMPLETED |" in index_path.read_text()
+    # Performance assertion: should be < 100ms on average
+    assert result['avg'] < 0.1, f"Index update too slow: {result['avg']*1000:.2f}ms"
+
+
+def _seed_run_tree(output_root, run_count):
+    """Write `run_count` minimal runs (run.json + one artifact) under output_root."""
+    import json
+    from datetime import datetime, timezone
+    now = datetime.now(timezone.utc)
+    for i in range(run_count):
+        phase = ("market", "design", "tech", "studio")[i % 4]
+        run_id = f"run_{phase}_20260101_{i:06d}"
+        run_dir = output_root / phase / run_id
+        run_dir.mkdir(parents=True)
+        (run_dir / "run.json").write_text(json.dumps({
+            "run_id": run_id,
+            "phase": phase,
+            "input": "Synthetic idea",
+            "created_iso": now.isoformat(timespec="seconds"),
+            "created_display": now.strftime("%Y-%m-%d %H:%M"),
+            "status": "COMPLETED",
+        }))
+        (run_dir / "summary.md").write_text("# Summary\n")
+
+
+@pytest.mark.benchmark
+def test_benchmark_prepare_shared_run_snapshot(tmp_path, monkeypatch, benchmark_info=True):
+    """Benchmark prepare-time tree work on a 10k-run tree: three scans vs one shared snapshot."""
+    import argparse
+    import cleanup
+    
+    studio_root = tmp_path / "studio"
+    output_root = studio_root / "output"
+    _seed_run_tree(output_root, 10_000)
+    monkeypatch.setenv("STUDIO_ROOT", str(studio_root))
+    monkeypatch.setenv("STUDIO_ARTIFACT_ROOT", str(studio_root))
+    settings = cleanup.CleanupSettings(ttl_days=0, size_limit_mb=0)
+    
+    def tree_work(shared):
+        cleanup.invalidate_snapshot()
+        cleanup.cleanup_runs(output_root, settings)
+        if not shared:
+            cleanup.invalidate_snapshot()
+        run_phase.get_storage_stats()
+        if not shared:
+            cleanup.invalidate_snapshot()
+        run_phase.rebuild_index()
+    
+    run_phase.reindex_runs()
+    separate = benchmark(tree_work, False, iterations=1)
+    shared = benchmark(tree_work, True, iterations=1)
+    
+    args = argparse.Namespace(
+        phase="tech", text="Benchmark idea", max_iterations=3, scopes=None,
+        roles=None, role_pack=None, no_scopes=True, budget=None,
+    )
+    cleanup.invalidate_snapshot()
+    start = time.perf_counter()
+    run_phase.prepare_run(args)
+    prepare_seconds = time.perf_counter() - start
+    
+    if benchmark_info:
+        print(f"\n📊 Prepare tree work (10k runs):")
+        print(f"   Three scans:     {separate['avg']*1000:.2f}ms")
+        print(f"   Shared snapshot: {shared['avg']*1000:.2f}ms")
+        print(f"   prepare_run end-to-end: {prepare_seconds*1000:.2f}ms")
+    
+    assert shared['avg'] < separate['avg'], "Shared snapshot should beat separate scans"
+
+
+@pytest.mark.benchmark
+def test_benchmark_run_sizing_on_large_tree(tmp_path, benchmark_info=True):
+    """Benchmark measuring a synthetic 100k-file tree: serial rglob vs parallel scandir."""
+    import cleanup
+    
+    output_root = tmp_path / "output"
+    for run in range(200):
+        nested = output_root / "tech" / f"run_tech_{run:04d}" / "artifacts"
+        nested.mkdir(parents=True)
+        for i in range(500):
+            (nested / f"file_{i:03d}.md").write_bytes(b"x" * (i % 7))
+    run_dirs = sorted((output_root / "tech").iterdir())
+    
+    def rglob_sizes():
+        return [
+            sum(f.stat().st_size for f in run_dir.rglob("*") if f.is_file())
+            for run_dir in run_dirs
+        ]
+    
+    serial = benchmark(rglob_sizes, iterations=1)
+    parallel = benchmark(cleanup._directory_sizes, run_dirs, cleanup.DEFAULT_SIZE_WORKERS, iterations=1)
+    
+    if benchmark_info:
+        print(f"\n📊 Run sizing (200 runs, 100k files):")
+        print(f"   rglob + stat (serial):   {serial['avg']*1000:.2f}ms")
+        print(f"   scandir ({cleanup.DEFAULT_SIZE_WORKERS} workers): {parallel['avg']*1000:.2f}ms")
+    
+    assert cleanup._directory_sizes(run_dirs, cleanup.DEFAULT_SIZE_WORKERS) == rglob_sizes()
+    assert parallel['avg'] < serial['avg'], "scandir sizing should beat rglob + stat"
+
+
+@pytest.mark.benchmark
+def test_benchmark_parallel_run_id_allocation(tmp_path, benchmark_info=True):
+    """Benchmark run directory allocation from 8 concurrent processes."""
+    import subprocess
+    
+    script = (
+        "import sys, time; from datetime import datetime, timezone; from pathlib import Path\n"
+        f"sys.path.insert(0, {str(Path(__file__).parent.parent)!r})\n"
+        "import run_phase\n"
+        "start = time.perf_counter()\n"
+        "for _ in range(100):\n"
+        "    run_phase.allocate_run_dir(Path(sys.argv[1]), 'tech', datetime.now(timezone.utc))\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script, str(tmp_path)], stdout=subprocess.PIPE, text=True)
+        for _ in range(8)
+    ]
+    elapsed = [float(proc.communicate(timeout=120)[0]) for proc in procs]
+    rate = 800 / max(elapsed)
+    
+    if benchmark_info:
+        print(f"\n📊 Run id allocation (8 processes x 100):")
+        print(f"   Slowest process: {max(elapsed)*1000:.2f}ms")
+        print(f"   Aggregate rate: {rate:.0f} runs/s")
+    
+    assert len(list((tmp_path / "tech").iterdir())) == 800
+    # Performance assertion: hundreds of allocations per second
+    assert rate > 200, f"Run id allocation too slow: {rate:.0f}/s"
+
+
+FINALIZE_IMPORT_BUDGET_MS = 200
+FINALIZE_LAZY_MODULES = {"scopes", "rerun", "run_phase_roles", "validators", "tomllib"}
+
+
+@pytest.mark.benchmark
+def test_benchmark_finalize_cold_start_imports(tmp_path, monkeypatch, benchmark_info=True):
+    """Benchmark `run_phase.py finalize` cold-start imports via `python -X importtime`."""
+    import os
+    import subprocess
+    
+    monkeypatch.setenv("STUDIO_ROOT", str(tmp_path))
+    monkeypatch.setenv("STUDIO_ARTIFACT_ROOT", str(tmp_path))
+    subprocess.run(
+        [sys.executable, str(Path(run_phase.__file__)), "prepare", "--phase", "tech",
+         "--text", "Cold start idea", "--no-scopes"],
+        capture_output=True, text=True, env=os.environ.copy(), check=True,
+    )
+    run_dir = next((tmp_path / "output" / "tech").iterdir())
+    run_id = run_dir.name
+    for name in ("advocate_1.md", "contrarian_1.md", "summary.md"):
+        (run_dir / name).write_text("output")
+    
+    start = time.perf_counter()
+    finalized = subprocess.run(
+        [sys.executable, "-X", "importtime", str(Path(run_phase.__file__)), "finalize",
+         "--phase", "tech", "--run-id", run_id],
+        capture_output=True, text=True, env=os.environ.copy(), check=True,
+    )
+    wall_seconds = time.perf_counter() - start
+    
+    imported = {}
+    for line in finalized.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        imported[name.strip()] = int(self_us)
+    import_ms = sum(imported.values()) / 1000
+    
+    if benchmark_info:
+        print(f"\n📊 finalize cold start:")
+        print(f"   Imports: {import_ms:.2f}ms ({len(imported)} modules)")
+        print(f"   Wall clock: {wall_seconds*1000:.2f}ms")
+    
+    eager = {name for name in imported if name.split(".")[0] in FINALIZE_LAZY_MODULES}
+    assert not eager, f"finalize imported modules it does not need: {sorted(eager)}"
+    # Performance assertion: import cost must stay within budget
+    assert import_ms < FINALIZE_IMPORT_BUDGET_MS, f"finalize cold start too slow: {import_ms:.2f}ms"
+
+
+@pytest.mark.benchmark
+def test_benchmark_daemon_command_latency(tmp_path, monkeypatch, benchmark_info=True):
+    """Benchmark `finalize` latency through the run_phase daemon vs a fresh interpreter."""
+    import os
+    import shutil
+    import statistics
+    import subprocess
+    import run_phase_daemon
+    
+    monkeypatch.setenv("STUDIO_ROOT", str(tmp_path))
+    monkeypatch.setenv("STUDIO_ARTIFACT_ROOT", str(tmp_path))
+    socket_dir = Path(tempfile.mkdtemp(prefix="studio-bench-"))
+    socket_path = socket_dir / "d.sock"
+    try:
+        prepared = run_phase_daemon.request(
+            ["prepare", "--phase", "tech", "--text", "Latency idea", "--no-scopes"],
+            socket_path=socket_path,
+        )
+        assert prepared["exit_code"] == 0, prepared["stderr"]
+        run_dir = next((tmp_path / "output" / "tech").iterdir())
+        for name in ("advocate_1.md", "contrarian_1.md", "summary.md"):
+            (run_dir / name).write_text("output")
+        argv = ["finalize", "--phase", "tech", "--run-id", run_dir.name]
+        
+        daemon_times = []
+        for _ in range(30):
+            start = time.perf_counter()
+            reply = run_phase_daemon.request(argv, socket_path=socket_path)
+            daemon_times.append(time.perf_counter() - start)
+            assert reply["exit_code"] == 0, reply["stderr"]
+        
+        cold_times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, str(Path(run_phase.__file__))] + argv,
+                capture_output=True, env=os.environ.copy(), check=True,
+            )
+            cold_times.append(time.perf_counter() - start)
+    finally:
+        run_phase_daemon.stop_daemon(socket_path)
+        shutil.rmtree(socket_dir, ignore_errors=True)
+    
+    daemon_median = statistics.median(daemon_times)
+    cold_median = statistics.median(cold_times)
+    if benchmark_info:
+        print(f"\n📊 finalize latency:")
+        print(f"   Fresh interpreter (median): {cold_median*1000:.2f}ms")
+        print(f"   Via daemon (median):        {daemon_median*1000:.2f}ms")
+    
+    # Performance assertion: single-digit milliseconds through the daemon
+    assert daemon_median < 0.01, f"Daemon finalize too slow: {daemon_median*1000:.2f}ms"
+
+
+@pytest.mark.benchmark
+def test_benchmark_catalog_query_pages(tmp_path, benchmark_info=True):
+    """Benchmark filtered, cursor-paginated run queries against a 100k-run catalog."""
+    from datetime import datetime, timedelta, timezone
+    from run_catalog import RunCatalog
+    
+    start_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(100_000):
+        phase = ("market", "design", "tech", "studio")[i % 4]
+        created = (start_time + timedelta(minutes=10 * i)).isoformat(timespec="seconds")
+        rows.append((phase, f"run_{phase}_{i:06d}", {
+            "created_iso": created,
+            "status": "COMPLETED" if i % 3 else "PENDING",
+            "verdict": ("APPROVED", "REJECTED")[(i // 4) % 2] if i % 3 else "",
+        }))
+    catalog = RunCatalog(tmp_path / "output").open()
+    catalog.upsert_runs(rows)
+    
+    def query_pages():
+        _, cursor = catalog.query_runs(phase="tech", status="COMPLETED", verdict="REJECTED", limit=20)
+        for _ in range(4):
+            _, cursor = catalog.query_runs(
+                phase="tech", status="COMPLETED", verdict="REJECTED", limit=20, cursor=cursor
+            )
+        catalog.query_runs(since="2026-06-01", limit=20)
+    
+    result = benchmark(query_pages, iterations=10)
+    catalog.close()
+    
+    if benchmark_info:
+        print(f"\n📊 Catalog queries (100k runs, 6 pages):")
+        print(f"   Average: {result['avg']*1000:.2f}ms")
+        print(f"   Min: {result['min']*1000:.2f}ms, Max: {result['max']*1000:.2f}ms")
+    
+    # Performance assertion: six filtered pages should take < 20ms in total
+    assert result['avg'] < 0.02, f"Catalog queries too slow: {result['avg']*1000:.2f}ms"
+
+
+@pytest.mark.benchmark
+def test_benchmark_instruction_doc_templates(tmp_path, benchmark_info=True):
+    """Benchmark studio instruction rendering from a cached template vs. a cold build."""
+    roles = [
+        run_phase.RoleDetails(
+            name=f"role{i}",
+            title=f"Role {i}",
+            advocate_focus="Push the strongest version of the idea.",
+            contrarian_focus="Attack the riskiest assumption.",
+            prompt_doc=f"docs/role_prompts/role{i}.md",
+            deliverables=["Brief", "Risk list"],
+            escalate_on=["Budget overrun"],
+        )
+        for i in range(40)
+    ]
+    run_dir = tmp_path / "run_studio"
+    run_dir.mkdir()
+    meta = {
+        "phase": "studio",
+        "run_id": "run_studio_20250101_000000_000000",
+        "max_iterations": 3,
+        "input": "A cozy farming roguelite",
+        "budget_cap": "$0-20/mo",
+        "created_display": "2025-01-01 00:00",
+        "studio_roles": {"pack": "big", "overrides": []},
+    }
+    
+    def cold():
+        run_phase._INSTRUCTION_TEMPLATES.clear()
+        run_phase.build_instruction_doc(meta, run_dir, roles)
+    
+    cold_result = benchmark(cold, iterations=200)
+    result = benchmark(run_phase.build_instruction_doc, meta, run_dir, roles, iterations=200)
+    
+    if benchmark_info:
+        print(f"\n📊 Studio instructions (40 roles):")
+        print(f"   Cold template: {cold_result['avg']*1000:.3f}ms")
+        print(f"   Cached template: {result['avg']*1000:.3f}ms")
+    
+    # Performance assertion: the cached path should beat compiling every time
+    assert result['avg'] < cold_result['avg'], "Cached instruction template is not faster"
+
+
+@pytest.mark.benchmark
+def test_benchmark_time_boxed_cleanup_pass(tmp_path, benchmark_info=True):
+    """Benchmark prepare's time-boxed cleanup against a full pass over a 3k-run backlog."""
+    from datetime import datetime, timedelta, timezone
+    import cleanup
+    
+    output_root = tmp_path / "output"
+    _seed_run_tree(output_root, 3_000)
+    with run_phase.RunCatalog(output_root) as catalog:
+        catalog.reindex()
+    cleanup.invalidate_snapshot()
+    settings = cleanup.CleanupSettings(ttl_days=1, size_limit_mb=0)
+    later = datetime.now(timezone.utc) + timedelta(days=30)
+    cleanup.cleanup_runs(output_root, settings, now=later, dry_run=True)
+    
+    passes = []
+    
+    def bounded_pass():
+        passes.append(cleanup.cleanup_runs(output_root, settings, now=later, time_budget=0.05))
+    
+    bounded = benchmark(bounded_pass, iterations=5)
+    full = benchmark(cleanup.cleanup_runs, output_root, settings, now=later, iterations=1)
+    deleted_per_pass = sum(len(report.deletions) for report in passes) / len(passes)
+    
+    if benchmark_info:
+        print(f"\n📊 Cleanup of 3k expired runs:")
+        print(f"   Time-boxed pass (50ms budget): {bounded['avg']*1000:.2f}ms, "
+              f"{deleted_per_pass:.0f} runs/pass, {passes[0].trash_pending} left in trash")
+        print(f"   Full pass on the remainder: {full['avg']*1000:.2f}ms")
+    
+    assert not passes[0].complete
+    assert cleanup.load_cleanup_state(output_root)["complete"] is True
+    # Performance assertion: a bounded pass stays near its budget however large the backlog
+    assert bounded['max'] < 0.25, f"Time-boxed cleanup too slow: {bounded['max']*1000:.2f}ms"
+
+
+@pytest.mark.benchmark
+def test_benchmark_rename_then_reap_deletion(tmp_path, benchmark_info=True):
+    """Benchmark how long expired runs stay visible: serial rmtree vs rename into .trash/."""
+    from datetime import datetime, timedelta, timezone
+    import shutil
+    import cleanup
+    
+    def seed(output_root):
+        _seed_run_tree(output_root, 400)
+        for run_dir in output_root.glob("*/run_*"):
+            for i in range(24):
+                (run_dir / f"draft_{i}.md").write_text("# Draft\n" * 50)
+    
+    serial_root = tmp_path / "serial" / "output"
+    seed(serial_root)
+    run_dirs = sorted(serial_root.glob("*/run_*"))
+    start = time.perf_counter()
+    for run_dir in run_dirs:
+        shutil.rmtree(run_dir)
+    serial_seconds = time.perf_counter() - start
+    
+    output_root = tmp_path / "trash" / "output"
+    seed(output_root)
+    cleanup.invalidate_snapshot()
+    settings = cleanup.CleanupSettings(ttl_days=1, size_limit_mb=0)
+    later = datetime.now(timezone.utc) + timedelta(days=30)
+    report = cleanup.cleanup_runs(output_root, settings, now=later)
+    runs_per_second, bytes_per_second = report.deletion_throughput
+    
+    if benchmark_info:
+        print(f"\n📊 Deleting 400 runs (25 files each):")
+        print(f"   Serial rmtree: {serial_seconds*1000:.2f}ms")
+        print(f"   Rename into trash: {report.timings['delete']*1000:.2f}ms, "
+              f"reap: {report.timings['reap']*1000:.2f}ms")
+        print(f"   Throughput: {runs_per_second:.0f} runs/s, {bytes_per_second/1024/1024:.1f}MB/s")
+    
+    assert len(report.deletions) == report.reaped == 400
+    assert not list(output_root.glob("*/run_*"))
+    assert not list((output_root / ".trash").iterdir())
+    # Performance assertion: runs should vanish from scans far sooner than rmtree removes them
+    assert report.timings['delete'] < serial_seconds / 2, "Renaming into the trash should beat rmtree"
+
+
+@pytest.mark.benchmark
+def test_benchmark_eviction_planning_1m_records(benchmark_info=True):
+    """Benchmark ttl + size-budget planning over 1M synthetic run records."""
+    from datetime import datetime, timedelta, timezone
+    import gc
+    import cleanup
+    
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    stamps = [now - timedelta(minutes=i) for i in range(60 * 24 * 60)]
+    path = Path("output/market/run_market_synthetic")
+    records = [
+        cleanup.RunRecord("market", f"run_market_{i:07d}", path,
+                          stamps[(i * 7919) % len(stamps)], 1_000 + (i * 37) % 100_000)
+        for i in range(1_000_000)
+    ]
+    settings = cleanup.CleanupSettings(ttl_days=30, size_limit_mb=900)
+    # Age the records into the oldest GC generation so building them is not billed to the plan.
+    gc.collect()
+    
+    plans = []
+    result = benchmark(lambda: plans.append(cleanup.plan_evictions(records, settings, now)), iterations=1)
+    planner = plans[0]
+    
+    if benchmark_info:
+        print(f"\n📊 Eviction planning (1M records):")
+        print(f"   Plan: {result['avg']*1000:.2f}ms "
+              f"({len(planner.expired)} expired, {len(planner.over_budget())} over budget)")
+    
+    assert planner.kept_bytes <= settings.size_limit_bytes
+    # Performance assertion: planning a million runs should take under a second
+    assert result['avg'] < 1.0, f"Eviction planning too slow: {result['avg']*1000:.2f}ms"
+
+
+@pytest.mark.benchmark
+def test_benchmark_token_stats_single_pass(tmp_path, benchmark_info=True):
+    """Benchmark calculate_stats + save_summary over a 100k-record token log."""
+    import json
+    import tracemalloc
+    from token_tracker import TokenTracker
+    
+    run_dir = tmp_path / "run_tech_tokens"
+    run_dir.mkdir()
+    operations = ["advocate", "contrarian", "integrator", "validation"]
+    with open(run_dir / "tokens.jsonl", "w", encoding="utf-8") as handle:
+        for i in range(100_000):
+            handle.write(json.dumps({
+                "timestamp": "2026-01-01T00:00:00", "operation": operations[i % 4],
+                "iteration": None, "input_tokens": 1000 + i % 97, "output_tokens": 500,
+                "total_tokens": 1500 + i % 97, "model": "gpt-4", "cost_usd": None,
+            }) + "\n")
+    tracker = TokenTracker(run_dir)
+    
+    def summarize():
+        tracker.save_summary(tracker.calculate_stats("run_tech_tokens", "tech"))
+    
+    result = benchmark(summarize, iterations=3)
+    tracemalloc.start()
+    summarize()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    if benchmark_info:
+        print(f"\n📊 Token stats (100k records):")
+        print(f"   calculate_stats + save_summary: {result['avg']*1000:.2f}ms")
+        print(f"   Peak memory: {peak_bytes/1024:.1f}KB")
+    
+    # Performance assertions: one streaming pass, memory independent of the log length
+    assert peak_bytes < 1024 * 1024, f"Aggregation should not hold the log: {peak_bytes} bytes"
+    assert result['avg'] < 2.0, f"Token stats too slow: {result['avg']*1000:.2f}ms"
+
+
+@pytest.mark.benchmark
+def test_benchmark_checkpointed_token_summary(tmp_path, benchmark_info=True):
+    """Benchmark re-summarizing a 100k-record token log after a few appends."""
+    import json
+    from token_tracker import TokenTracker
+    
+    run_dir = tmp_path / "run_tech_tokens"
+    run_dir.mkdir()
+    with open(run_dir / "tokens.jsonl", "w", encoding="utf-8") as handle:
+        for i in range(100_000):
+            handle.write(json.dumps({
+                "timestamp": "2026-01-01T00:00:00", "operation": "advocate",
+                "iteration": i % 5, "input_tokens": 1000, "output_tokens": 500,
+                "total_tokens": 1500, "model": "gpt-4", "cost_usd": None,
+            }) + "\n")
+    tracker = TokenTracker(run_dir)
+    
+    full = benchmark(lambda: tracker.calculate_stats("run_tech_tokens", "tech"), iterations=1)
+    tracker.save_summary(tracker.calculate_stats("run_tech_tokens", "tech"))
+    
+    def append_and_summarize():
+        tracker.log_usage("contrarian", input_tokens=800, output_tokens=400, iteration=1)
+        tracker.save_summary(tracker.calculate_stats("run_tech_tokens", "tech"))
+    
+    incremental = benchmark(append_and_summarize, iterations=5)
+    
+    if benchmark_info:
+        print(f"\n📊 Token summary (100k records, then 1 append):")
+        print(f"   Full pass: {full['avg']*1000:.2f}ms")
+        print(f"   From checkpoint: {incremental['avg']*1000:.2f}ms")
+    
+    assert tracker.calculate_stats("run_tech_tokens", "tech").breakdown_by_operation["contrarian"]["count"] == 5
+    # Performance assertion: resuming from the checkpoint should not re-read the log
+    assert incremental['avg'] < full['avg'] / 5, "Checkpointed summary should skip the existing log"
+
+
+def _binary_token_log_stats(tmp_path, records):
+    """Token stats over `records` operations from tokens.jsonl and from the converted binary log."""
+    import gc
+    from token_log import convert_jsonl_log
+    from token_tracker import TokenTracker
+    
+    operations = ["advocate", "contrarian", "integrator", "validation"]
+    jsonl_dir = tmp_path / "run_tech_jsonl"
+    jsonl_dir.mkdir()
+    line = ('{"timestamp": "2026-01-01T00:00:00.%06d", "operation": "%s", "iteration": %d, '
+            '"input_tokens": %d, "output_tokens": 500, "total_tokens": %d, "model": "gpt-4", "cost_usd": null}\n')
+    with open(jsonl_dir / "tokens.jsonl", "w", encoding="utf-8") as handle:
+        handle.writelines(
+            line % (i % 1_000_000, operations[i % 4], i % 10, 1000 + i % 97, 1500 + i % 97)
+            for i in range(records)
+        )
+    jsonl = TokenTracker(jsonl_dir)
+    
+    binary_dir = tmp_path / "run_tech_binary"
+    binary_dir.mkdir()
+    binary = TokenTracker(binary_dir)
+    converted = benchmark(convert_jsonl_log, jsonl.tokens_file, binary.binary_log.path, iterations=1)
+    gc.collect()
+    
+    stats = []
+    jsonl_result = benchmark(lambda: stats.append(jsonl.calculate_stats("run_tech_jsonl", "tech")), iterations=1)
+    binary_result = benchmark(lambda: stats.append(binary.calculate_stats("run_tech_binary", "tech")), iterations=1)
+    jsonl_stats, binary_stats = stats
+    
+    assert binary_stats.total_tokens == jsonl_stats.total_tokens
+    assert binary_stats.total_cost_usd == jsonl_stats.total_cost_usd
+    assert binary_stats.breakdown_by_operation == jsonl_stats.breakdown_by_operation
+    return {
+        "converted": converted,
+        "jsonl": jsonl_result,
+        "binary": binary_result,
+        "jsonl_size": (jsonl_dir / "tokens.jsonl").stat().st_size,
+        "binary_size": binary.binary_log.path.stat().st_size,
+    }
+
+
+def test_binary_token_log_matches_jsonl_stats(tmp_path):
+    """The binary log aggregates to the same stats as tokens.jsonl (small log, no timing)."""
+    _binary_token_log_stats(tmp_path, 2_000)
+
+
+@pytest.mark.benchmark
+def test_benchmark_binary_token_log_1m_records(tmp_path, benchmark_info=True):
+    """Benchmark token stats over 1M records: tokens.jsonl vs the mmap'd binary log."""
+    result = _binary_token_log_stats(tmp_path, 1_000_000)
+    jsonl_result, binary_result = result["jsonl"], result["binary"]
+    
+    if benchmark_info:
+        print(f"\n📊 Token stats (1M records):")
+        print(f"   tokens.jsonl: {jsonl_result['avg']*1000:.2f}ms ({result['jsonl_size']/1024/1024:.1f}MB)")
+        print(f"   tokens.bin:   {binary_result['avg']*1000:.2f}ms ({result['binary_size']/1024/1024:.1f}MB)")
+        print(f"   Conversion:   {result['converted']['avg']*1000:.2f}ms")
+        print(f"   Speedup: {jsonl_result['avg']/binary_result['avg']:.1f}x")
+    
+    # Performance assertion: skipping the JSON parse should at least halve the time
+    assert binary_result['avg'] < jsonl_result['avg'] / 2, "Binary token log should aggregate faster than JSONL"
+
+
+@pytest.mark.benchmark
+def test_benchmark_buffered_token_logging(tmp_path, benchmark_info=True):
+    """Benchmark 5,000 log_usage calls: one locked append per call vs buffered batches."""
+    from token_tracker import TokenTracker
+    
+    def log_all(tracker):
+        for i in range(5_000):
+            tracker.log_usage("advocate", input_tokens=1000 + i, output_tokens=500, iteration=i % 10)
+        tracker.close()
+    
+    unbuffered_dir = tmp_path / "output" / "tech" / "run_tech_unbuffered"
+    buffered_dir = tmp_path / "output" / "tech" / "run_tech_buffered"
+    unbuffered_dir.mkdir(parents=True)
+    buffered_dir.mkdir(parents=True)
+    unbuffered = benchmark(log_all, TokenTracker(unbuffered_dir), iterations=1)
+    buffered = benchmark(log_all, TokenTracker(buffered_dir, buffered=True), iterations=1)
+    
+    if benchmark_info:
+        print(f"\n📊 Logging 5,000 token records:")
+        print(f"   Append per call: {unbuffered['avg']*1000:.2f}ms")
+        print(f"   Buffered:        {buffered['avg']*1000:.2f}ms")
+    
+    assert len((buffered_dir / "tokens.jsonl").read_text().splitlines()) == 5_000
+    # Performance assertion: batching should save most of the per-call open/lock/write cost
+    assert buffered['avg'] < unbuffered['avg'] / 2, "Buffered logging should beat per-call appends"
+
+
+@pytest.mark.benchmark
+def test_benchmark_token_spend_from_rollups(tmp_path, benchmark_info=True):
+    """Benchmark spend per phase/model over 200 runs x 500 operations: rollups vs re-reading every log."""
+    import json
+    from token_ledger import ledger_line, ledger_path, spend
+    from token_tracker import TokenTracker
+    
+    output_root = tmp_path / "output"
+    phases, models = ["market", "design", "tech"], ["gpt-4", "claude"]
+    ledger = []
+    run_dirs = []
+    for r in range(200):
+        phase = phases[r % 3]
+        run_dir = output_root / phase / f"run_{phase}_{r:04d}"
+        run_dir.mkdir(parents=True)
+        run_dirs.append(run_dir)
+        lines = []
+        for i in range(500):
+            record = {"timestamp": f"2026-{1 + (r * 500 + i) % 9:02d}-{1 + i % 28:02d}T00:00:00",
+                      "operation": "advocate", "iteration": i % 5, "input_tokens": 1000 + i,
+                      "output_tokens": 500, "total_tokens": 1500 + i, "model": models[i % 2], "cost_usd": None}
+            lines.append(json.dumps(record) + "\n")
+            ledger.append(ledger_line(run_dir, record, (record["input_tokens"] / 1000) * 0.03 + 0.03))
+        (run_dir / "tokens.jsonl").write_text("".join(lines))
+    ledger_path(output_root).write_text("".join(ledger))
+    
+    def recompute():
+        return sum(TokenTracker(run_dir).calculate_stats(run_dir.name, run_dir.parent.name).total_tokens
+                   for run_dir in run_dirs)
+    
+    recomputed = benchmark(recompute, iterations=1)
+    first = benchmark(spend, output_root, group_by=["phase", "model"], iterations=1)
+    warm = benchmark(spend, output_root, since="2026-03-01", until="2026-06-30",
+                     group_by=["month", "phase", "model"], iterations=5)
+    rows = spend(output_root, group_by=["phase", "model"])
+    
+    if benchmark_info:
+        print(f"\n📊 Token spend (100k operations across 200 runs):")
+        print(f"   Re-reading every run: {recomputed['avg']*1000:.2f}ms")
+        print(f"   First spend (folds the ledger): {first['avg']*1000:.2f}ms")
+        print(f"   Spend from rollups: {warm['avg']*1000:.2f}ms")
+    
+    assert sum(row.total_tokens for row in rows) == recompute()
+    # Performance assertion: answering from rollups should be O(days), not O(operations)
+    assert warm['avg'] < recomputed['avg'] / 20, "Spend should not re-read token logs"
+
+
 @pytest.mark.benchmark
 def test_performance_summary(capsys):
     """Run all benchmarks and print summary."""
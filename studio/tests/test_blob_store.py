@@ -0,0 +1,96 @@
+"""Tests for the content-addressed artifact store."""
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cleanup
+from blob_store import blob_inodes, blob_path, collect_garbage, dedupe_run, file_digest
+
+BOILERPLATE = "# Studio Cascade Instructions\n\n" + "- Follow the iteration loop.\n" * 400
+
+
+def _write_run(output_root: Path, run_id: str, created_iso: str) -> Path:
+    run_dir = output_root / "market" / run_id
+    run_dir.mkdir(parents=True)
+    (run_dir / "run.json").write_text(
+        f'{{"run_id":"{run_id}","phase":"market","created_iso":"{created_iso}"}}', encoding="utf-8"
+    )
+    (run_dir / "instructions.md").write_text(BOILERPLATE, encoding="utf-8")
+    (run_dir / "summary.md").write_text(f"Summary for {run_id}\n", encoding="utf-8")
+    return run_dir
+
+
+def test_dedupe_run_links_identical_artifacts_to_one_read_only_blob(tmp_path):
+    output_root = tmp_path / "output"
+    first = _write_run(output_root, "run_market_a", "2025-01-01T00:00:00+00:00")
+    second = _write_run(output_root, "run_market_b", "2025-01-02T00:00:00+00:00")
+
+    assert dedupe_run(first, output_root).saved_bytes == 0
+    result = dedupe_run(second, output_root)
+
+    assert result.files == result.linked == 2
+    assert result.saved_bytes == len(BOILERPLATE)
+    blob = blob_path(output_root, file_digest(second / "instructions.md"))
+    assert blob.stat().st_ino == (first / "instructions.md").stat().st_ino
+    assert blob.stat().st_ino == (second / "instructions.md").stat().st_ino
+    assert blob.stat().st_nlink == 3
+    assert not blob.stat().st_mode & 0o222
+    assert (second / "run.json").stat().st_nlink == 1
+    # Re-running is a no-op.
+    assert dedupe_run(second, output_root).saved_bytes == 0
+
+
+def test_shared_blobs_are_counted_once_in_run_sizes(tmp_path):
+    output_root = tmp_path / "output"
+    runs = [
+        _write_run(output_root, f"run_market_{name}", "2025-01-01T00:00:00+00:00")
+        for name in ("a", "b", "c", "d")
+    ]
+    for run_dir in runs:
+        dedupe_run(run_dir, output_root)
+
+    blobs = blob_inodes(output_root)
+    total = sum(cleanup._directory_size(run_dir, blobs) for run_dir in runs)
+    unique = len(BOILERPLATE) + sum(
+        (run_dir / "run.json").stat().st_size + (run_dir / "summary.md").stat().st_size
+        for run_dir in runs
+    )
+    # Each run pays an equal share of the shared blob (rounded down).
+    assert unique - len(runs) < total <= unique
+
+
+def test_hardlinks_outside_the_blob_store_count_in_full(tmp_path):
+    import os
+
+    output_root = tmp_path / "output"
+    first = _write_run(output_root, "run_market_a", "2025-01-01T00:00:00+00:00")
+    second = _write_run(output_root, "run_market_b", "2025-01-01T00:00:00+00:00")
+    os.link(first / "instructions.md", second / "copied.md")
+    size = cleanup._directory_size(first, blob_inodes(output_root))
+
+    assert (first / "instructions.md").stat().st_nlink == 2
+    assert size == sum(path.stat().st_size for path in first.iterdir())
+
+
+def test_cleanup_collects_blobs_once_no_run_links_them(tmp_path):
+    output_root = tmp_path / "output"
+    now = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    old = _write_run(output_root, "run_market_old", (now - timedelta(days=40)).isoformat())
+    new = _write_run(output_root, "run_market_new", (now - timedelta(days=1)).isoformat())
+    for run_dir in (old, new):
+        dedupe_run(run_dir, output_root)
+    cleanup.invalidate_snapshot()
+    settings = cleanup.CleanupSettings(ttl_days=30, size_limit_mb=100)
+
+    report = cleanup.cleanup_runs(output_root, settings, now=now)
+
+    # The old run's summary blob is gone; the shared instructions blob survives.
+    assert [record.run.run_id for record in report.deletions] == ["run_market_old"]
+    assert report.blobs_removed == 1
+    assert blob_path(output_root, file_digest(new / "instructions.md")).exists()
+
+    report = cleanup.cleanup_runs(output_root, settings, now=now + timedelta(days=30))
+    assert report.blobs_removed == 2
+    assert collect_garbage(output_root) == (0, 0)
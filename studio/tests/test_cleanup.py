@@ -11,11 +11,13 @@ sys.modules[_spec.name] = cleanup
 _spec.loader.exec_module(cleanup)
 
 
-def _write_run(output_root: Path, phase: str, run_id: str, created_iso: str, size_bytes: int) -> Path:
+def _write_run(
+    output_root: Path, phase: str, run_id: str, created_iso: str, size_bytes: int, status: str = "COMPLETED"
+) -> Path:
     run_dir = output_root / phase / run_id
     run_dir.mkdir(parents=True, exist_ok=True)
     (run_dir / "run.json").write_text(
-        f'{{"run_id":"{run_id}","phase":"{phase}","created_iso":"{created_iso}"}}',
+        f'{{"run_id":"{run_id}","phase":"{phase}","created_iso":"{created_iso}","status":"{status}"}}',
         encoding="utf-8",
     )
     (run_dir / "artifact.bin").write_bytes(b"x" * size_bytes)
@@ -26,6 +28,18 @@ def test_load_cleanup_settings_defaults_when_missing(tmp_path):
     settings = cleanup.load_cleanup_settings(tmp_path)
     assert settings.ttl_days == cleanup.DEFAULT_TTL_DAYS
     assert settings.size_limit_mb == cleanup.DEFAULT_SIZE_LIMIT_MB
+    assert settings.size_workers == cleanup.DEFAULT_SIZE_WORKERS
+
+
+def test_load_cleanup_settings_reads_size_workers(tmp_path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "studio_settings.toml").write_text(
+        "[cleanup]\nttl_days = 7\nsize_workers = 2\n", encoding="utf-8"
+    )
+    settings = cleanup.load_cleanup_settings(tmp_path)
+    assert settings.ttl_days == 7
+    assert settings.size_workers == 2
 
 
 def test_cleanup_runs_enforces_ttl_and_size_budget(tmp_path):
@@ -61,3 +75,478 @@ def test_cleanup_runs_dry_run_does_not_delete(tmp_path):
 
     assert report.deletions
     assert run_dir.exists()
+
+
+def test_scan_runs_measures_sizes_once_per_snapshot(tmp_path, monkeypatch):
+    output_root = tmp_path / "output"
+    iso = datetime(2025, 1, 1, tzinfo=timezone.utc).isoformat()
+    _write_run(output_root, "market", "run_market_a", iso, size_bytes=10)
+    _write_run(output_root, "market", "run_market_b", iso, size_bytes=20)
+
+    sized = []
+    real_directory_size = cleanup._directory_size
+    monkeypatch.setattr(
+        cleanup,
+        "_directory_size",
+        lambda path, *rest: sized.append(path) or real_directory_size(path, *rest),
+    )
+    cleanup.invalidate_snapshot()
+
+    report = cleanup.cleanup_runs(output_root, cleanup.CleanupSettings(ttl_days=0, size_limit_mb=0))
+    snapshot = cleanup.scan_runs(output_root)
+
+    assert report.total_runs == 2
+    assert snapshot.total_size_bytes == report.total_size_bytes
+    assert len(sized) == 2
+
+    cleanup.invalidate_snapshot(output_root)
+    assert cleanup.scan_runs(output_root) is not snapshot
+
+
+def test_size_ledger_skips_unchanged_runs_and_remeasures_stale_ones(tmp_path, monkeypatch):
+    import os
+
+    output_root = tmp_path / "output"
+    iso = datetime(2025, 1, 1, tzinfo=timezone.utc).isoformat()
+    run_a = _write_run(output_root, "market", "run_market_a", iso, size_bytes=10)
+    _write_run(output_root, "market", "run_market_b", iso, size_bytes=20)
+
+    sized = []
+    real_directory_size = cleanup._directory_size
+    monkeypatch.setattr(
+        cleanup,
+        "_directory_size",
+        lambda path, *rest: sized.append(path.name) or real_directory_size(path, *rest),
+    )
+    cleanup.invalidate_snapshot()
+    first_total = cleanup.scan_runs(output_root).total_size_bytes
+
+    cleanup.invalidate_snapshot()
+    assert cleanup.scan_runs(output_root).total_size_bytes == first_total
+    assert sorted(sized) == ["run_market_a", "run_market_b"]
+
+    (run_a / "extra.bin").write_bytes(b"y" * 5)
+    os.utime(run_a, ns=(0, run_a.stat().st_mtime_ns + 1_000_000))
+    cleanup.invalidate_snapshot()
+    assert cleanup.scan_runs(output_root).total_size_bytes == first_total + 5
+    assert sorted(sized) == ["run_market_a", "run_market_a", "run_market_b"]
+
+
+def test_size_ledger_follows_noted_in_place_writes(tmp_path, monkeypatch):
+    import run_catalog
+
+    output_root = tmp_path / "output"
+    iso = datetime(2025, 1, 1, tzinfo=timezone.utc).isoformat()
+    run_dir = _write_run(output_root, "market", "run_market_a", iso, size_bytes=10)
+    artifact = run_dir / "artifact.bin"
+    cleanup.invalidate_snapshot()
+    first_total = cleanup.scan_runs(output_root).total_size_bytes
+
+    def append(data):
+        before = run_catalog.run_dir_mtime_ns(run_dir)
+        with open(artifact, "ab") as handle:
+            handle.write(data)
+        run_catalog.note_run_write(run_dir, len(data), before)
+
+    # A writer that exits before committing its running total: the size stamp
+    # alone makes the next scan re-measure the run.
+    append(b"y" * 7)
+    run_catalog._PENDING_WRITES.clear()
+    cleanup.invalidate_snapshot()
+    assert cleanup.scan_runs(output_root).total_size_bytes == first_total + 7
+
+    # A committed total keeps the entry fresh, so the run is not walked again.
+    append(b"z" * 5)
+    append(b"z" * 5)
+
+    def no_walks(paths, *rest):
+        assert not paths, "fresh runs should not be re-measured"
+        return []
+
+    monkeypatch.setattr(cleanup, "_directory_sizes", no_walks)
+    cleanup.invalidate_snapshot()
+    assert cleanup.scan_runs(output_root).total_size_bytes == first_total + 17
+
+
+def test_time_budget_defers_sizing_and_size_cap_deletions(tmp_path):
+    output_root = tmp_path / "output"
+    now = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    for day in range(1, 4):
+        iso = (now - timedelta(days=day)).isoformat()
+        _write_run(output_root, "market", f"run_market_{day}", iso, size_bytes=600_000)
+    cleanup.invalidate_snapshot()
+    settings = cleanup.CleanupSettings(ttl_days=30, size_limit_mb=1, size_workers=1)
+
+    # The first directory is always measured; the spent budget stops the rest.
+    boxed = cleanup.cleanup_runs(output_root, settings, now=now, time_budget=0.0)
+    assert boxed.unsized == 2
+    assert boxed.deletions == []
+    assert not boxed.complete
+    assert cleanup.load_cleanup_state(output_root)["unsized"] == 2
+
+    full = cleanup.cleanup_runs(output_root, settings, now=now)
+    assert full.unsized == 0
+    assert sorted(record.run.run_id for record in full.deletions) == ["run_market_2", "run_market_3"]
+
+
+def _write_markdown_run(output_root: Path, phase: str, run_id: str, created_iso: str, lines: int) -> Path:
+    run_dir = _write_run(output_root, phase, run_id, created_iso, size_bytes=0)
+    (run_dir / "summary.md").write_text(
+        "".join(f"- Iteration note {i}: the contrarian approved the plan.\n" for i in range(lines)),
+        encoding="utf-8",
+    )
+    return run_dir
+
+
+def test_cleanup_runs_archives_old_runs_and_counts_compressed_bytes(tmp_path):
+    from run_catalog import RunCatalog
+
+    output_root = tmp_path / "output"
+    now = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    old_iso = (now - timedelta(days=10)).isoformat()
+    recent_iso = (now - timedelta(days=1)).isoformat()
+    old_a = _write_markdown_run(output_root, "market", "run_market_a", old_iso, lines=12_000)
+    old_b = _write_markdown_run(output_root, "market", "run_market_b", old_iso, lines=12_000)
+    recent = _write_markdown_run(output_root, "market", "run_market_c", recent_iso, lines=100)
+    cleanup.invalidate_snapshot()
+
+    # ~1.2MB of markdown only fits the 1MB budget once the old runs are compressed.
+    settings = cleanup.CleanupSettings(ttl_days=30, size_limit_mb=1, archive_after_days=7)
+    report = cleanup.cleanup_runs(output_root, settings, now=now)
+
+    assert sorted(record.run.run_id for record in report.archivals) == ["run_market_a", "run_market_b"]
+    assert report.deletions == []
+    uncompressed, compressed = report.archived_bytes
+    assert compressed * 5 < uncompressed
+    assert not old_a.exists() and not old_b.exists() and recent.exists()
+    archive = output_root / ".archive" / "market" / "run_market_a.tar.xz"
+    assert archive.is_file()
+
+    with RunCatalog(output_root) as catalog:
+        entries = {entry.run_id: entry for entry in catalog.list_runs()}
+    assert entries["run_market_a"].archive == archive
+    assert entries["run_market_a"].size_bytes == archive.stat().st_size
+
+    snapshot = cleanup.scan_runs(output_root)
+    assert {record.run_id for record in snapshot.records if record.archived} == {
+        "run_market_a",
+        "run_market_b",
+    }
+    assert cleanup.cleanup_runs(output_root, settings, now=now).archivals == []
+
+    expired = cleanup.cleanup_runs(output_root, settings, now=now + timedelta(days=25))
+    assert {record.run.run_id for record in expired.deletions} == {"run_market_a", "run_market_b"}
+    assert not archive.exists()
+
+
+def test_cleanup_runs_dry_run_reports_archivals_without_writing(tmp_path):
+    output_root = tmp_path / "output"
+    now = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    run_dir = _write_markdown_run(
+        output_root, "design", "run_design_old", (now - timedelta(days=10)).isoformat(), lines=10
+    )
+    settings = cleanup.CleanupSettings(ttl_days=30, size_limit_mb=100, archive_after_days=7)
+
+    report = cleanup.cleanup_runs(output_root, settings, now=now, dry_run=True)
+
+    assert [record.run.run_id for record in report.archivals] == ["run_design_old"]
+    assert report.archivals[0].compressed_bytes is None
+    assert run_dir.exists()
+    assert not (output_root / ".archive").exists()
+
+
+def test_load_cleanup_settings_reads_archive_options(tmp_path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "studio_settings.toml").write_text(
+        '[cleanup]\narchive_after_days = 5\narchive_format = "zip"\n', encoding="utf-8"
+    )
+    settings = cleanup.load_cleanup_settings(tmp_path)
+    assert settings.archive_after_days == 5
+    assert settings.archive_format == "zip"
+
+
+def test_time_boxed_cleanup_deletes_a_bounded_batch_and_resumes(tmp_path):
+    output_root = tmp_path / "output"
+    now = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    old_iso = (now - timedelta(days=40)).isoformat()
+    for name in ("a", "b", "c"):
+        _write_run(output_root, "market", f"run_market_{name}", old_iso, size_bytes=10)
+    settings = cleanup.CleanupSettings(ttl_days=30, size_limit_mb=100)
+
+    # A spent budget still allows one action per pass, so every pass makes progress.
+    first = cleanup.cleanup_runs(output_root, settings, now=now, time_budget=0)
+    assert len(first.deletions) == 1 and first.deferred == 2
+    state = cleanup.load_cleanup_state(output_root)
+    assert state["pending"] == 2 and state["complete"] is False
+
+    second = cleanup.cleanup_runs(output_root, settings, now=now, time_budget=0)
+    assert second.deferred == 1
+    assert first.deletions[0].run.run_id != second.deletions[0].run.run_id
+
+    final = cleanup.cleanup_runs(output_root, settings, now=now)
+    assert len(final.deletions) == 1 and final.complete
+    assert cleanup.load_cleanup_state(output_root)["pending"] == 0
+    assert not list((output_root / "market").iterdir())
+
+
+def test_deferred_archivals_hold_back_budget_deletions(tmp_path):
+    output_root = tmp_path / "output"
+    now = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    old_iso = (now - timedelta(days=10)).isoformat()
+    _write_markdown_run(output_root, "market", "run_market_a", old_iso, lines=12_000)
+    _write_markdown_run(output_root, "market", "run_market_b", old_iso, lines=12_000)
+    settings = cleanup.CleanupSettings(ttl_days=30, size_limit_mb=1, archive_after_days=7)
+
+    report = cleanup.cleanup_runs(output_root, settings, now=now, time_budget=0)
+
+    assert len(report.archivals) == 1 and report.deferred == 1
+    assert report.deletions == []
+    report = cleanup.cleanup_runs(output_root, settings, now=now, time_budget=0)
+    assert len(report.archivals) == 1 and report.complete
+    assert report.deletions == []
+
+
+def test_load_cleanup_settings_reads_prepare_budget(tmp_path):
+    assert cleanup.load_cleanup_settings(tmp_path).prepare_time_budget == 0.25
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "studio_settings.toml").write_text(
+        "[cleanup]\nprepare_time_budget_ms = 0\nbackground_cleanup = true\n", encoding="utf-8"
+    )
+    settings = cleanup.load_cleanup_settings(tmp_path)
+    assert settings.prepare_time_budget is None
+    assert settings.background_cleanup is True
+
+
+def _reference_plan(records, settings, now):
+    """The original sort-based planner: ttl first, then delete oldest until the rest fits."""
+    cutoff = now - settings.ttl_delta
+    expired = [r for r in records if settings.ttl_days > 0 and r.created_at < cutoff]
+    remaining = [r for r in records if r not in expired]
+    remaining_size = sum(r.size_bytes for r in remaining)
+    over = []
+    for record in sorted(remaining, key=lambda r: r.created_at):
+        if not settings.size_limit_bytes or remaining_size <= settings.size_limit_bytes:
+            break
+        over.append(record)
+        remaining_size -= record.size_bytes
+    return expired, over
+
+
+def test_plan_evictions_matches_sorting_every_record():
+    import random
+
+    rng = random.Random(11)
+    now = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    for trial in range(200):
+        records = [
+            cleanup.RunRecord(
+                phase="market",
+                run_id=f"run_market_{i}",
+                path=Path(f"/output/market/run_market_{i}"),
+                # Few distinct timestamps so ties are common.
+                created_at=now - timedelta(days=rng.randrange(20)),
+                size_bytes=rng.randrange(1, 400_000),
+            )
+            for i in range(rng.randrange(1, 40))
+        ]
+        settings = cleanup.CleanupSettings(ttl_days=rng.choice([0, 10]), size_limit_mb=rng.choice([0, 1, 2]))
+
+        planner = cleanup.plan_evictions(records, settings, now)
+        expired, over = _reference_plan(records, settings, now)
+
+        assert planner.expired == expired, trial
+        assert sorted(planner.over_budget(), key=lambda r: r.run_id) == sorted(over, key=lambda r: r.run_id), trial
+
+
+def test_cleanup_renames_victims_into_trash_and_reaps_them(tmp_path):
+    output_root = tmp_path / "output"
+    now = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    old_iso = (now - timedelta(days=40)).isoformat()
+    for name in ("a", "b"):
+        _write_run(output_root, "market", f"run_market_{name}", old_iso, size_bytes=5_000)
+    settings = cleanup.CleanupSettings(ttl_days=30, size_limit_mb=100)
+
+    # A spent budget still deletes one run but leaves its directory in the trash.
+    first = cleanup.cleanup_runs(output_root, settings, now=now, time_budget=0)
+    assert len(first.deletions) == 1
+    assert (first.reaped, first.trash_pending) == (0, 1)
+    assert not first.deletions[0].run.path.exists()
+    assert len(list((output_root / ".trash").iterdir())) == 1
+    assert cleanup.scan_runs(output_root).total_size_bytes < 10_000
+
+    final = cleanup.cleanup_runs(output_root, settings, now=now)
+    assert final.reaped == 2 and final.complete
+    assert not list((output_root / ".trash").iterdir())
+    assert set(final.timings) >= {"scan", "plan", "delete", "reap"}
+    runs_per_second, bytes_per_second = final.deletion_throughput
+    assert runs_per_second > 0 and bytes_per_second > 0
+
+
+def test_phase_quota_evicts_within_the_flooding_phase_first(tmp_path):
+    output_root = tmp_path / "output"
+    now = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    for day in (10, 9):
+        _write_run(output_root, "tech", f"run_tech_{day}", (now - timedelta(days=day)).isoformat(), 250_000)
+    for day in (4, 3, 2, 1):
+        _write_run(output_root, "market", f"run_market_{day}", (now - timedelta(days=day)).isoformat(), 250_000)
+    flat = cleanup.CleanupSettings(ttl_days=30, size_limit_mb=1)
+    assert {r.run.run_id for r in cleanup.cleanup_runs(output_root, flat, now=now, dry_run=True).deletions} == {
+        "run_tech_10",
+        "run_tech_9",
+    }
+
+    settings = cleanup.CleanupSettings(
+        ttl_days=30, size_limit_mb=1, phase_quotas={"market": cleanup.PhaseQuota(max_runs=2)}
+    )
+    report = cleanup.cleanup_runs(output_root, settings, now=now)
+
+    assert {(r.run.run_id, r.reason) for r in report.deletions} == {
+        ("run_market_4", "quota"),
+        ("run_market_3", "quota"),
+    }
+    assert (output_root / "tech" / "run_tech_10").exists()
+
+
+def test_lru_policy_keeps_recently_accessed_runs(tmp_path):
+    from run_catalog import RunCatalog, note_run_access
+
+    output_root = tmp_path / "output"
+    now = datetime.now(timezone.utc)
+    old = _write_run(output_root, "tech", "run_tech_old", (now - timedelta(days=20)).isoformat(), 600_000)
+    _write_run(output_root, "tech", "run_tech_new", (now - timedelta(days=1)).isoformat(), 600_000)
+    with RunCatalog(output_root):
+        pass
+    note_run_access(old)
+    cleanup.invalidate_snapshot()
+
+    fifo = cleanup.CleanupSettings(ttl_days=10, size_limit_mb=1)
+    assert {r.run.run_id for r in cleanup.cleanup_runs(output_root, fifo, now=now, dry_run=True).deletions} == {
+        "run_tech_old"
+    }
+    lru = cleanup.CleanupSettings(ttl_days=10, size_limit_mb=1, eviction_policy="lru")
+    report = cleanup.cleanup_runs(output_root, lru, now=now)
+
+    assert [(r.run.run_id, r.reason) for r in report.deletions] == [("run_tech_new", "budget")]
+    assert old.exists()
+
+
+def test_lru_access_times_survive_reindex_and_catalog_rebuilds(tmp_path):
+    import sqlite3
+
+    from run_catalog import RunCatalog, catalog_path, note_run_access
+
+    output_root = tmp_path / "output"
+    now = datetime.now(timezone.utc)
+    old = _write_run(output_root, "tech", "run_tech_old", (now - timedelta(days=20)).isoformat(), 600_000)
+    _write_run(output_root, "tech", "run_tech_new", (now - timedelta(days=1)).isoformat(), 600_000)
+    with RunCatalog(output_root):
+        pass
+    note_run_access(old)
+
+    with RunCatalog(output_root) as catalog:
+        catalog.reindex()
+    # An older schema version makes the next open rebuild the catalog from disk.
+    with sqlite3.connect(catalog_path(output_root)) as conn:
+        conn.execute("PRAGMA user_version = 1")
+    cleanup.invalidate_snapshot()
+
+    lru = cleanup.CleanupSettings(ttl_days=10, size_limit_mb=1, eviction_policy="lru")
+    report = cleanup.cleanup_runs(output_root, lru, now=now)
+
+    assert [(r.run.run_id, r.reason) for r in report.deletions] == [("run_tech_new", "budget")]
+    assert old.exists()
+
+
+def test_pinned_runs_are_never_archived_or_evicted(tmp_path):
+    import json
+
+    output_root = tmp_path / "output"
+    now = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    pinned = _write_run(output_root, "tech", "run_tech_pinned", (now - timedelta(days=90)).isoformat(), 700_000)
+    meta = json.loads((pinned / "run.json").read_text(encoding="utf-8"))
+    (pinned / "run.json").write_text(json.dumps({**meta, "pinned": True}), encoding="utf-8")
+    _write_run(output_root, "tech", "run_tech_new", (now - timedelta(days=1)).isoformat(), 700_000)
+    settings = cleanup.CleanupSettings(
+        ttl_days=30,
+        size_limit_mb=1,
+        archive_after_days=7,
+        phase_quotas={"tech": cleanup.PhaseQuota(max_runs=1)},
+    )
+
+    report = cleanup.cleanup_runs(output_root, settings, now=now)
+
+    assert report.archivals == []
+    # The pin still uses the phase quota, so the unpinned run makes way for it.
+    assert [(r.run.run_id, r.reason) for r in report.deletions] == [("run_tech_new", "quota")]
+    assert pinned.exists()
+
+
+def test_load_cleanup_settings_reads_policy_and_phase_quotas(tmp_path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "studio_settings.toml").write_text(
+        '[cleanup]\neviction_policy = "lru"\n\n'
+        "[cleanup.phases.market]\nsize_limit_mb = 200\nmax_runs = 50\n\n"
+        "[cleanup.phases.tech]\nmax_runs = 0\n",
+        encoding="utf-8",
+    )
+    settings = cleanup.load_cleanup_settings(tmp_path)
+    assert settings.eviction_policy == "lru"
+    assert settings.phase_quotas == {"market": cleanup.PhaseQuota(size_limit_mb=200, max_runs=50)}
+    assert cleanup.load_cleanup_settings(tmp_path / "missing").eviction_policy == "fifo"
+
+
+def test_plan_evictions_with_quotas_and_pins_matches_sorting():
+    import random
+
+    def reference(records, settings, now):
+        cutoff = now - settings.ttl_delta
+        live = [r for r in records if r.pinned or not (settings.ttl_days > 0 and r.created_at < cutoff)]
+        quota_out = set()
+        for phase, quota in settings.phase_quotas.items():
+            members = [r for r in live if r.phase == phase]
+            size, count = sum(r.size_bytes for r in members), len(members)
+            for record in sorted((r for r in members if not r.pinned), key=lambda r: r.created_at):
+                if not (quota.size_limit_bytes and size > quota.size_limit_bytes) and not (
+                    quota.max_runs and count > quota.max_runs
+                ):
+                    break
+                quota_out.add(record.run_id)
+                size, count = size - record.size_bytes, count - 1
+        live = [r for r in live if r.run_id not in quota_out]
+        size = sum(r.size_bytes for r in live)
+        budget_out = set()
+        for record in sorted((r for r in live if not r.pinned), key=lambda r: r.created_at):
+            if size <= settings.size_limit_bytes:
+                break
+            budget_out.add(record.run_id)
+            size -= record.size_bytes
+        return quota_out, budget_out
+
+    rng = random.Random(5)
+    now = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    for trial in range(300):
+        records = [
+            cleanup.RunRecord(
+                phase=rng.choice(["market", "tech"]),
+                run_id=f"run_{i}",
+                path=Path(f"/output/run_{i}"),
+                created_at=now - timedelta(hours=rng.randrange(400)),
+                size_bytes=rng.randrange(1, 400_000),
+                pinned=rng.random() < 0.15,
+            )
+            for i in range(rng.randrange(1, 30))
+        ]
+        settings = cleanup.CleanupSettings(
+            ttl_days=rng.choice([0, 10]),
+            size_limit_mb=rng.choice([1, 2, 4]),
+            phase_quotas={"market": cleanup.PhaseQuota(size_limit_mb=rng.choice([0, 1]), max_runs=rng.choice([0, 3]))},
+        )
+
+        planner = cleanup.plan_evictions(records, settings, now)
+        quota_out, budget_out = reference(records, settings, now)
+
+        assert {r.run_id for r in planner.quota_evictions()} == quota_out, trial
+        assert {r.run_id for r in planner.over_budget()} == budget_out, trial
@@ -0,0 +1,126 @@
+"""Tests for the (path, mtime, size)-keyed config cache."""
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import run_phase_roles
+from config_cache import CACHE_DIR_ENV, clear_config_cache, load_cached, load_toml
+from run_phase_roles import resolve_role_details
+from scopes import load_scopes_config
+
+
+class CountingParser:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, raw):
+        self.calls += 1
+        return json.loads(raw)
+
+
+def test_load_cached_reparses_only_when_file_changes(tmp_path):
+    clear_config_cache()
+    path = tmp_path / "config.json"
+    path.write_text('{"value": 1}', encoding="utf-8")
+    parse = CountingParser()
+
+    assert load_cached(path, parse, namespace="test") == {"value": 1}
+    assert load_cached(path, parse, namespace="test") == {"value": 1}
+    assert parse.calls == 1
+
+    path.write_text('{"value": 22}', encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_cached(path, parse, namespace="test") == {"value": 22}
+    assert parse.calls == 2
+
+
+def test_callers_cannot_change_the_cached_value(tmp_path):
+    clear_config_cache()
+    path = tmp_path / "settings.toml"
+    path.write_text('[cleanup]\nphases = ["tech"]\n', encoding="utf-8")
+
+    first = load_toml(path)
+    first["cleanup"]["phases"].append("market")
+    first["extra"] = True
+    assert load_toml(path) == {"cleanup": {"phases": ["tech"]}}
+
+    (tmp_path / "role_packs").mkdir()
+    (tmp_path / "studio.manifest.json").write_text('{"roles": {"designer": {"title": "Designer"}}}',
+                                                   encoding="utf-8")
+    (tmp_path / "role_packs" / "core.json").write_text('{"roles": ["designer"]}', encoding="utf-8")
+    invited, details = resolve_role_details(tmp_path, "core", [])
+    invited.append("engineer")
+    details[0].deliverables.append("extra.md")
+    invited, details = resolve_role_details(tmp_path, "core", [])
+    assert invited == ["designer"]
+    assert "extra.md" not in details[0].deliverables
+
+
+def test_disk_cache_survives_a_cleared_memory_cache(tmp_path, monkeypatch):
+    clear_config_cache()
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    path = tmp_path / "config.json"
+    path.write_text('{"roles": ["a", "b"]}', encoding="utf-8")
+    parse = CountingParser()
+
+    load_cached(path, parse, namespace="test")
+    clear_config_cache()
+    assert load_cached(path, parse, namespace="test") == {"roles": ["a", "b"]}
+    assert parse.calls == 1
+    assert len(list((tmp_path / "cache").glob("test-*.marshal"))) == 1
+
+
+def test_toml_with_datetimes_stays_memory_only(tmp_path, monkeypatch):
+    clear_config_cache()
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    path = tmp_path / "settings.toml"
+    path.write_text("[run]\nstarted = 2025-01-01T00:00:00Z\n", encoding="utf-8")
+
+    assert load_toml(path)["run"]["started"].year == 2025
+    assert not list((tmp_path / "cache").glob("*.marshal"))
+
+
+def test_load_scopes_config_picks_up_edits(tmp_path):
+    clear_config_cache()
+    path = tmp_path / "scopes.toml"
+    ui = '[scopes.ui]\nfocus = "UI"\nmax_iterations = 2\n'
+    path.write_text(ui, encoding="utf-8")
+    assert [scope.name for scope in load_scopes_config(path).scopes] == ["ui"]
+
+    path.write_text(ui + '\n[scopes.api]\nfocus = "API"\nmax_iterations = 3\n', encoding="utf-8")
+    assert sorted(scope.name for scope in load_scopes_config(path).scopes) == ["api", "ui"]
+
+
+def test_resolve_role_details_is_memoized_per_pack_and_overrides(tmp_path, monkeypatch):
+    clear_config_cache()
+    manifest = {
+        "defaults": {"studio_role_pack": "core"},
+        "roles": {
+            "designer": {"title": "Designer"},
+            "engineer": {"title": "Engineer"},
+        },
+    }
+    (tmp_path / "studio.manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+    (tmp_path / "role_packs").mkdir()
+    (tmp_path / "role_packs" / "core.json").write_text('{"roles": ["designer"]}', encoding="utf-8")
+
+    built = []
+    real_build = run_phase_roles.build_role_details
+
+    def counting_build(manifest, names):
+        built.append(tuple(names))
+        return real_build(manifest, names)
+
+    monkeypatch.setattr(run_phase_roles, "build_role_details", counting_build)
+
+    invited, details = resolve_role_details(tmp_path, "core", [])
+    assert invited == ["designer"]
+    assert [role.title for role in details] == ["Designer"]
+    resolve_role_details(tmp_path, "core", [])
+    invited, _ = resolve_role_details(tmp_path, "core", ["+engineer"])
+    assert invited == ["designer", "engineer"]
+    assert built == [("designer",), ("designer", "engineer")]
@@ -239,11 +239,12 @@ def test_finalize_updates_index(temp_studio_root):
     )
     run_phase.finalize_run(finalize_args)
     
-    # Verify index.md was updated
+    # Verify the run's index shard was updated
     index_file = temp_studio_root / "output" / "index.md"
     assert index_file.exists()
     
-    index_content = index_file.read_text()
+    month = json.loads((run_dir / "run.json").read_text())["created_iso"][:7]
+    index_content = (temp_studio_root / "output" / "index" / "design" / f"{month}.md").read_text()
     assert run_id in index_content
     # Note: Index may not show verdict in all formats, just verify run is listed
 
@@ -448,5 +449,68 @@ def test_full_workflow_prepare_finalize_validate(temp_studio_root):
     assert (run_dir / "summary.md").exists()
 
 
+def test_concurrent_finalize_keeps_index_and_log_consistent(temp_studio_root):
+    """32 finalize processes racing on one output root leave a consistent index and log."""
+    import os
+    import subprocess
+
+    batch_path = temp_studio_root / "ideas.jsonl"
+    batch_path.write_text(
+        "".join(json.dumps({"text": f"Idea {i}", "no_scopes": True}) + "\n" for i in range(32))
+    )
+    manifest = run_phase.prepare_batch(
+        run_phase.parse_cli_args(["prepare", "--phase", "tech", "--batch", str(batch_path)])
+    )
+    run_ids = [run["run_id"] for run in manifest["runs"]]
+    for run in manifest["runs"]:
+        run_dir = Path(run["run_dir"])
+        (run_dir / "advocate_1.md").write_text("# Advocate\n\nProposal...")
+        (run_dir / "contrarian_1.md").write_text("# Contrarian\n\nVERDICT: APPROVED")
+        (run_dir / "summary.md").write_text("# Summary\n\nDone")
+
+    # Each process imports run_phase, then waits for the go file so the finalizes overlap.
+    go_file = temp_studio_root / "go"
+    script = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {str(Path(run_phase.__file__).parent)!r})\n"
+        "import run_phase\n"
+        f"while not __import__('os').path.exists({str(go_file)!r}):\n"
+        "    time.sleep(0.005)\n"
+        "sys.argv = ['run_phase.py'] + sys.argv[1:]\n"
+        "run_phase.main()\n"
+    )
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", script, "finalize", "--phase", "tech", "--run-id", run_id,
+             "--verdict", "APPROVED"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=os.environ.copy(),
+        )
+        for run_id in run_ids
+    ]
+    time.sleep(1.0)
+    go_file.touch()
+    errors = [proc.communicate(timeout=120)[1] for proc in procs]
+    assert all(proc.returncode == 0 for proc in procs), errors
+
+    output_root = temp_studio_root / "output"
+    month = json.loads((output_root / "tech" / run_ids[0] / "run.json").read_text())["created_iso"][:7]
+    shard_rows = (output_root / "index" / "tech" / f"{month}.md").read_text().splitlines()[
+        len(run_phase.INDEX_HEADER):
+    ]
+    assert sorted(row.split(" | ")[0][2:] for row in shard_rows) == sorted(run_ids)
+    assert all("| COMPLETED |" in row for row in shard_rows)
+    assert f"| tech | {month} | 32 |" in (output_root / "index.md").read_text()
+
+    log = (temp_studio_root / "knowledge" / "run_log.md").read_text()
+    assert log.count("# Studio Run Log") == 1
+    assert sorted(line.split()[1] for line in log.splitlines() if line.startswith("## ")) == sorted(run_ids)
+    for run_id in run_ids:
+        assert json.loads((output_root / "tech" / run_id / "run.json").read_text())["status"] == "COMPLETED"
+    assert not list(output_root.rglob("*.tmp"))
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,104 @@
+"""Tests for the compressed run archive tier."""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rerun import detect_rerun_mode, load_rejection_context
+from run_archive import (
+    archive_path,
+    archive_run,
+    iter_archived_runs,
+    read_archived_meta,
+    readable_run_dir,
+)
+from run_catalog import RunCatalog
+
+
+def _write_run(output_root: Path, phase: str, run_id: str) -> Path:
+    run_dir = output_root / phase / run_id
+    (run_dir / "notes").mkdir(parents=True)
+    (run_dir / "run.json").write_text(
+        json.dumps({"run_id": run_id, "phase": phase, "created_iso": "2025-01-01T00:00:00+00:00"}),
+        encoding="utf-8",
+    )
+    (run_dir / "contrarian_1.md").write_text(
+        "The plan ignores onboarding costs entirely and needs a budget.\n\nVERDICT: REJECTED\n",
+        encoding="utf-8",
+    )
+    (run_dir / "notes" / "extra.md").write_text("nested\n", encoding="utf-8")
+    return run_dir
+
+
+@pytest.mark.parametrize("fmt", ["tar.xz", "zip"])
+def test_archive_run_round_trips_through_readable_run_dir(tmp_path, fmt):
+    output_root = tmp_path / "output"
+    run_dir = _write_run(output_root, "market", "run_market_a")
+    archive = archive_path(output_root, "market", "run_market_a", fmt)
+
+    size = archive_run(run_dir, archive)
+
+    assert not run_dir.exists()
+    assert size == archive.stat().st_size
+    assert list(iter_archived_runs(output_root)) == [("market", "run_market_a", archive)]
+    assert read_archived_meta(archive)["run_id"] == "run_market_a"
+
+    extracted = readable_run_dir(run_dir)
+    assert extracted != run_dir
+    assert (extracted / "notes" / "extra.md").read_text(encoding="utf-8") == "nested\n"
+    assert readable_run_dir(archive) == extracted
+
+
+def test_readable_run_dir_leaves_live_and_unknown_runs_alone(tmp_path):
+    run_dir = _write_run(tmp_path / "output", "market", "run_market_live")
+    missing = tmp_path / "output" / "market" / "run_market_missing"
+
+    assert readable_run_dir(run_dir) == run_dir
+    assert readable_run_dir(missing) == missing
+
+
+def test_rerun_reads_rejections_from_archived_runs(tmp_path):
+    output_root = tmp_path / "output"
+    run_dir = _write_run(output_root, "market", "run_market_a")
+    archive_run(run_dir, archive_path(output_root, "market", "run_market_a"))
+
+    assert detect_rerun_mode(run_dir)
+    context = load_rejection_context(run_dir)
+    assert context is not None and context.iteration == 1
+
+
+def test_catalog_rebuild_lists_archived_runs(tmp_path):
+    output_root = tmp_path / "output"
+    archived_dir = _write_run(output_root, "market", "run_market_a")
+    _write_run(output_root, "market", "run_market_b")
+    archive = archive_path(output_root, "market", "run_market_a")
+    archive_run(archived_dir, archive)
+
+    with RunCatalog(output_root) as catalog:
+        catalog.reindex()
+        entries = {entry.run_id: entry for entry in catalog.list_runs()}
+
+    assert entries["run_market_a"].archive == archive
+    assert entries["run_market_a"].location == archive
+    assert entries["run_market_a"].meta["phase"] == "market"
+    assert entries["run_market_b"].archive is None
+
+
+def test_archive_extractions_are_bounded_per_process(tmp_path, monkeypatch):
+    import run_archive
+
+    monkeypatch.setattr(run_archive, "MAX_EXTRACTED", 2)
+    output_root = tmp_path / "output"
+    extracted = []
+    for index in range(3):
+        run_dir = _write_run(output_root, "market", f"run_market_{index}")
+        archive_run(run_dir, archive_path(output_root, "market", run_dir.name))
+        extracted.append(readable_run_dir(run_dir))
+
+    assert not extracted[0].exists()
+    assert extracted[1].is_dir() and extracted[2].is_dir()
+    assert readable_run_dir(output_root / "market" / "run_market_0") != extracted[0]
+    assert not extracted[1].exists()
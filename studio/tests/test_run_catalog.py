@@ -0,0 +1,155 @@
+"""Tests for the SQLite-backed run catalog."""
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cleanup
+from run_catalog import CATALOG_FILENAME, RunCatalog
+
+
+def _write_run(output_root: Path, phase: str, run_id: str, created_iso: str, **extra) -> Path:
+    run_dir = output_root / phase / run_id
+    run_dir.mkdir(parents=True, exist_ok=True)
+    meta = {"run_id": run_id, "phase": phase, "created_iso": created_iso, "status": "PENDING"}
+    meta.update(extra)
+    (run_dir / "run.json").write_text(json.dumps(meta), encoding="utf-8")
+    return run_dir
+
+
+def test_catalog_populates_from_disk_on_first_open(tmp_path):
+    output_root = tmp_path / "output"
+    _write_run(output_root, "market", "run_market_a", "2026-01-01T00:00:00+00:00")
+    _write_run(output_root, "tech", "run_tech_b", "2026-01-02T00:00:00+00:00", status="COMPLETED")
+    (output_root / "design" / "run_design_nometa").mkdir(parents=True)
+
+    with RunCatalog(output_root) as catalog:
+        entries = catalog.list_runs()
+
+    assert (output_root / CATALOG_FILENAME).exists()
+    assert [entry.run_id for entry in entries] == ["run_design_nometa", "run_market_a", "run_tech_b"]
+    assert entries[0].meta is None
+    assert entries[2].status == "COMPLETED"
+
+
+def test_catalog_newest_first_and_phase_filter(tmp_path):
+    output_root = tmp_path / "output"
+    with RunCatalog(output_root) as catalog:
+        for day in range(1, 4):
+            run_id = f"run_market_{day}"
+            catalog.upsert_run(
+                "market", run_id, {"run_id": run_id, "created_iso": f"2026-01-0{day}T00:00:00+00:00"}
+            )
+        catalog.upsert_run("tech", "run_tech_1", {"created_iso": "2026-02-01T00:00:00+00:00"})
+
+        newest = catalog.list_runs(newest_first=True, limit=2)
+        market = catalog.list_runs("market", newest_first=True)
+
+    assert [entry.run_id for entry in newest] == ["run_tech_1", "run_market_3"]
+    assert [entry.run_id for entry in market] == ["run_market_3", "run_market_2", "run_market_1"]
+
+
+def test_reindex_recovers_from_drift(tmp_path):
+    output_root = tmp_path / "output"
+    _write_run(output_root, "market", "run_market_a", "2026-01-01T00:00:00+00:00")
+    with RunCatalog(output_root) as catalog:
+        assert catalog.count() == 1
+
+    # Files change behind the catalog's back.
+    _write_run(output_root, "market", "run_market_b", "2026-01-02T00:00:00+00:00")
+    with RunCatalog(output_root) as catalog:
+        assert catalog.count() == 1
+        assert catalog.reindex() == 2
+        assert [entry.run_id for entry in catalog.list_runs()] == ["run_market_a", "run_market_b"]
+
+
+def test_cleanup_reads_catalog_and_drops_deleted_rows(tmp_path):
+    output_root = tmp_path / "output"
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    old_dir = _write_run(output_root, "market", "run_market_old", (now - timedelta(days=40)).isoformat())
+    _write_run(output_root, "market", "run_market_new", (now - timedelta(days=1)).isoformat())
+
+    report = cleanup.cleanup_runs(output_root, cleanup.CleanupSettings(ttl_days=30), now=now)
+
+    assert [record.run.run_id for record in report.deletions] == ["run_market_old"]
+    assert not old_dir.exists()
+    with RunCatalog(output_root) as catalog:
+        assert [entry.run_id for entry in catalog.list_runs()] == ["run_market_new"]
+
+
+def test_token_tracker_writes_keep_size_ledger_fresh(tmp_path, monkeypatch):
+    from run_catalog import run_dir_mtime_ns
+    from token_tracker import TokenTracker
+
+    output_root = tmp_path / "output"
+    run_dir = _write_run(output_root, "tech", "run_tech_a", "2026-01-01T00:00:00+00:00")
+    (run_dir / "tokens.jsonl").write_text("", encoding="utf-8")
+    size = cleanup.refresh_run_size(output_root, "tech", "run_tech_a")
+    commits = []
+    real_add_sizes = RunCatalog.add_sizes
+    monkeypatch.setattr(RunCatalog, "add_sizes", lambda self, rows: commits.append(rows) or real_add_sizes(self, rows))
+
+    tracker = TokenTracker(run_dir)
+    for iteration in range(3):
+        tracker.log_usage("advocate", input_tokens=100, output_tokens=50, iteration=iteration)
+    # Logging only keeps a running total; the ledger is written once, on close.
+    assert commits == []
+    tracker.close()
+    assert len(commits) == 1
+
+    with RunCatalog(output_root) as catalog:
+        (entry,) = catalog.list_runs()
+    expected = sum(path.stat().st_size for path in run_dir.iterdir())
+    assert entry.size_bytes == expected > size
+    assert entry.ledger_size(run_dir_mtime_ns(run_dir)) == expected
+
+
+def test_query_runs_filters_and_paginates_with_cursor(tmp_path):
+    import pytest
+    from run_catalog import CatalogError
+
+    output_root = tmp_path / "output"
+    with RunCatalog(output_root) as catalog:
+        for day in range(1, 8):
+            run_id = f"run_tech_202609{day:02d}"
+            catalog.upsert_run(
+                "tech",
+                run_id,
+                {
+                    "created_iso": f"2026-09-{day:02d}T00:00:00+00:00",
+                    "status": "COMPLETED",
+                    "verdict": "REJECTED" if day % 2 else "APPROVED",
+                },
+            )
+        # Same timestamp in another phase: the cursor must not skip it.
+        catalog.upsert_run(
+            "market",
+            "run_market_20260905",
+            {"created_iso": "2026-09-05T00:00:00+00:00", "status": "COMPLETED", "verdict": "REJECTED"},
+        )
+
+        pages, cursor = [], None
+        while True:
+            page, cursor = catalog.query_runs(
+                status="COMPLETED", verdict="REJECTED", since="2026-09-02", limit=2, cursor=cursor
+            )
+            pages.append([entry.run_id for entry in page])
+            if cursor is None:
+                break
+        tech_only, _ = catalog.query_runs(phase="tech", verdict="REJECTED", limit=10)
+
+        with pytest.raises(CatalogError):
+            catalog.query_runs(cursor="not-a-cursor")
+
+    assert pages == [
+        ["run_tech_20260907", "run_tech_20260905"],
+        ["run_market_20260905", "run_tech_20260903"],
+    ]
+    assert [entry.run_id for entry in tech_only] == [
+        "run_tech_20260907",
+        "run_tech_20260905",
+        "run_tech_20260903",
+        "run_tech_20260901",
+    ]
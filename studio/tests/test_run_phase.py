@@ -128,8 +128,12 @@ def test_prepare_and_finalize_creates_index_and_log(tmp_path, monkeypatch):
     assert meta["iterations_run"] == 1
     assert meta["hours"] == 1.25
 
-    index_contents = (studio_root / "output/index.md").read_text(encoding="utf-8")
+    month = meta["created_iso"][:7]
+    top_index = (studio_root / "output/index.md").read_text(encoding="utf-8")
+    assert f"index/market/{month}.md" in top_index
+    index_contents = (studio_root / f"output/index/market/{month}.md").read_text(encoding="utf-8")
     assert run_id in index_contents
+    assert "COMPLETED" in index_contents
 
     log_contents = (studio_root / "knowledge/run_log.md").read_text(encoding="utf-8")
     assert run_id in log_contents
@@ -194,3 +198,483 @@ def test_output_root_defaults_to_origin_repo_when_running_outside_studio(tmp_pat
 
     assert output_root == project_root / ".studio" / "output"
     assert knowledge_path == project_root / ".studio" / "knowledge" / "run_log.md"
+
+
+def test_reindex_rebuilds_catalog_from_disk(tmp_path, monkeypatch):
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+
+    run_id = run_phase.prepare_run(_prepare_args())
+    output_root = studio_root / "output"
+    (output_root / ".catalog.sqlite").unlink()
+
+    assert run_phase.reindex_runs() == 1
+    entries = run_phase.collect_runs(output_root)
+    assert [entry["run_id"] for entry in entries] == [run_id]
+
+
+def _index_entry(run_id, created_display, status="PENDING"):
+    return {
+        "run_id": run_id,
+        "phase": "market",
+        "created_iso": created_display.replace(" ", "T") + ":00+00:00",
+        "created_display": created_display,
+        "status": status,
+        "input": "idea",
+        "summary_path": "",
+    }
+
+
+def test_update_index_inserts_sorted_and_patches_in_place(tmp_path):
+    index_path = tmp_path / "index.md"
+    run_phase.write_index(
+        [
+            _index_entry("run_market_a", "2026-01-01 10:00"),
+            _index_entry("run_market_c", "2026-01-03 10:00"),
+        ],
+        index_path,
+    )
+
+    def unused():
+        raise AssertionError("index should be patched, not rebuilt")
+
+    run_phase.update_index(
+        index_path, rebuild_entries=unused, upsert=_index_entry("run_market_b", "2026-01-02 10:00")
+    )
+    run_phase.update_index(
+        index_path,
+        rebuild_entries=unused,
+        upsert=_index_entry("run_market_a", "2026-01-01 10:00", status="COMPLETED"),
+    )
+    run_phase.update_index(index_path, rebuild_entries=unused, remove=[("market", "run_market_c")])
+
+    rows = index_path.read_text(encoding="utf-8").splitlines()[len(run_phase.INDEX_HEADER):]
+    assert [row.split(" | ")[0] for row in rows] == ["| run_market_b", "| run_market_a"]
+    assert "COMPLETED" in rows[1]
+
+
+def test_corrupt_index_shard_is_rebuilt_from_catalog(tmp_path, monkeypatch):
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+    run_id = run_phase.prepare_run(_prepare_args())
+    run_dir = studio_root / "output" / "market" / run_id
+    month = run_phase.load_json(run_dir / "run.json")["created_iso"][:7]
+    shard_path = studio_root / "output" / "index" / "market" / f"{month}.md"
+    shard_path.write_text("not an index\n", encoding="utf-8")
+    for name in ("advocate_1.md", "contrarian_1.md", "summary.md"):
+        (run_dir / name).write_text("output", encoding="utf-8")
+
+    run_phase.finalize_run(_finalize_args(run_id=run_id))
+
+    contents = shard_path.read_text(encoding="utf-8")
+    assert contents.startswith("\n".join(run_phase.INDEX_HEADER))
+    assert f"| {run_id} | market |" in contents
+    assert "COMPLETED" in contents
+
+
+def test_rebuild_index_writes_one_shard_per_phase_and_month(tmp_path, monkeypatch):
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+    output_root = studio_root / "output"
+    for phase, run_id, created in (
+        ("market", "run_market_sep", "2026-09-30T23:00:00+00:00"),
+        ("market", "run_market_oct", "2026-10-01T01:00:00+00:00"),
+        ("tech", "run_tech_oct", "2026-10-02T01:00:00+00:00"),
+    ):
+        run_dir = output_root / phase / run_id
+        run_dir.mkdir(parents=True)
+        run_phase.write_json(
+            run_dir / "run.json",
+            {"run_id": run_id, "phase": phase, "created_iso": created, "input": "idea"},
+        )
+    stale_shard = output_root / "index" / "design" / "2020-01.md"
+    stale_shard.parent.mkdir(parents=True)
+    stale_shard.write_text("old", encoding="utf-8")
+
+    run_phase.reindex_runs()
+
+    top_rows = (output_root / "index.md").read_text(encoding="utf-8").splitlines()[4:]
+    assert [row.split(" | ")[:3] for row in top_rows] == [
+        ["| market", "2026-10", "1"],
+        ["| tech", "2026-10", "1"],
+        ["| market", "2026-09", "1"],
+    ]
+    assert "run_market_sep" in (output_root / "index/market/2026-09.md").read_text(encoding="utf-8")
+    assert "run_tech_oct" in (output_root / "index/tech/2026-10.md").read_text(encoding="utf-8")
+    assert not stale_shard.exists()
+
+
+def test_prepare_batch_creates_runs_with_one_cleanup_and_index_pass(tmp_path, monkeypatch, capsys):
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+    batch_path = tmp_path / "ideas.jsonl"
+    batch_path.write_text(
+        "\n".join(
+            json.dumps(item)
+            for item in (
+                {"text": "First idea"},
+                {"text": "Second idea", "max_iterations": 5},
+                {"phase": "design", "text": "Third idea"},
+            )
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    import cleanup
+
+    calls = {"cleanup": 0, "index": 0}
+    real_cleanup, real_refresh = cleanup.cleanup_runs, run_phase.refresh_index
+
+    def counting_cleanup(*args, **kwargs):
+        calls["cleanup"] += 1
+        return real_cleanup(*args, **kwargs)
+
+    def counting_refresh(**kwargs):
+        calls["index"] += 1
+        return real_refresh(**kwargs)
+
+    monkeypatch.setattr(cleanup, "cleanup_runs", counting_cleanup)
+    monkeypatch.setattr(run_phase, "refresh_index", counting_refresh)
+    manifest_path = tmp_path / "manifest.json"
+    args = run_phase.parse_cli_args(
+        ["prepare", "--phase", "market", "--batch", str(batch_path), "--manifest", str(manifest_path)]
+    )
+
+    manifest = run_phase.prepare_batch(args)
+
+    assert calls == {"cleanup": 1, "index": 1}
+    assert json.loads(capsys.readouterr().out) == manifest == run_phase.load_json(manifest_path)
+    runs = manifest["runs"]
+    assert [run["phase"] for run in runs] == ["market", "market", "design"]
+    assert len({run["run_id"] for run in runs}) == 3
+    for run in runs:
+        assert Path(run["instructions"]).exists()
+    second = run_phase.load_json(Path(runs[1]["run_dir"]) / "run.json")
+    assert second["max_iterations"] == 5 and second["input"] == "Second idea"
+
+    month = second["created_iso"][:7]
+    market_index = (studio_root / f"output/index/market/{month}.md").read_text(encoding="utf-8")
+    assert runs[0]["run_id"] in market_index and runs[1]["run_id"] in market_index
+    assert [entry["run_id"] for entry in run_phase.collect_runs(studio_root / "output")] == sorted(
+        run["run_id"] for run in runs
+    )
+
+
+def test_prepare_batch_rejects_invalid_lines_before_creating_runs(tmp_path, monkeypatch):
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+    batch_path = tmp_path / "ideas.jsonl"
+    batch_path.write_text('{"phase": "market", "text": "ok"}\n{"phase": "market"}\n', encoding="utf-8")
+
+    with pytest.raises(ValueError, match="ideas.jsonl:2"):
+        run_phase.prepare_batch(run_phase.parse_cli_args(["prepare", "--batch", str(batch_path)]))
+    assert not (studio_root / "output" / "market").exists()
+
+
+def test_parse_cli_args_requires_phase_and_text_without_batch():
+    with pytest.raises(SystemExit):
+        run_phase.parse_cli_args(["prepare", "--phase", "market"])
+
+
+def test_allocate_run_dir_steps_past_taken_ids_and_stays_sorted(tmp_path):
+    from datetime import datetime, timezone
+
+    now = datetime(2026, 3, 1, 12, 0, 0, 500, tzinfo=timezone.utc)
+    # Another process already claimed this microsecond.
+    (tmp_path / "tech" / "run_tech_20260301_120000_000500").mkdir(parents=True)
+
+    allocated = [run_phase.allocate_run_dir(tmp_path, "tech", now)[0] for _ in range(3)]
+
+    assert allocated == [
+        "run_tech_20260301_120000_000501",
+        "run_tech_20260301_120000_000502",
+        "run_tech_20260301_120000_000503",
+    ]
+    assert "run_tech_20260301_115959" < allocated[0] < "run_tech_20260301_120001"
+
+
+def test_parallel_processes_allocate_distinct_run_ids(tmp_path):
+    import itertools
+    import subprocess
+
+    script = (
+        "import sys; from datetime import datetime, timezone; from pathlib import Path\n"
+        f"sys.path.insert(0, {str(RUN_PHASE_PATH.parent)!r})\n"
+        "import run_phase\n"
+        "for _ in range(50):\n"
+        "    print(run_phase.allocate_run_dir(Path(sys.argv[1]), 'market', datetime.now(timezone.utc))[0])\n"
+    )
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script, str(tmp_path)], stdout=subprocess.PIPE, text=True)
+        for _ in range(8)
+    ]
+    outputs = [proc.communicate(timeout=60)[0].split() for proc in procs]
+
+    assert all(proc.returncode == 0 for proc in procs)
+    for ids in outputs:
+        assert ids == sorted(ids)
+    all_ids = [run_id for ids in outputs for run_id in ids]
+    assert len(set(all_ids)) == 400
+    assert sorted(path.name for path in (tmp_path / "market").iterdir()) == sorted(all_ids)
+
+
+def test_list_command_prints_json_page_with_cursor(tmp_path, monkeypatch, capsys):
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+    run_ids = [run_phase.prepare_run(_prepare_args(phase="tech", no_scopes=True)) for _ in range(3)]
+    capsys.readouterr()
+
+    first = run_phase.list_runs(run_phase.parse_cli_args(["list", "--phase", "tech", "--limit", "2", "--json"]))
+    assert json.loads(capsys.readouterr().out) == first
+    second = run_phase.list_runs(
+        run_phase.parse_cli_args(
+            ["list", "--phase", "tech", "--status", "pending", "--cursor", first["next_cursor"], "--json"]
+        )
+    )
+
+    assert [run["run_id"] for run in first["runs"] + second["runs"]] == run_ids[::-1]
+    assert second["next_cursor"] is None
+    assert first["runs"][0]["run_dir"] == (studio_root / "output" / "tech" / run_ids[2]).as_posix()
+
+
+def test_list_since_accepts_dates_and_offsets(tmp_path, monkeypatch, capsys):
+    from run_catalog import RunCatalog
+
+    _configure_tmp_studio(tmp_path, monkeypatch)
+    with RunCatalog(tmp_path / "output") as catalog:
+        for run_id, created_iso in (
+            ("run_tech_a", "2026-09-30T23:30:00+00:00"),
+            ("run_tech_b", "2026-10-01T00:00:00.250000+00:00"),
+            ("run_tech_c", "2026-10-01T12:00:00+00:00"),
+        ):
+            catalog.upsert_run("tech", run_id, {"created_iso": created_iso})
+
+    def listed(since):
+        page = run_phase.list_runs(run_phase.parse_cli_args(["list", "--since", since, "--json"]))
+        return [run["run_id"] for run in page["runs"]]
+
+    assert listed("2026-10-01") == ["run_tech_c", "run_tech_b"]
+    assert listed("2026-10-01T00:00:00") == ["run_tech_c", "run_tech_b"]
+    # 09:00 at +09:00 is midnight UTC.
+    assert listed("2026-10-01T09:00:00+09:00") == ["run_tech_c", "run_tech_b"]
+    assert listed("2026-10-01T01:00:00+02:00") == ["run_tech_c", "run_tech_b", "run_tech_a"]
+    with pytest.raises(ValueError):
+        listed("October")
+
+
+def test_build_instruction_doc_template_matches_direct_layout(tmp_path):
+    roles = [
+        run_phase.RoleDetails(
+            name="marketing",
+            title="Marketing $Lead",
+            advocate_focus="Sell ${idea}.",
+            contrarian_focus="Question growth claims.",
+            prompt_doc="docs/role_prompts/marketing.md",
+            deliverables=["Hook list", "$5 CAC model"],
+            escalate_on=["CAC > $10"],
+        )
+    ]
+    meta = {
+        "phase": "studio",
+        "run_id": "run_studio_20250101_000000_000001",
+        "max_iterations": 3,
+        "input": "Costs $20/mo\n   \n  with ${braces}",
+        "budget_cap": "$0-20/mo",
+        "created_display": "2025-01-01 00:00",
+        "studio_roles": {"pack": "studio_core", "overrides": ["+design"]},
+    }
+    run_dir = tmp_path / "run"
+    run_dir.mkdir()
+
+    def expected():
+        values = {
+            "run_id": meta["run_id"],
+            "run_dir": run_dir.as_posix(),
+            "max_iterations": "3",
+            "input": meta["input"],
+            "budget_cap": meta["budget_cap"],
+            "created": meta["created_display"],
+            "rerun": "",
+        }
+        return run_phase._compose_instruction_doc(
+            "studio", values, meta["studio_roles"], roles, None
+        )
+
+    run_phase._INSTRUCTION_TEMPLATES.clear()
+    first = run_phase.build_instruction_doc(meta, run_dir, roles)
+    meta["run_id"] = "run_studio_20250101_000000_000002"
+    second = run_phase.build_instruction_doc(meta, run_dir, roles)
+
+    assert len(run_phase._INSTRUCTION_TEMPLATES) == 1
+    assert second == expected()
+    assert first == second.replace("_000002", "_000001")
+    assert "\n\n  with ${braces}" in second
+
+    (run_dir / "contrarian_1.md").write_text("VERDICT: REJECTED\n", encoding="utf-8")
+    rerun_doc = run_phase.build_instruction_doc(meta, run_dir, roles)
+    assert run_phase.generate_rerun_instructions(run_dir) in rerun_doc
+    assert rerun_doc.endswith(second.split("## Agent Roles")[1])
+    assert len(run_phase._INSTRUCTION_TEMPLATES) == 1
+
+
+def test_validate_reads_archived_runs(tmp_path, monkeypatch, capsys):
+    from run_archive import archive_path, archive_run
+
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+    run_id = run_phase.prepare_run(_prepare_args())
+    output_root = studio_root / "output"
+    run_dir = output_root / "market" / run_id
+    (run_dir / "summary.md").write_text("# Summary\n\nShipped.\n", encoding="utf-8")
+    archive_run(run_dir, archive_path(output_root, "market", run_id))
+    capsys.readouterr()
+
+    run_phase.validate_run(SimpleNamespace(phase="market", run_id=run_id, config=None))
+
+    out = capsys.readouterr().out
+    assert f"Validating {run_id} (market phase, archived)" in out
+    assert "Validation complete" in out
+    assert not run_dir.exists()
+
+
+def test_finalize_dedupes_artifacts_when_enabled(tmp_path, monkeypatch):
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+    (studio_root / "config").mkdir()
+    (studio_root / "config" / "studio_settings.toml").write_text(
+        "[cleanup]\ndedupe_artifacts = true\n", encoding="utf-8"
+    )
+    run_dirs = []
+    for _ in range(2):
+        run_id = run_phase.prepare_run(_prepare_args())
+        run_dir = studio_root / "output" / "market" / run_id
+        for name in ("advocate_1.md", "contrarian_1.md", "summary.md"):
+            (run_dir / name).write_text(f"Shared {name}\n", encoding="utf-8")
+        run_phase.finalize_run(_finalize_args(run_id=run_id))
+        run_dirs.append(run_dir)
+
+    first, second = (run_dir / "summary.md" for run_dir in run_dirs)
+    assert first.stat().st_ino == second.stat().st_ino
+    assert first.stat().st_nlink == 3
+    assert (run_dirs[0] / "run.json").stat().st_nlink == 1
+
+    # Detaching hands one run writable copies without touching the other.
+    run_phase.main(["dedupe", "--detach", "--phase", "market", "--run-id", run_dirs[1].name])
+    with open(second, "a", encoding="utf-8") as handle:
+        handle.write("Revised\n")
+    assert first.read_text(encoding="utf-8") == "Shared summary.md\n"
+    assert first.stat().st_nlink == 2
+
+    # A bulk dedupe leaves runs that are still being written alone.
+    pending = studio_root / "output" / "market" / run_phase.prepare_run(_prepare_args())
+    (pending / "summary.md").write_text("Shared summary.md\n", encoding="utf-8")
+    run_phase.main(["dedupe"])
+    assert (pending / "summary.md").stat().st_nlink == 1
+    assert second.read_text(encoding="utf-8") == "Shared summary.md\nRevised\n"
+    assert first.read_text(encoding="utf-8") == "Shared summary.md\n"
+
+
+def test_prepare_skips_cleanup_while_another_pass_holds_the_lock(tmp_path, monkeypatch, capsys):
+    import cleanup
+    from atomic_io import file_lock
+
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+    output_root = studio_root / "output"
+    calls = []
+    monkeypatch.setattr(cleanup, "cleanup_runs", lambda *args, **kwargs: calls.append(kwargs))
+
+    with file_lock(output_root / cleanup.CLEANUP_LOCK_FILENAME):
+        run_id = run_phase.prepare_run(_prepare_args())
+
+    assert calls == []
+    assert "another cleanup pass is running" in capsys.readouterr().out
+    assert (output_root / "market" / run_id / "run.json").exists()
+
+
+def test_prepare_hands_deferred_cleanup_to_a_background_process(tmp_path, monkeypatch):
+    import itertools
+    import subprocess
+
+    import cleanup
+
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+    (studio_root / "config").mkdir()
+    (studio_root / "config" / "studio_settings.toml").write_text(
+        "[cleanup]\nttl_days = 1\nprepare_time_budget_ms = 1\nbackground_cleanup = true\n",
+        encoding="utf-8",
+    )
+    old_iso = "2020-01-01T00:00:00+00:00"
+    for name in ("a", "b", "c"):
+        run_dir = studio_root / "output" / "market" / f"run_market_{name}"
+        run_dir.mkdir(parents=True)
+        (run_dir / "run.json").write_text(
+            json.dumps({"run_id": run_dir.name, "phase": "market", "created_iso": old_iso}),
+            encoding="utf-8",
+        )
+    cleanup.invalidate_snapshot()
+    spawned = []
+    monkeypatch.setattr(subprocess, "Popen", lambda argv, **kwargs: spawned.append((argv, kwargs)))
+    monkeypatch.setattr(cleanup.time, "monotonic", itertools.count(0, 10).__next__)
+
+    run_phase.prepare_run(_prepare_args())
+
+    assert cleanup.load_cleanup_state(studio_root / "output")["pending"] == 2
+    [(argv, kwargs)] = spawned
+    assert argv[-1] == "cleanup"
+    assert kwargs["start_new_session"] is True
+    assert kwargs["env"]["STUDIO_ARTIFACT_ROOT"] == str(studio_root.resolve())
+
+
+def test_pin_command_and_finalize_feed_cleanup_records(tmp_path, monkeypatch):
+    import cleanup
+
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+    run_id = run_phase.prepare_run(_prepare_args())
+    run_dir = studio_root / "output" / "market" / run_id
+    (run_dir / "summary.md").write_text("# Summary\n", encoding="utf-8")
+    (run_dir / "advocate_1.md").write_text("Plan\n", encoding="utf-8")
+    (run_dir / "contrarian_1.md").write_text("VERDICT: APPROVED\n", encoding="utf-8")
+    run_phase.finalize_run(_finalize_args(run_id=run_id))
+
+    run_phase.main(["pin", "--phase", "market", "--run-id", run_id])
+
+    [record] = cleanup.scan_runs(studio_root / "output").records
+    assert record.pinned
+    assert record.last_access is not None and record.last_access >= record.created_at
+
+    run_phase.main(["pin", "--phase", "market", "--run-id", run_id, "--unpin"])
+    assert not cleanup.scan_runs(studio_root / "output").records[0].pinned
+
+
+def test_cleanup_archiving_relinks_index_rows_and_skips_pending_runs(tmp_path, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    import cleanup
+
+    studio_root = _configure_tmp_studio(tmp_path, monkeypatch)
+    (studio_root / "config").mkdir(exist_ok=True)
+    (studio_root / "config" / "studio_settings.toml").write_text(
+        "[cleanup]\nttl_days = 365\narchive_after_days = 1\nprepare_time_budget_ms = 0\n",
+        encoding="utf-8",
+    )
+    output_root = studio_root / "output"
+    finished = run_phase.prepare_run(_prepare_args())
+    run_dir = output_root / "market" / finished
+    (run_dir / "summary.md").write_text("# Summary\n", encoding="utf-8")
+    (run_dir / "advocate_1.md").write_text("Plan\n", encoding="utf-8")
+    (run_dir / "contrarian_1.md").write_text("VERDICT: APPROVED\n", encoding="utf-8")
+    run_phase.finalize_run(_finalize_args(run_id=finished))
+    pending = run_phase.prepare_run(_prepare_args())
+
+    real_cleanup_runs = cleanup.cleanup_runs
+    later = datetime.now(timezone.utc) + timedelta(days=10)
+    monkeypatch.setattr(
+        cleanup, "cleanup_runs", lambda *args, **kwargs: real_cleanup_runs(*args, now=later, **kwargs)
+    )
+    run_phase.main(["cleanup"])
+
+    archive = output_root / ".archive" / "market" / f"{finished}.tar.xz"
+    assert archive.is_file() and not run_dir.exists()
+    assert (output_root / "market" / pending).is_dir()
+    (shard,) = (output_root / run_phase.INDEX_DIRNAME / "market").glob("*.md")
+    rows = {row.split(" | ")[0].lstrip("| "): row for row in shard.read_text(encoding="utf-8").splitlines()}
+    assert f"[archive]({archive.as_posix()})" in rows[finished]
+    assert "_pending_" in rows[pending]
+
+    before = shard.read_text(encoding="utf-8")
+    run_phase.rebuild_index()
+    # Both runs were created in the same second, so only the row order may differ.
+    assert sorted(shard.read_text(encoding="utf-8").splitlines()) == sorted(before.splitlines())
+
@@ -0,0 +1,135 @@
+"""Tests for the optional run_phase daemon and its thin client."""
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import run_phase_daemon
+from run_phase_daemon import DaemonError, DaemonUnavailable, request, stop_daemon
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are length-limited, so keep them out of pytest's deep tmp dirs.
+    directory = Path(tempfile.mkdtemp(prefix="studio-daemon-"))
+    path = directory / "d.sock"
+    yield path
+    stop_daemon(path)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def studio_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("STUDIO_ROOT", str(tmp_path))
+    monkeypatch.setenv("STUDIO_ARTIFACT_ROOT", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_client_autostarts_daemon_and_runs_commands(studio_env, socket_path):
+    prepared = request(
+        ["prepare", "--phase", "tech", "--text", "Daemon idea", "--no-scopes"], socket_path=socket_path
+    )
+    assert prepared["exit_code"] == 0, prepared["stderr"]
+    assert "Prepared run_tech_" in prepared["stdout"]
+
+    (run_dir,) = (studio_env / "output" / "tech").iterdir()
+    for name in ("advocate_1.md", "contrarian_1.md", "summary.md"):
+        (run_dir / name).write_text("output", encoding="utf-8")
+    finalized = request(
+        ["finalize", "--phase", "tech", "--run-id", run_dir.name], socket_path=socket_path
+    )
+    assert finalized["exit_code"] == 0, finalized["stderr"]
+    assert '"status": "COMPLETED"' in (run_dir / "run.json").read_text(encoding="utf-8")
+
+
+def test_daemon_reports_command_failures(studio_env, socket_path):
+    missing = request(["finalize", "--phase", "tech", "--run-id", "run_missing"], socket_path=socket_path)
+    assert missing["exit_code"] == 1
+    assert "FileNotFoundError" in missing["stderr"]
+
+    usage = request(["finalize", "--phase", "tech"], socket_path=socket_path)
+    assert usage["exit_code"] == 2
+    assert "--run-id" in usage["stderr"]
+
+    unsupported = request(["reindex"], socket_path=socket_path)
+    assert unsupported["exit_code"] == 2
+
+
+def test_request_without_autostart_raises_when_no_daemon(socket_path):
+    with pytest.raises(DaemonUnavailable):
+        request(["cleanup", "--dry-run"], socket_path=socket_path, autostart=False)
+    assert not stop_daemon(socket_path)
+
+
+def test_client_does_not_rerun_locally_after_the_daemon_took_the_request(socket_path, monkeypatch, capsys):
+    import socket
+    import threading
+
+    import run_phase
+
+    # A daemon that reads the request and dies before replying.
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    server.listen(1)
+
+    def drop_request():
+        conn, _ = server.accept()
+        with conn:
+            run_phase_daemon._recv_line(conn)
+
+    thread = threading.Thread(target=drop_request)
+    thread.start()
+    ran_locally = []
+    monkeypatch.setattr(run_phase, "main", ran_locally.append)
+    monkeypatch.setenv(run_phase_daemon.SOCKET_ENV, str(socket_path))
+    try:
+        with pytest.raises(DaemonError):
+            request(["cleanup", "--dry-run"], socket_path=socket_path, autostart=False)
+        thread.join()
+        thread = threading.Thread(target=drop_request)
+        thread.start()
+        assert run_phase_daemon.client_main(["finalize", "--phase", "tech", "--run-id", "run_x"]) == 1
+    finally:
+        thread.join()
+        server.close()
+    assert ran_locally == []
+    assert "may or may not have completed" in capsys.readouterr().err
+
+
+def test_daemon_survives_malformed_and_stalled_requests(socket_path, monkeypatch):
+    import socket
+    import threading
+
+    monkeypatch.setattr(run_phase_daemon, "REQUEST_TIMEOUT_SECONDS", 0.2)
+    served = []
+    thread = threading.Thread(target=lambda: served.append(run_phase_daemon.serve(socket_path, idle_timeout=30)))
+    thread.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not socket_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        def send_raw(data):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(str(socket_path))
+                client.sendall(data)
+                return run_phase_daemon._recv_line(client)
+
+        for payload in (b"[]\n", b"1\n", b'"x"\n'):
+            assert json.loads(send_raw(payload))["exit_code"] == 2
+        assert json.loads(send_raw(b'{"argv": 5}\n'))["exit_code"] == 2
+        assert json.loads(send_raw(b'{"argv": ["list"], "cwd": "/nonexistent/studio"}\n'))["exit_code"] == 1
+        # A client that never finishes its line is dropped after the request timeout.
+        assert send_raw(b'{"argv": ') == b""
+        assert run_phase_daemon._send(socket_path, {"ping": True}, timeout=5) == {"ok": True}
+    finally:
+        stop_daemon(socket_path)
+        thread.join(timeout=10)
+    assert served == [0]
@@ -0,0 +1,66 @@
+"""Tests for rename-then-reap run deletion."""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from run_trash import move_to_trash, reap_trash, trash_entries
+
+
+def _write_run(output_root: Path, run_id: str) -> Path:
+    run_dir = output_root / "market" / run_id
+    (run_dir / "notes").mkdir(parents=True)
+    (run_dir / "summary.md").write_text("# Summary\n", encoding="utf-8")
+    (run_dir / "notes" / "draft.md").write_text("draft\n", encoding="utf-8")
+    return run_dir
+
+
+def test_move_to_trash_renames_runs_out_of_the_phase_directory(tmp_path):
+    output_root = tmp_path / "output"
+    first = _write_run(output_root, "run_market_a")
+    trashed = move_to_trash(first, output_root)
+    # The same run id can be trashed again without colliding.
+    second = _write_run(output_root, "run_market_a")
+    again = move_to_trash(second, output_root)
+
+    assert not first.exists()
+    assert trashed != again
+    assert (trashed / "notes" / "draft.md").read_text(encoding="utf-8") == "draft\n"
+    assert trashed.name.startswith("market--run_market_a--")
+    assert trash_entries(output_root) == sorted([trashed, again])
+
+
+def test_reap_trash_deletes_in_parallel_and_stops_at_the_deadline(tmp_path):
+    output_root = tmp_path / "output"
+    for name in ("a", "b", "c"):
+        move_to_trash(_write_run(output_root, f"run_market_{name}"), output_root)
+
+    late = reap_trash(output_root, workers=4, deadline=time.monotonic() - 1)
+    assert (late.reaped, late.pending) == (0, 3)
+
+    result = reap_trash(output_root, workers=4)
+    assert (result.reaped, result.pending) == (3, 0)
+    assert trash_entries(output_root) == []
+    assert reap_trash(output_root).reaped == 0
+
+
+def test_entries_that_cannot_be_reaped_are_set_aside_after_repeated_failures(tmp_path, monkeypatch):
+    import run_trash
+
+    output_root = tmp_path / "output"
+    move_to_trash(_write_run(output_root, "run_market_a"), output_root)
+    # Simulate a directory rmtree cannot remove (ignore_errors hides the failure).
+    monkeypatch.setattr(run_trash.shutil, "rmtree", lambda path, ignore_errors=False: None)
+
+    for _ in range(run_trash.REAP_ATTEMPTS - 1):
+        result = reap_trash(output_root)
+        assert (result.reaped, result.pending, result.failed) == (0, 1, 0)
+    result = reap_trash(output_root)
+    assert (result.reaped, result.pending, result.failed) == (0, 0, 1)
+
+    assert trash_entries(output_root) == []
+    (failed,) = run_trash.failed_entries(output_root)
+    assert failed.name.startswith("market--run_market_a--") and "~" not in failed.name
+    assert (failed / "summary.md").is_file()
+    assert reap_trash(output_root).failed == 1
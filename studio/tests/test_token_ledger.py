@@ -0,0 +1,153 @@
+"""Tests for the cross-run token ledger and its daily rollups."""
+import json
+import sys
+from pathlib import Path
+from unittest.mock import ANY
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from run_catalog import RunCatalog
+from token_ledger import (
+    TokenRollups, append_to_ledger, ledger_line, ledger_path, rollups_path, spend, sync_rollups,
+)
+from token_tracker import TokenTracker
+
+
+def _output_root(tmp_path: Path) -> Path:
+    output_root = tmp_path / "output"
+    for phase, run_id in (("market", "run_market_a"), ("tech", "run_tech_a"), ("tech", "run_tech_b")):
+        (output_root / phase / run_id).mkdir(parents=True)
+    RunCatalog(output_root).open().close()
+    return output_root
+
+
+def _ledger(output_root: Path, run: str, day: str, model, input_tokens: int, cost: float = 0.5) -> None:
+    phase = run.split("_")[1]
+    record = {"timestamp": f"{day}T12:00:00", "operation": "advocate", "model": model,
+              "input_tokens": input_tokens, "output_tokens": 10}
+    append_to_ledger(output_root, ledger_line(output_root / phase / run, record, cost))
+
+
+def test_log_usage_feeds_the_ledger_of_catalogued_runs_only(tmp_path):
+    output_root = _output_root(tmp_path)
+    TokenTracker(output_root / "tech" / "run_tech_a").log_usage("advocate", 100, 50, iteration=1, model="gpt-4")
+    with TokenTracker(output_root / "tech" / "run_tech_b", buffered=True) as tracker:
+        for _ in range(3):
+            tracker.log_usage("contrarian", 10, 5, iteration=1, model="claude")
+    TokenTracker(output_root / "market" / "run_market_a").log_usage("advocate", 1, 1)
+    TokenTracker(tmp_path / "loose" / "run_tech_x").log_usage("advocate", 1, 1)
+
+    entries = [json.loads(line) for line in ledger_path(output_root).read_text().splitlines()]
+    assert [(e["run_id"], e["model"]) for e in entries] == [
+        ("run_tech_a", "gpt-4"), ("run_tech_b", "claude"), ("run_tech_b", "claude"),
+        ("run_tech_b", "claude"), ("run_market_a", None),
+    ]
+    assert not ledger_path(tmp_path).exists()
+
+    rows = spend(output_root, group_by=["phase", "model"])
+    assert [(r.group, r.operations, r.total_tokens) for r in rows] == [
+        (("market", ""), 1, 2), (("tech", "claude"), 3, 45), (("tech", "gpt-4"), 1, 150),
+    ]
+    assert rows[2].cost_usd == (100 / 1000) * 0.03 + (50 / 1000) * 0.06
+
+
+def test_spend_filters_days_and_folds_each_ledger_line_once(tmp_path):
+    output_root = _output_root(tmp_path)
+    _ledger(output_root, "run_tech_a", "2026-09-30", "gpt-4", 100)
+    _ledger(output_root, "run_tech_a", "2026-10-01", "gpt-4", 200)
+    _ledger(output_root, "run_market_a", "2026-10-02", "claude", 300)
+
+    rows = spend(output_root, since="2026-10-01", group_by=["month", "phase"])
+    assert [(r.group, r.input_tokens) for r in rows] == [(("2026-10", "market"), 300), (("2026-10", "tech"), 200)]
+
+    _ledger(output_root, "run_tech_b", "2026-10-02", "gpt-4", 400)
+    with open(ledger_path(output_root), "a") as handle:
+        handle.write('{"day":"2026-10-02","pha')  # an append in progress
+    rows = spend(output_root, until="2026-10-01", group_by=["day"])
+    assert [(r.group, r.input_tokens) for r in rows] == [(("2026-09-30",), 100), (("2026-10-01",), 200)]
+    assert sync_rollups(output_root) == 0
+    [total] = spend(output_root, group_by=[])
+    assert (total.operations, total.input_tokens, total.cost_usd) == (4, 1000, 2.0)
+
+
+def test_rollups_are_rebuilt_from_the_ledger(tmp_path):
+    output_root = _output_root(tmp_path)
+    for day in ("2026-10-01", "2026-10-02", "2026-10-02"):
+        _ledger(output_root, "run_tech_a", day, "gpt-4", 100)
+    assert spend(output_root, group_by=["day"])[1].operations == 2
+
+    rollups_path(output_root).unlink()
+    assert [r.operations for r in spend(output_root, group_by=["day"])] == [1, 2]
+    # So are rollups written by an older schema.
+    with TokenRollups(output_root) as rollups:
+        rollups.conn.execute("PRAGMA user_version = 0")
+    assert [r.operations for r in spend(output_root, group_by=["day"])] == [1, 2]
+
+    # A truncated ledger replaces the rollups instead of adding to them.
+    lines = ledger_path(output_root).read_text().splitlines(keepends=True)
+    ledger_path(output_root).write_text(lines[0])
+    assert [(r.group, r.operations) for r in spend(output_root, group_by=["day"])] == [(("2026-10-01",), 1)]
+
+
+def test_rewritten_ledger_is_folded_again_even_when_longer(tmp_path):
+    output_root = _output_root(tmp_path)
+    for day in ("2026-10-01", "2026-10-02"):
+        _ledger(output_root, "run_tech_a", day, "gpt-4", 100)
+    assert [r.input_tokens for r in spend(output_root, group_by=["day"])] == [100, 100]
+
+    # Same length, different bytes before the folded offset.
+    path = ledger_path(output_root)
+    path.write_text(path.read_text().replace('"input_tokens":100', '"input_tokens":900'))
+    assert [r.input_tokens for r in spend(output_root, group_by=["day"])] == [900, 900]
+
+    # A longer ledger swapped in under the same name.
+    replacement = path.with_name("ledger.new")
+    replacement.write_text(path.read_text().replace('"input_tokens":900', '"input_tokens":5')
+                           + path.read_text())
+    replacement.replace(path)
+    rows = spend(output_root, group_by=["day"])
+    assert [(r.operations, r.input_tokens) for r in rows] == [(2, 905), (2, 905)]
+
+
+def test_tracker_folds_its_ledger_lines_when_closed(tmp_path):
+    output_root = _output_root(tmp_path)
+    run_dir = output_root / "tech" / "run_tech_a"
+    with TokenTracker(run_dir, buffered=True) as tracker:
+        tracker.log_usage("advocate", 100, 50, model="gpt-4")
+        tracker.log_usage("advocate", 10, 5, model="gpt-4")
+    tracker = TokenTracker(run_dir)
+    tracker.log_usage("contrarian", 1, 1, model="claude")
+    tracker.close()
+
+    with TokenRollups(output_root) as rollups:
+        assert rollups.spend(["model"]) == [("claude", 1, 1, 1, ANY), ("gpt-4", 2, 110, 55, ANY)]
+
+
+def test_rollups_leave_the_run_catalog_alone(tmp_path):
+    output_root = _output_root(tmp_path)
+    with RunCatalog(output_root) as catalog:
+        catalog.record_sizes([("tech", "run_tech_a", 123, 1)], accessed_iso="2026-10-01T00:00:00+00:00")
+    _ledger(output_root, "run_tech_a", "2026-10-01", "gpt-4", 100)
+
+    assert spend(output_root)[0].operations == 1
+    assert rollups_path(output_root).exists()
+    with RunCatalog(output_root) as catalog:
+        [entry] = [e for e in catalog.list_runs(phase="tech") if e.run_id == "run_tech_a"]
+    assert (entry.size_bytes, entry.accessed_iso) == (123, "2026-10-01T00:00:00+00:00")
+
+
+def test_analyze_tokens_spend_command(tmp_path, monkeypatch, capsys):
+    import analyze_tokens
+
+    output_root = _output_root(tmp_path)
+    _ledger(output_root, "run_tech_a", "2026-10-01", "gpt-4", 1000)
+    _ledger(output_root, "run_market_a", "2026-10-01", None, 500)
+    monkeypatch.setenv("STUDIO_ROOT", str(tmp_path))
+    monkeypatch.setattr(sys, "argv", ["analyze_tokens.py", "spend", "--since", "2026-10-01",
+                                      "--group-by", "phase,model"])
+
+    assert analyze_tokens.main() == 0
+    out = capsys.readouterr().out
+    assert "market (none)" in out
+    assert "tech   gpt-4" in out
+    assert "TOTAL" in out and "1,520" in out
@@ -0,0 +1,274 @@
+"""Tests for token usage aggregation."""
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_tracker import TokenTracker
+
+
+def _write_log(run_dir: Path, count: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    with open(run_dir / "tokens.jsonl", "w", encoding="utf-8") as handle:
+        for i in range(count):
+            input_tokens = rng.randint(0, 5000)
+            output_tokens = rng.randint(0, 3000)
+            handle.write(json.dumps({
+                "timestamp": f"2026-01-01T00:00:{i % 60:02d}",
+                "operation": rng.choice(["advocate", "contrarian", "integrator", "validation"]),
+                "iteration": rng.choice([None, 1, 2, 3]),
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+                "model": None,
+                "cost_usd": rng.choice([None, round(rng.random(), 3)]),
+            }) + "\n")
+            if i % 50 == 0:
+                handle.write("\n")
+
+
+def test_streaming_stats_match_a_pass_over_loaded_records(tmp_path):
+    run_dir = tmp_path / "run_tech_a"
+    _write_log(run_dir, 500)
+    tracker = TokenTracker(run_dir)
+    usages = tracker.load_usage()
+
+    stats = tracker.calculate_stats("run_tech_a", "tech")
+
+    assert stats.operations == []
+    assert stats.total_input_tokens == sum(u.input_tokens for u in usages)
+    assert stats.total_output_tokens == sum(u.output_tokens for u in usages)
+    assert stats.total_cost_usd == sum(u.cost_estimate for u in usages)
+    assert stats.iterations == len({u.iteration for u in usages if u.iteration is not None})
+    assert sum(entry["count"] for entry in stats.breakdown_by_operation.values()) == len(usages)
+    advocate = [u for u in usages if u.operation == "advocate"]
+    assert stats.breakdown_by_operation["advocate"] == {
+        "count": len(advocate),
+        "total_tokens": sum(u.total_tokens for u in advocate),
+        "total_cost": round(sum(u.cost_estimate for u in advocate), 4),
+    }
+    second = [u for u in usages if u.iteration == 2]
+    assert stats.breakdown_by_iteration["2"]["operations"] == [u.operation for u in second]
+    assert stats.breakdown_by_iteration["2"]["total_tokens"] == sum(u.total_tokens for u in second)
+
+    detailed = tracker.calculate_stats("run_tech_a", "tech", include_operations=True)
+    assert detailed.operations == usages
+    assert detailed.breakdown_by_iteration == stats.breakdown_by_iteration
+
+
+def test_stats_for_missing_or_iteration_less_logs(tmp_path):
+    tracker = TokenTracker(tmp_path / "run_tech_empty")
+    stats = tracker.calculate_stats("run_tech_empty", "tech")
+    assert (stats.total_tokens, stats.iterations, stats.breakdown_by_operation) == (0, 0, {})
+
+    tracker = TokenTracker(tmp_path)
+    tracker.log_usage("validation", input_tokens=100, output_tokens=20)
+    stats = tracker.calculate_stats("run_tech_b", "tech")
+    assert (stats.total_tokens, stats.iterations, stats.breakdown_by_iteration) == (120, 1, {})
+
+    tracker.save_summary(stats)
+    summary = json.loads(tracker.summary_file.read_text())
+    assert summary["breakdown_by_operation"]["validation"]["count"] == 1
+
+
+def _full_stats(run_dir: Path):
+    tracker = TokenTracker(run_dir)
+    tracker.summary_file = run_dir / "no_summary.json"
+    return tracker.calculate_stats("run_tech_c", "tech")
+
+
+def test_saved_checkpoint_folds_in_only_appended_lines(tmp_path):
+    run_dir = tmp_path / "run_tech_c"
+    _write_log(run_dir, 200)
+    tracker = TokenTracker(run_dir)
+    tracker.save_summary(tracker.calculate_stats("run_tech_c", "tech"))
+    log = run_dir / "tokens.jsonl"
+    checkpoint = json.loads(tracker.summary_file.read_text())["checkpoint"]
+    assert checkpoint["offset"] == log.stat().st_size
+
+    # Same-length edit far before the checkpoint: only a full re-read would see it.
+    text = log.read_text()
+    first = text.index('"input_tokens": ') + len('"input_tokens": ')
+    digit = "1" if text[first] != "1" else "2"
+    log.write_text(text[:first] + digit + text[first + 1:])
+    stale = _full_stats(run_dir)
+    for i in range(3):
+        tracker.log_usage("advocate", input_tokens=10, output_tokens=5, iteration=9)
+
+    stats = tracker.calculate_stats("run_tech_c", "tech")
+
+    assert stats.total_input_tokens != stale.total_input_tokens + 30
+    log.write_text(text + log.read_text()[len(text):])
+    expected = _full_stats(run_dir)
+    assert stats.total_input_tokens == expected.total_input_tokens
+    assert stats.total_cost_usd == expected.total_cost_usd
+    assert stats.breakdown_by_operation == expected.breakdown_by_operation
+    assert stats.breakdown_by_iteration == expected.breakdown_by_iteration
+    assert stats.breakdown_by_iteration["9"]["operations"] == ["advocate"] * 3
+
+
+def test_checkpoint_is_discarded_after_truncation_or_rewrite(tmp_path):
+    run_dir = tmp_path / "run_tech_c"
+    _write_log(run_dir, 100)
+    tracker = TokenTracker(run_dir)
+    tracker.save_summary(tracker.calculate_stats("run_tech_c", "tech"))
+    log = run_dir / "tokens.jsonl"
+    lines = log.read_text().splitlines(keepends=True)
+
+    log.write_text("".join(lines[:40]))
+    assert tracker.calculate_stats("run_tech_c", "tech") == _full_stats(run_dir)
+
+    _write_log(run_dir, 120, seed=11)  # rewritten and longer than before
+    stats = tracker.calculate_stats("run_tech_c", "tech")
+    assert stats.total_tokens == _full_stats(run_dir).total_tokens
+
+
+def test_checkpoint_stops_before_a_partially_written_line(tmp_path):
+    run_dir = tmp_path / "run_tech_c"
+    _write_log(run_dir, 20)
+    tracker = TokenTracker(run_dir)
+    log = run_dir / "tokens.jsonl"
+    complete = log.stat().st_size
+    with open(log, "a", encoding="utf-8") as handle:
+        handle.write('{"operation": "advo')
+
+    stats = tracker.calculate_stats("run_tech_c", "tech")
+    tracker.save_summary(stats)
+
+    assert stats.checkpoint["offset"] == complete
+    assert stats == _full_stats(run_dir)
+    with open(log, "a", encoding="utf-8") as handle:
+        handle.write('cate", "iteration": 1, "input_tokens": 7, "output_tokens": 3, '
+                     '"total_tokens": 10, "timestamp": "t", "model": null, "cost_usd": null}\n')
+    assert tracker.calculate_stats("run_tech_c", "tech").total_tokens == stats.total_tokens + 10
+
+
+def test_binary_log_round_trips_and_aggregates_like_jsonl(tmp_path):
+    run_dir = tmp_path / "run_tech_d"
+    _write_log(run_dir, 300)
+    tracker = TokenTracker(run_dir)
+    records = list(tracker.iter_records())
+    expected = _full_stats(run_dir)
+
+    assert tracker.convert_to_binary() == 300
+    assert not tracker.tokens_file.exists()
+    assert tracker.binary_log.path.stat().st_size < 300 * 60
+    strings = tracker.binary_log.strings()
+    assert len(strings) == len(set(strings)) == 4
+    assert list(tracker.iter_records()) == records
+    stats = tracker.calculate_stats("run_tech_c", "tech")
+    assert stats.total_cost_usd == expected.total_cost_usd
+    assert stats.breakdown_by_operation == expected.breakdown_by_operation
+    assert stats.breakdown_by_iteration == expected.breakdown_by_iteration
+
+    tracker.log_usage("reviewer", input_tokens=40, output_tokens=2, iteration=7, model="gpt-4")
+    with open(tracker.binary_log.path, "ab") as handle:
+        handle.write(b"\x00" * 10)  # an append in progress
+    stats = tracker.calculate_stats("run_tech_c", "tech", include_operations=True)
+    assert stats.operations[-1].operation == "reviewer"
+    assert stats.operations[-1].model == "gpt-4"
+    assert stats.breakdown_by_iteration["7"] == {"total_tokens": 42, "total_cost": 0.0013, "operations": ["reviewer"]}
+    assert stats.total_tokens == expected.total_tokens + 42
+
+
+def test_binary_log_readers_see_names_interned_after_the_table_was_read(tmp_path):
+    import pytest
+    from token_log import BinaryTokenLog, TokenLogError
+    from token_tracker import TokenAggregator
+
+    path = tmp_path / "tokens.bin"
+    record = {"timestamp": "2026-01-01T00:00:00", "input_tokens": 10, "output_tokens": 5, "total_tokens": 15}
+    BinaryTokenLog(path).append({**record, "operation": "advocate"})
+    reader = BinaryTokenLog(path)
+    strings = reader.string_table()
+    records = reader.iter_records()
+    # Another writer interns a new name and appends before the reader maps the log.
+    BinaryTokenLog(path).append({**record, "operation": "contrarian", "model": "gpt-4"})
+
+    assert [entry["operation"] for entry in records] == ["advocate", "contrarian"]
+    aggregator = TokenAggregator().fold_rows(reader.rows(), strings)
+    assert set(aggregator.by_operation) == {"advocate", "contrarian"}
+    with pytest.raises(TokenLogError):
+        strings[99]
+
+
+def test_buffered_trackers_append_whole_records_across_threads_and_processes(tmp_path):
+    import subprocess
+    import threading
+
+    run_dir = tmp_path / "run_tech_e"
+    run_dir.mkdir()
+    # A second process logging through an unclosed buffered tracker: its records
+    # must still reach the file when the interpreter exits.
+    child = subprocess.Popen([
+        sys.executable, "-c",
+        "import sys; sys.path.insert(0, sys.argv[1]); from token_tracker import TokenTracker\n"
+        "tracker = TokenTracker(sys.argv[2], buffered=True, max_batch_bytes=4096, max_batch_seconds=None)\n"
+        "for i in range(1000): tracker.log_usage('child', input_tokens=i, output_tokens=1, iteration=i)\n",
+        str(Path(__file__).parent.parent), str(run_dir),
+    ])
+    tracker = TokenTracker(run_dir, buffered=True, max_batch_bytes=2048)
+
+    def log(thread):
+        for i in range(250):
+            tracker.log_usage(f"thread{thread}", input_tokens=i, output_tokens=1, iteration=i)
+
+    threads = [threading.Thread(target=log, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    tracker.close()
+    assert child.wait(timeout=60) == 0
+
+    lines = (run_dir / "tokens.jsonl").read_text(encoding="utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 2000
+    counts = {}
+    for record in records:
+        counts[record["operation"]] = counts.get(record["operation"], 0) + 1
+    assert counts == {"child": 1000, "thread0": 250, "thread1": 250, "thread2": 250, "thread3": 250}
+    # Each writer's own records stay in order.
+    assert [r["input_tokens"] for r in records if r["operation"] == "child"] == list(range(1000))
+
+
+def test_buffered_tracker_flushes_on_its_timer_and_before_reads(tmp_path):
+    import time
+
+    run_dir = tmp_path / "run_tech_f"
+    run_dir.mkdir()
+    with TokenTracker(run_dir, buffered=True, max_batch_seconds=0.05) as tracker:
+        tracker.log_usage("advocate", input_tokens=10, output_tokens=5, iteration=1)
+        assert not tracker.tokens_file.exists()
+        deadline = time.monotonic() + 5
+        # The file can appear before the timer's flush has written to it.
+        while time.monotonic() < deadline and (
+            not tracker.tokens_file.exists() or not tracker.tokens_file.read_text(encoding="utf-8")
+        ):
+            time.sleep(0.01)
+        assert len(tracker.tokens_file.read_text(encoding="utf-8").splitlines()) == 1
+
+        tracker.log_usage("contrarian", input_tokens=20, output_tokens=5, iteration=1)
+        assert tracker.calculate_stats("run_tech_f", "tech").total_tokens == 40
+    with TokenTracker(run_dir, buffered=True, max_batch_seconds=None) as tracker:
+        tracker.log_usage("integrator", input_tokens=1, output_tokens=1)
+    assert TokenTracker(run_dir).calculate_stats("run_tech_f", "tech").total_tokens == 42
+
+
+def test_buffered_tracker_flushes_once_a_batch_fills(tmp_path):
+    run_dir = tmp_path / "run_tech_g"
+    run_dir.mkdir()
+    tracker = TokenTracker(run_dir, buffered=True, max_batch_bytes=1024, max_batch_seconds=None)
+    tracker.log_usage("advocate", input_tokens=1, output_tokens=1, iteration=0)
+    assert not tracker.tokens_file.exists()
+
+    for i in range(1, 20):
+        tracker.log_usage("advocate", input_tokens=1, output_tokens=1, iteration=i)
+    flushed = tracker.tokens_file.read_text(encoding="utf-8")
+    assert flushed.endswith("\n")
+    assert 0 < len(flushed.splitlines()) < 20
+    tracker.close()
+    assert len(tracker.tokens_file.read_text(encoding="utf-8").splitlines()) == 20
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Cross-run token ledger for a Studio output root.
+
+Every operation `TokenTracker.log_usage` records for a catalogued run is
+also appended to `output/.token_ledger.jsonl`, one compact JSON line per
+operation. Spend questions ("tokens per phase and model this month") are
+answered from daily (day, phase, model) rollups in
+`output/.token_rollups.sqlite` instead of re-reading every run's token log.
+The rollups are derived from the ledger: `TokenTracker` folds in the lines
+it appended when it is flushed or closed, and each query first folds in any
+lines still outstanding. A missing or outdated rollup file, or a ledger that
+was truncated, replaced or rewritten, folds the whole ledger again.
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from atomic_io import locked_append_text
+from run_catalog import BUSY_TIMEOUT_SECONDS, catalog_path
+
+LEDGER_FILENAME = ".token_ledger.jsonl"
+ROLLUPS_FILENAME = ".token_rollups.sqlite"
+ROLLUPS_SCHEMA_VERSION = 2
+# The rollups remember the ledger's inode and a hash of the bytes just before
+# the folded offset, so a rewritten ledger is noticed even when it is longer.
+LEDGER_TAIL_BYTES = 4096
+
+_SCHEMA = (
+    # Daily token spend, folded from the token ledger up to ledger_offset.
+    """
+    CREATE TABLE token_rollups (
+        day TEXT NOT NULL,
+        phase TEXT NOT NULL,
+        model TEXT NOT NULL,
+        operations INTEGER NOT NULL,
+        input_tokens INTEGER NOT NULL,
+        output_tokens INTEGER NOT NULL,
+        cost_usd REAL NOT NULL,
+        PRIMARY KEY (day, phase, model)
+    )
+    """,
+    """
+    CREATE TABLE token_ledger_state (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        ledger_offset INTEGER NOT NULL,
+        ledger_inode INTEGER NOT NULL,
+        tail_sha256 TEXT NOT NULL
+    )
+    """,
+)
+_TABLES = ("token_rollups", "token_ledger_state")
+# Columns `TokenRollups.spend` can group by.
+_GROUP_COLUMNS = {
+    "day": "day",
+    "month": "substr(day, 1, 7)",
+    "phase": "phase",
+    "model": "model",
+}
+GROUP_BY_FIELDS = tuple(_GROUP_COLUMNS)
+
+
+class TokenLedgerError(RuntimeError):
+    """Raised when the token rollups cannot be opened or queried."""
+
+
+@dataclass
+class SpendRow:
+    """Token spend for one group (values in `group_by` order)."""
+    group: Tuple[str, ...]
+    operations: int
+    input_tokens: int
+    output_tokens: int
+    cost_usd: float
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+def ledger_path(output_root: Path) -> Path:
+    return Path(output_root) / LEDGER_FILENAME
+
+
+def rollups_path(output_root: Path) -> Path:
+    return Path(output_root) / ROLLUPS_FILENAME
+
+
+def ledger_root(run_dir: Path) -> Optional[Path]:
+    """The output root whose ledger `run_dir` reports to, or None for runs outside a catalogued root."""
+    output_root = Path(run_dir).parent.parent
+    return output_root if catalog_path(output_root).exists() else None
+
+
+def ledger_line(run_dir: Path, record: Dict[str, Any], cost_usd: float) -> str:
+    """The ledger entry for one `tokens.jsonl`-style record, with its (estimated) cost."""
+    run_dir = Path(run_dir)
+    return json.dumps({
+        "day": record["timestamp"][:10],
+        "phase": run_dir.parent.name,
+        "run_id": run_dir.name,
+        "operation": record["operation"],
+        "model": record.get("model"),
+        "input_tokens": record["input_tokens"],
+        "output_tokens": record["output_tokens"],
+        "cost_usd": cost_usd,
+    }, separators=(",", ":")) + "\n"
+
+
+def append_to_ledger(output_root: Path, text: str) -> None:
+    locked_append_text(ledger_path(output_root), text)
+    note_ledger_append(output_root)
+
+
+# Output roots whose ledger gained lines that have not been folded yet.
+_UNFOLDED_ROOTS: Set[str] = set()
+_UNFOLDED_LOCK = threading.Lock()
+
+
+def note_ledger_append(output_root: Path) -> None:
+    """Remember that `output_root`'s ledger has lines for the next `fold_ledgers`."""
+    with _UNFOLDED_LOCK:
+        _UNFOLDED_ROOTS.add(os.path.abspath(output_root))
+
+
+def fold_ledgers(output_root: Optional[Path] = None) -> None:
+    """Fold noted ledger appends into the rollups, for `output_root` or for every root.
+
+    Best-effort: a fold that fails is left to the next `spend`, which folds
+    whatever is outstanding.
+    """
+    with _UNFOLDED_LOCK:
+        if output_root is None:
+            roots = list(_UNFOLDED_ROOTS)
+            _UNFOLDED_ROOTS.clear()
+        else:
+            root = os.path.abspath(output_root)
+            roots = [root] if root in _UNFOLDED_ROOTS else []
+            _UNFOLDED_ROOTS.discard(root)
+    for root in roots:
+        try:
+            sync_rollups(Path(root))
+        except (OSError, ValueError, KeyError, sqlite3.Error, TokenLedgerError):
+            continue
+
+
+LedgerState = Tuple[int, int, str]
+_EMPTY_STATE: LedgerState = (0, 0, "")
+
+
+def _tail_sha256(handle, offset: int) -> str:
+    tail_start = max(0, offset - LEDGER_TAIL_BYTES)
+    handle.seek(tail_start)
+    return hashlib.sha256(handle.read(offset - tail_start)).hexdigest()
+
+
+def _read_ledger(path: Path, state: LedgerState) -> Tuple[List[Tuple], LedgerState, bool]:
+    """Rollup rows for the complete ledger lines after the folded (offset, inode, tail_sha256).
+
+    A ledger that is shorter than the offset, is a different file, or no
+    longer has the same bytes before the offset was truncated, replaced or
+    rewritten, so it is read from the start and the rows replace the
+    existing rollups.
+    """
+    offset, inode, tail_sha256 = state
+    try:
+        handle = open(path, "rb")
+    except FileNotFoundError:
+        return [], _EMPTY_STATE, offset > 0
+    rollups: Dict[Tuple[str, str, str], List] = {}
+    with handle:
+        stat = os.fstat(handle.fileno())
+        reset = offset > 0 and (
+            stat.st_size < offset
+            or stat.st_ino != inode
+            or _tail_sha256(handle, offset) != tail_sha256
+        )
+        if reset:
+            offset = 0
+        handle.seek(offset)
+        for line in handle:
+            if not line.endswith(b"\n"):
+                break  # still being written
+            offset += len(line)
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            key = (entry["day"], entry["phase"], entry.get("model") or "")
+            totals = rollups.get(key)
+            if totals is None:
+                totals = rollups[key] = [0, 0, 0, 0.0]
+            totals[0] += 1
+            totals[1] += entry["input_tokens"]
+            totals[2] += entry["output_tokens"]
+            totals[3] += entry["cost_usd"]
+        state = (offset, stat.st_ino, _tail_sha256(handle, offset))
+    return [key + tuple(totals) for key, totals in rollups.items()], state, reset
+
+
+class TokenRollups:
+    """SQLite-backed daily spend rollups of one output root's token ledger."""
+
+    def __init__(self, output_root: Path):
+        self.output_root = Path(output_root)
+        self.path = rollups_path(self.output_root)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def __enter__(self) -> "TokenRollups":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        assert self._conn is not None
+        return self._conn
+
+    def open(self) -> "TokenRollups":
+        if self._conn is not None:
+            return self
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        try:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        except sqlite3.Error as exc:
+            raise TokenLedgerError(f"Failed to open token rollups at {self.path}: {exc}") from exc
+        self._conn = conn
+        try:
+            self._ensure_schema()
+        except sqlite3.Error as exc:
+            self.close()
+            raise TokenLedgerError(f"Failed to initialise token rollups at {self.path}: {exc}") from exc
+        return self
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _ensure_schema(self) -> None:
+        conn = self._conn
+        assert conn is not None
+        if conn.execute("PRAGMA user_version").fetchone()[0] == ROLLUPS_SCHEMA_VERSION:
+            return
+        with self._transaction():
+            if conn.execute("PRAGMA user_version").fetchone()[0] != ROLLUPS_SCHEMA_VERSION:
+                # Everything here is derived from the ledger, which the next
+                # update folds in again from offset 0.
+                for table in _TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {ROLLUPS_SCHEMA_VERSION}")
+
+    def update(
+        self, read_ledger: Callable[[LedgerState], Tuple[Iterable[Tuple], LedgerState, bool]]
+    ) -> int:
+        """Fold newly ledgered token spend into the rollups; return the rows applied.
+
+        `read_ledger(state)` is called under the write lock with the
+        (offset, inode, tail_sha256) of the ledger folded so far. It returns
+        (day, phase, model, operations, input_tokens, output_tokens, cost_usd)
+        rows, the state they end at, and whether they replace the rollups
+        instead of adding to them.
+        """
+        with self._transaction():
+            row = self.conn.execute(
+                "SELECT ledger_offset, ledger_inode, tail_sha256 FROM token_ledger_state"
+            ).fetchone()
+            rows, state, reset = read_ledger(tuple(row) if row else _EMPTY_STATE)
+            rows = list(rows)
+            if reset:
+                self.conn.execute("DELETE FROM token_rollups")
+            self.conn.executemany(
+                "INSERT INTO token_rollups"
+                " (day, phase, model, operations, input_tokens, output_tokens, cost_usd)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (day, phase, model) DO UPDATE SET"
+                " operations = operations + excluded.operations,"
+                " input_tokens = input_tokens + excluded.input_tokens,"
+                " output_tokens = output_tokens + excluded.output_tokens,"
+                " cost_usd = cost_usd + excluded.cost_usd",
+                rows,
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO token_ledger_state"
+                " (id, ledger_offset, ledger_inode, tail_sha256) VALUES (0, ?, ?, ?)",
+                state,
+            )
+        return len(rows)
+
+    def spend(
+        self,
+        group_by: Sequence[str],
+        *,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[Tuple]:
+        """Summed spend per group for days in [since, until] (YYYY-MM-DD).
+
+        Rows are the group values followed by operations, input_tokens,
+        output_tokens and cost_usd, ordered by group.
+        """
+        unknown = [name for name in group_by if name not in _GROUP_COLUMNS]
+        if unknown:
+            raise TokenLedgerError(f"Cannot group token spend by: {', '.join(unknown)}")
+        columns = [_GROUP_COLUMNS[name] for name in group_by]
+        clauses, params = [], []
+        if since:
+            clauses.append("day >= ?")
+            params.append(since)
+        if until:
+            clauses.append("day <= ?")
+            params.append(until)
+        sql = (
+            f"SELECT {''.join(column + ', ' for column in columns)}"
+            "SUM(operations), SUM(input_tokens), SUM(output_tokens), SUM(cost_usd) FROM token_rollups"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if columns:
+            positions = ", ".join(str(index + 1) for index in range(len(columns)))
+            sql += f" GROUP BY {positions} ORDER BY {positions}"
+        rows = self.conn.execute(sql, params).fetchall()
+        return [row for row in rows if row[len(columns)]]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def sync_rollups(output_root: Path, rollups: Optional[TokenRollups] = None) -> int:
+    """Fold ledger lines appended since the last sync into the rollups; return the rows touched."""
+    if rollups is None:
+        with TokenRollups(output_root) as opened:
+            return sync_rollups(output_root, opened)
+    path = ledger_path(output_root)
+    return rollups.update(lambda state: _read_ledger(path, state))
+
+
+def spend(
+    output_root: Path,
+    *,
+    since: Union[date, str, None] = None,
+    until: Union[date, str, None] = None,
+    group_by: Sequence[str] = ("phase",),
+) -> List[SpendRow]:
+    """Token spend between `since` and `until` (inclusive UTC days), grouped by `group_by`."""
+    with TokenRollups(output_root) as rollups:
+        sync_rollups(output_root, rollups)
+        rows = rollups.spend(
+            group_by,
+            since=since.isoformat() if isinstance(since, date) else since,
+            until=until.isoformat() if isinstance(until, date) else until,
+        )
+    width = len(group_by)
+    return [SpendRow(tuple(row[:width]), *row[width:]) for row in rows]
+
+
+atexit.register(fold_ledgers)
+
+
+__all__ = [
+    "GROUP_BY_FIELDS",
+    "LEDGER_FILENAME",
+    "LEDGER_TAIL_BYTES",
+    "ROLLUPS_FILENAME",
+    "SpendRow",
+    "TokenLedgerError",
+    "TokenRollups",
+    "append_to_ledger",
+    "fold_ledgers",
+    "ledger_line",
+    "ledger_path",
+    "ledger_root",
+    "note_ledger_append",
+    "rollups_path",
+    "spend",
+    "sync_rollups",
+]
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Fixed-width binary token logs for Studio runs.
+
+`tokens.jsonl` costs a JSON parse per record, which dominates token stats
+once a run logs thousands of operations. A run can instead keep its log in
+`tokens.bin`: a short header followed by fixed-width little-endian records,
+read through `mmap` without copying the file. Operation and model names are
+interned in `tokens.strings`, one JSON string per line, and records store
+their line numbers. `convert_jsonl_log` turns an existing JSONL log into
+this format.
+"""
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from atomic_io import atomic_write_text, file_lock, locked_append_fd, open_append
+
+BINARY_LOG_FILENAME = "tokens.bin"
+STRINGS_FILENAME = "tokens.strings"
+
+MAGIC = b"STUDIOTK"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII")  # magic, version, record size
+# timestamp (µs since the epoch, UTC), input, output, total tokens, cost (NaN
+# when unknown), iteration, operation string id, model string id.
+RECORD = struct.Struct("<qqqqdqII")
+FILE_HEADER = HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size)
+
+NO_ITERATION = -(2 ** 63)
+NO_STRING = 0xFFFFFFFF
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class TokenLogError(RuntimeError):
+    """Raised when a binary token log is unreadable or a record cannot be stored."""
+
+
+def _timestamp_micros(timestamp: str) -> int:
+    try:
+        moment = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError) as exc:
+        raise TokenLogError(f"Timestamp is not ISO 8601: {timestamp!r}") from exc
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def _timestamp_iso(micros: int) -> str:
+    return (_EPOCH + micros * _MICROSECOND).isoformat()
+
+
+def _encode(record: Dict[str, Any], intern) -> bytes:
+    iteration = record.get("iteration")
+    model = record.get("model")
+    cost = record.get("cost_usd")
+    return RECORD.pack(
+        _timestamp_micros(record["timestamp"]),
+        record["input_tokens"],
+        record["output_tokens"],
+        record["total_tokens"],
+        math.nan if cost is None else cost,
+        NO_ITERATION if iteration is None else iteration,
+        intern(record["operation"]),
+        NO_STRING if model is None else intern(model),
+    )
+
+
+class BinaryTokenLog:
+    """A run's `tokens.bin` and the string table beside it."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.strings_path = self.path.with_name(STRINGS_FILENAME)
+        self._ids: Optional[Dict[str, int]] = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def strings(self) -> List[str]:
+        try:
+            with open(self.strings_path, "r", encoding="utf-8") as handle:
+                return [json.loads(line) for line in handle if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def string_table(self) -> "StringTable":
+        """The string table for decoding `rows()`, including names interned while they are read."""
+        return StringTable(self)
+
+    def _intern(self, name: str) -> Tuple[int, int]:
+        """The id for `name` and the bytes written to the string table to add it."""
+        if self._ids is not None and name in self._ids:
+            return self._ids[name], 0
+        # Another process may be interning too, so ids are assigned under a lock
+        # from the table as it is on disk.
+        with file_lock(self.strings_path.with_name(f".{STRINGS_FILENAME}.lock")):
+            strings = self.strings()
+            self._ids = {value: index for index, value in reversed(list(enumerate(strings)))}
+            if name in self._ids:
+                return self._ids[name], 0
+            line = json.dumps(name) + "\n"
+            with open(self.strings_path, "a", encoding="utf-8") as handle:
+                handle.write(line)
+            self._ids[name] = len(strings)
+            return len(strings), len(line.encode("utf-8"))
+
+    def encode(self, record: Dict[str, Any]) -> Tuple[bytes, int]:
+        """Pack one record (a `tokens.jsonl`-style dict), interning its names.
+
+        Returns the packed record and the bytes added to the string table.
+        """
+        written = 0
+
+        def intern(name: str) -> int:
+            nonlocal written
+            index, added = self._intern(name)
+            written += added
+            return index
+
+        return _encode(record, intern), written
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Append one record and return the bytes written to the log and string table."""
+        data, written = self.encode(record)
+        fd = open_append(self.path)
+        try:
+            return written + locked_append_fd(fd, data, header=FILE_HEADER)
+        finally:
+            os.close(fd)
+
+    def rows(self) -> Iterator[Tuple]:
+        """Yield raw `RECORD` tuples straight from the memory-mapped log.
+
+        A trailing partial record (an append in progress) is skipped.
+        """
+        try:
+            handle = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < HEADER.size:
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, version, record_size = HEADER.unpack_from(mapped)
+                if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD.size:
+                    raise TokenLogError(f"Not a version {FORMAT_VERSION} token log: {self.path}")
+                end = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+                view = memoryview(mapped)[HEADER.size:end]
+                rows = RECORD.iter_unpack(view)
+                try:
+                    yield from rows
+                finally:
+                    # The iterator holds a buffer export that must go before the view and map.
+                    del rows
+                    view.release()
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield records as the dicts `tokens.jsonl` would hold."""
+        strings = self.string_table()
+        for micros, input_tokens, output_tokens, total_tokens, cost, iteration, operation, model in self.rows():
+            yield {
+                "timestamp": _timestamp_iso(micros),
+                "operation": strings[operation],
+                "iteration": None if iteration == NO_ITERATION else iteration,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": total_tokens,
+                "model": None if model == NO_STRING else strings[model],
+                "cost_usd": None if math.isnan(cost) else cost,
+            }
+
+
+class StringTable(Sequence):
+    """A binary log's interned names, re-read from disk when a record names a newer id.
+
+    A record is only appended after its names are in `tokens.strings`, but a
+    table read before the log is mapped can still miss names interned in
+    between, so an unknown id triggers one fresh read before it is an error.
+    """
+
+    def __init__(self, log: BinaryTokenLog):
+        self._log = log
+        self._strings = log.strings()
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __getitem__(self, index):
+        try:
+            return self._strings[index]
+        except IndexError:
+            self._strings = self._log.strings()
+        try:
+            return self._strings[index]
+        except IndexError:
+            raise TokenLogError(
+                f"Token log names string {index}, but {self._log.strings_path} has {len(self._strings)}"
+            ) from None
+
+
+def convert_jsonl_log(jsonl_path: Path, binary_path: Path) -> int:
+    """Write the records of `jsonl_path` to a new binary log at `binary_path`.
+
+    Both files of the binary log are replaced atomically. Returns the number
+    of records converted.
+    """
+    ids: Dict[str, int] = {}
+
+    def intern(name: str) -> int:
+        index = ids.get(name)
+        if index is None:
+            index = ids[name] = len(ids)
+        return index
+
+    binary_path = Path(binary_path)
+    tmp_path = binary_path.with_name(f".{binary_path.name}.{os.getpid()}.tmp")
+    count = 0
+    try:
+        with open(jsonl_path, "r", encoding="utf-8") as source, open(tmp_path, "wb") as target:
+            target.write(FILE_HEADER)
+            for line in source:
+                if line.strip():
+                    target.write(_encode(json.loads(line), intern))
+                    count += 1
+        # Strings first: a record must never name an id the table lacks.
+        atomic_write_text(
+            binary_path.with_name(STRINGS_FILENAME), "".join(json.dumps(name) + "\n" for name in ids)
+        )
+        os.replace(tmp_path, binary_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return count
+
+
+__all__ = [
+    "BINARY_LOG_FILENAME",
+    "BinaryTokenLog",
+    "FILE_HEADER",
+    "RECORD",
+    "STRINGS_FILENAME",
+    "StringTable",
+    "TokenLogError",
+    "convert_jsonl_log",
+]
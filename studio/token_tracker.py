@@ -6,11 +6,31 @@ Tracks token consumption across iterations to measure and optimize usage.
 """
 from __future__ import annotations
 
+import atexit
+import hashlib
 import json
-from dataclasses import dataclass, asdict
+import os
+import threading
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+from atomic_io import locked_append_fd, open_append
+from run_catalog import flush_run_writes, note_run_write, run_dir_mtime_ns
+from token_ledger import (
+    append_to_ledger, fold_ledgers, ledger_line, ledger_path, ledger_root, note_ledger_append,
+)
+from token_log import BINARY_LOG_FILENAME, FILE_HEADER, NO_ITERATION, BinaryTokenLog, convert_jsonl_log
+
+# token_summary.json remembers how far into tokens.jsonl it has read. The
+# bytes just before that offset are hashed so a rewritten log is noticed.
+CHECKPOINT_TAIL_BYTES = 4096
+
+# Buffered trackers flush once this much is pending, or this long after the
+# first unflushed record.
+DEFAULT_MAX_BATCH_BYTES = 64 * 1024
+DEFAULT_MAX_BATCH_SECONDS = 1.0
 
 
 @dataclass
@@ -28,15 +48,20 @@ class TokenUsage:
     @property
     def cost_estimate(self) -> float:
         """Estimate cost based on typical pricing if not provided."""
-        if self.cost_usd is not None:
-            return self.cost_usd
-        
-        # Rough estimates (update with actual pricing)
-        # GPT-4: ~$0.03/1K input, ~$0.06/1K output
-        # Claude: ~$0.015/1K input, ~$0.075/1K output
-        input_cost = (self.input_tokens / 1000) * 0.03
-        output_cost = (self.output_tokens / 1000) * 0.06
-        return input_cost + output_cost
+        return estimate_cost(self.input_tokens, self.output_tokens, self.cost_usd)
+
+
+def estimate_cost(input_tokens: int, output_tokens: int, cost_usd: Optional[float] = None) -> float:
+    """Cost of one operation: `cost_usd` when known, else a rough per-token estimate."""
+    if cost_usd is not None:
+        return cost_usd
+    
+    # Rough estimates (update with actual pricing)
+    # GPT-4: ~$0.03/1K input, ~$0.06/1K output
+    # Claude: ~$0.015/1K input, ~$0.075/1K output
+    input_cost = (input_tokens / 1000) * 0.03
+    output_cost = (output_tokens / 1000) * 0.06
+    return input_cost + output_cost
 
 
 @dataclass
@@ -49,7 +74,12 @@ class RunTokenStats:
     total_tokens: int
     total_cost_usd: float
     iterations: int
-    operations: List[TokenUsage]
+    # Only filled when calculate_stats(..., include_operations=True).
+    operations: List[TokenUsage] = field(default_factory=list)
+    breakdown_by_operation: Dict[str, Dict] = field(default_factory=dict)
+    breakdown_by_iteration: Dict[str, Dict] = field(default_factory=dict)
+    # Where in tokens.jsonl these stats were read up to; saved with the summary.
+    checkpoint: Optional[Dict[str, Any]] = field(default=None, repr=False)
     
     @property
     def avg_tokens_per_iteration(self) -> float:
@@ -62,14 +92,329 @@ class RunTokenStats:
         return self.total_cost_usd / self.iterations if self.iterations > 0 else 0
 
 
+class TokenAggregator:
+    """Single-pass totals and breakdowns over token usage records.
+    
+    Records are folded in one at a time, so memory grows with the number of
+    distinct operations and iterations rather than with the log. Costs are
+    summed in log order, matching a sum over the loaded records.
+    """
+    
+    def __init__(self) -> None:
+        self.records = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+        self.by_operation: Dict[str, Dict[str, Any]] = {}
+        self.by_iteration: Dict[str, Dict[str, Any]] = {}
+    
+    def add(self, record: Dict[str, Any]) -> None:
+        """Fold in one record, given as the dict stored in `tokens.jsonl`."""
+        input_tokens = record["input_tokens"]
+        output_tokens = record["output_tokens"]
+        total_tokens = record["total_tokens"]
+        cost = estimate_cost(input_tokens, output_tokens, record.get("cost_usd"))
+        operation = record["operation"]
+        
+        self.records += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost_usd += cost
+        
+        op = self.by_operation.get(operation)
+        if op is None:
+            op = self.by_operation[operation] = {"count": 0, "total_tokens": 0, "total_cost": 0.0}
+        op["count"] += 1
+        op["total_tokens"] += total_tokens
+        op["total_cost"] += cost
+        
+        iteration = record.get("iteration")
+        if iteration is not None:
+            key = str(iteration)
+            it = self.by_iteration.get(key)
+            if it is None:
+                it = self.by_iteration[key] = {"total_tokens": 0, "total_cost": 0.0, "operations": []}
+            it["total_tokens"] += total_tokens
+            it["total_cost"] += cost
+            it["operations"].append(operation)
+    
+    def to_state(self) -> Dict[str, Any]:
+        """What the rounded stats leave out, for resuming the aggregation later.
+        
+        Counts, token totals and per-iteration operation lists are exact in
+        the saved breakdowns already; only the unrounded costs are kept here.
+        """
+        return {
+            "records": self.records,
+            "cost_usd": self.cost_usd,
+            "operation_costs": {key: entry["total_cost"] for key, entry in self.by_operation.items()},
+            "iteration_costs": {key: entry["total_cost"] for key, entry in self.by_iteration.items()},
+        }
+    
+    @classmethod
+    def from_summary(cls, summary: Dict[str, Any], state: Dict[str, Any]) -> "TokenAggregator":
+        """Rebuild an aggregator from a saved summary and the `to_state()` saved with it."""
+        aggregator = cls()
+        aggregator.records = int(state["records"])
+        aggregator.input_tokens = int(summary["total_input_tokens"])
+        aggregator.output_tokens = int(summary["total_output_tokens"])
+        aggregator.cost_usd = float(state["cost_usd"])
+        for target, breakdown, costs in (
+            (aggregator.by_operation, summary["breakdown_by_operation"], state["operation_costs"]),
+            (aggregator.by_iteration, summary["breakdown_by_iteration"], state["iteration_costs"]),
+        ):
+            if breakdown.keys() != costs.keys():
+                raise ValueError("checkpoint does not match the saved breakdown")
+            for key, entry in breakdown.items():
+                target[key] = {**entry, "total_cost": float(costs[key])}
+        return aggregator
+    
+    def extend(self, records: Iterable[Dict[str, Any]]) -> "TokenAggregator":
+        for record in records:
+            self.add(record)
+        return self
+    
+    def fold_rows(self, rows: Iterable[tuple], strings: Sequence[str]) -> "TokenAggregator":
+        """Fold in raw binary log rows (see `token_log.RECORD`), with names looked up in `strings`.
+        
+        Same result as `add` on the decoded records, without building a dict
+        per record: rows are grouped by string id and named at the end.
+        """
+        by_operation: Dict[int, list] = {}
+        by_iteration: Dict[int, list] = {}
+        records = input_tokens = output_tokens = 0
+        cost_usd = self.cost_usd
+        for _, inp, out, total, cost, iteration, operation, _ in rows:
+            if cost != cost:  # NaN: no actual cost logged
+                cost = estimate_cost(inp, out)
+            records += 1
+            input_tokens += inp
+            output_tokens += out
+            cost_usd += cost
+            op = by_operation.get(operation)
+            if op is None:
+                op = by_operation[operation] = [0, 0, 0.0]
+            op[0] += 1
+            op[1] += total
+            op[2] += cost
+            if iteration != NO_ITERATION:
+                it = by_iteration.get(iteration)
+                if it is None:
+                    it = by_iteration[iteration] = [0, 0.0, []]
+                it[0] += total
+                it[1] += cost
+                it[2].append(operation)
+        
+        self.records += records
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost_usd = cost_usd
+        for operation, (count, total, cost) in by_operation.items():
+            entry = self.by_operation.setdefault(
+                strings[operation], {"count": 0, "total_tokens": 0, "total_cost": 0.0}
+            )
+            entry["count"] += count
+            entry["total_tokens"] += total
+            entry["total_cost"] += cost
+        for iteration, (total, cost, operations) in by_iteration.items():
+            entry = self.by_iteration.setdefault(
+                str(iteration), {"total_tokens": 0, "total_cost": 0.0, "operations": []}
+            )
+            entry["total_tokens"] += total
+            entry["total_cost"] += cost
+            entry["operations"].extend(strings[operation] for operation in operations)
+        return self
+    
+    @property
+    def iterations(self) -> int:
+        """Distinct iterations seen; a run with records counts as at least one."""
+        if not self.records:
+            return 0
+        return len(self.by_iteration) or 1
+    
+    def stats(self, run_id: str, phase: str, operations: Optional[List[TokenUsage]] = None) -> RunTokenStats:
+        return RunTokenStats(
+            run_id=run_id,
+            phase=phase,
+            total_input_tokens=self.input_tokens,
+            total_output_tokens=self.output_tokens,
+            total_tokens=self.input_tokens + self.output_tokens,
+            total_cost_usd=self.cost_usd,
+            iterations=self.iterations,
+            operations=operations or [],
+            breakdown_by_operation=_rounded_costs(self.by_operation),
+            breakdown_by_iteration=_rounded_costs(self.by_iteration),
+        )
+
+
+def _rounded_costs(breakdown: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {
+        key: {**entry, "total_cost": round(entry["total_cost"], 4)}
+        for key, entry in breakdown.items()
+    }
+
+
+# Writers with unflushed records, flushed at interpreter exit.
+_OPEN_WRITERS: Set["BufferedTokenWriter"] = set()
+
+
+@atexit.register
+def _close_open_writers() -> None:
+    for writer in list(_OPEN_WRITERS):
+        try:
+            writer.close()
+        except OSError:
+            pass
+
+
+class BufferedTokenWriter:
+    """Batches appends to a token log behind one open O_APPEND descriptor.
+    
+    A batch is flushed once `max_batch_bytes` are pending, `max_batch_seconds`
+    after its first record, on `flush()` or `close()`, and at interpreter
+    exit. Each flush is a single write under an `fcntl` lock, so concurrent
+    writers, whether threads or processes, only ever interleave whole records.
+    `on_flush(bytes_written, dir_mtime_before_ns)` runs after every flush.
+    """
+    
+    def __init__(
+        self,
+        path: Path,
+        *,
+        header: bytes = b"",
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        max_batch_seconds: Optional[float] = DEFAULT_MAX_BATCH_SECONDS,
+        on_flush: Optional[Callable[[int, int], None]] = None,
+    ):
+        self.path = Path(path)
+        self.header = header
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_seconds = max_batch_seconds
+        self.on_flush = on_flush
+        self._fd: Optional[int] = None
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self._lock = threading.RLock()
+    
+    def write(self, data: bytes) -> None:
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"Token writer for {self.path} is closed")
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+            _OPEN_WRITERS.add(self)
+            if self._pending_bytes >= self.max_batch_bytes:
+                self._flush_locked()
+            elif self._timer is None and self.max_batch_seconds is not None:
+                self._timer = threading.Timer(self.max_batch_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def flush(self) -> int:
+        """Write out the pending batch and return the bytes written."""
+        with self._lock:
+            return self._flush_locked()
+    
+    def _flush_locked(self) -> int:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return 0
+        data = b"".join(self._pending)
+        if self._fd is None:
+            self._fd = open_append(self.path)
+        try:
+            mtime_before_ns = run_dir_mtime_ns(self.path.parent) if self.on_flush is not None else 0
+        except OSError:
+            mtime_before_ns = 0
+        written = locked_append_fd(self._fd, data, header=self.header)
+        self._pending = []
+        self._pending_bytes = 0
+        _OPEN_WRITERS.discard(self)
+        if self.on_flush is not None:
+            self.on_flush(written, mtime_before_ns)
+        return written
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._flush_locked()
+            finally:
+                self._closed = True
+                _OPEN_WRITERS.discard(self)
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+    
+    def __enter__(self) -> "BufferedTokenWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
 class TokenTracker:
-    """Tracks token usage for Studio runs."""
+    """Tracks token usage for Studio runs.
     
-    def __init__(self, run_dir: Path):
+    With `buffered=True`, `log_usage` queues records in a `BufferedTokenWriter`
+    instead of appending each one; use the tracker as a context manager (or
+    call `close()`) to flush them. Reads through the tracker flush first.
+    """
+    
+    def __init__(
+        self,
+        run_dir: Path,
+        *,
+        buffered: bool = False,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        max_batch_seconds: Optional[float] = DEFAULT_MAX_BATCH_SECONDS,
+    ):
         """Initialize tracker for a run directory."""
         self.run_dir = Path(run_dir)
         self.tokens_file = self.run_dir / "tokens.jsonl"
         self.summary_file = self.run_dir / "token_summary.json"
+        self.binary_log = BinaryTokenLog(self.run_dir / BINARY_LOG_FILENAME)
+        self.buffered = buffered
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_seconds = max_batch_seconds
+        self._writer: Optional[BufferedTokenWriter] = None
+        self._ledger_writer: Optional[BufferedTokenWriter] = None
+        self._ledger_root: Optional[Path] = None
+    
+    def __enter__(self) -> "TokenTracker":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def flush(self) -> None:
+        """Write out any records a buffered tracker is holding, their size-ledger totals and token rollups."""
+        for writer in (self._writer, self._ledger_writer):
+            if writer is not None:
+                writer.flush()
+        self._commit_totals()
+    
+    def close(self) -> None:
+        for writer in (self._writer, self._ledger_writer):
+            if writer is not None:
+                writer.close()
+        self._writer = self._ledger_writer = None
+        self._commit_totals()
+    
+    def _commit_totals(self) -> None:
+        flush_run_writes(self.run_dir)
+        if self._ledger_root is not None:
+            fold_ledgers(self._ledger_root)
+    
+    @property
+    def uses_binary_log(self) -> bool:
+        """Whether the run logs to `tokens.bin` (see `convert_to_binary`) instead of `tokens.jsonl`."""
+        return self.binary_log.exists()
     
     def log_usage(
         self,
@@ -102,58 +447,196 @@ class TokenTracker:
             cost_usd=cost_usd
         )
         
-        # Append to JSONL file
-        with open(self.tokens_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(asdict(usage)) + '\n')
-    
-    def load_usage(self) -> List[TokenUsage]:
-        """Load all token usage records."""
-        if not self.tokens_file.exists():
-            return []
+        # TokenUsage fields are all flat values, so this matches asdict() without its deep copy
+        record = dict(vars(usage))
+        binary = self.uses_binary_log
+        # Buffered writes note their size at flush time; only a new string-table entry is noted here.
+        mtime_before_ns = self._run_dir_mtime_ns() if binary or not self.buffered else 0
+        if binary:
+            path, header = self.binary_log.path, FILE_HEADER
+            data, written = self.binary_log.encode(record)
+        else:
+            path, header = self.tokens_file, b""
+            data, written = (json.dumps(record) + '\n').encode('utf-8'), 0
         
-        usages = []
-        with open(self.tokens_file, 'r', encoding='utf-8') as f:
+        output_root = ledger_root(self.run_dir)
+        ledger = ledger_line(self.run_dir, record, usage.cost_estimate) if output_root else None
+        
+        if self.buffered:
+            if written:
+                note_run_write(self.run_dir, written, mtime_before_ns)
+            self._writer_for(path, header).write(data)
+            if ledger is not None:
+                self._ledger_writer_for(output_root).write(ledger.encode('utf-8'))
+                note_ledger_append(output_root)
+                self._ledger_root = output_root
+            return
+        
+        # One locked O_APPEND write, so concurrent loggers never split a record
+        fd = open_append(path)
+        try:
+            written += locked_append_fd(fd, data, header=header)
+        finally:
+            os.close(fd)
+        note_run_write(self.run_dir, written, mtime_before_ns)
+        if ledger is not None:
+            append_to_ledger(output_root, ledger)
+            self._ledger_root = output_root
+    
+    def _ledger_writer_for(self, output_root: Path) -> BufferedTokenWriter:
+        if self._ledger_writer is None:
+            self._ledger_writer = BufferedTokenWriter(
+                ledger_path(output_root),
+                max_batch_bytes=self.max_batch_bytes,
+                max_batch_seconds=self.max_batch_seconds,
+            )
+        return self._ledger_writer
+    
+    def _writer_for(self, path: Path, header: bytes) -> BufferedTokenWriter:
+        if self._writer is not None and self._writer.path != path:
+            # The log moved to the binary format
+            self._writer.close()
+            self._writer = None
+        if self._writer is None:
+            self._writer = BufferedTokenWriter(
+                path,
+                header=header,
+                max_batch_bytes=self.max_batch_bytes,
+                max_batch_seconds=self.max_batch_seconds,
+                on_flush=lambda written, mtime_before_ns: note_run_write(
+                    self.run_dir, written, mtime_before_ns
+                ),
+            )
+        return self._writer
+    
+    def _run_dir_mtime_ns(self) -> int:
+        """Run directory mtime, used to keep the catalog's size ledger in step with our writes."""
+        try:
+            return run_dir_mtime_ns(self.run_dir)
+        except OSError:
+            return 0
+    
+    def _file_size(self, path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+    
+    def iter_records(self) -> Iterable[Dict[str, Any]]:
+        """Stream the raw records from `tokens.jsonl` (or `tokens.bin`), one at a time."""
+        self.flush()
+        if self.uses_binary_log:
+            yield from self.binary_log.iter_records()
+            return
+        try:
+            f = open(self.tokens_file, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
             for line in f:
                 if line.strip():
-                    data = json.loads(line)
-                    usages.append(TokenUsage(**data))
-        return usages
+                    yield json.loads(line)
+    
+    def load_usage(self) -> List[TokenUsage]:
+        """Load all token usage records."""
+        return [TokenUsage(**data) for data in self.iter_records()]
     
-    def calculate_stats(self, run_id: str, phase: str) -> RunTokenStats:
-        """Calculate aggregated statistics."""
-        usages = self.load_usage()
+    def calculate_stats(self, run_id: str, phase: str, *, include_operations: bool = False) -> RunTokenStats:
+        """Calculate aggregated statistics in a single streaming pass over the log.
         
-        if not usages:
-            return RunTokenStats(
-                run_id=run_id,
-                phase=phase,
-                total_input_tokens=0,
-                total_output_tokens=0,
-                total_tokens=0,
-                total_cost_usd=0.0,
-                iterations=0,
-                operations=[]
-            )
+        If `token_summary.json` holds a checkpoint that still matches the log,
+        only the lines appended since it are read. A binary log is aggregated
+        straight from its memory map instead. The individual records are only
+        kept (as `stats.operations`) when `include_operations` is set, which
+        always reads the whole log.
+        """
+        self.flush()
+        aggregator = TokenAggregator()
+        if not include_operations and self.uses_binary_log:
+            aggregator.fold_rows(self.binary_log.rows(), self.binary_log.string_table())
+            return aggregator.stats(run_id, phase)
+        if not include_operations:
+            try:
+                f = open(self.tokens_file, 'rb')
+            except FileNotFoundError:
+                return aggregator.stats(run_id, phase)
+            with f:
+                resumed = self._resume_checkpoint(f)
+                if resumed is not None:
+                    aggregator, offset = resumed
+                else:
+                    offset = 0
+                f.seek(offset)
+                checkpoint = self._fold_lines(f, aggregator, offset)
+            stats = aggregator.stats(run_id, phase)
+            stats.checkpoint = checkpoint
+            return stats
         
-        total_input = sum(u.input_tokens for u in usages)
-        total_output = sum(u.output_tokens for u in usages)
-        total_cost = sum(u.cost_estimate for u in usages)
+        usages = []
+        for data in self.iter_records():
+            usages.append(TokenUsage(**data))
+            aggregator.add(data)
+        return aggregator.stats(run_id, phase, usages)
+    
+    def _resume_checkpoint(self, f) -> Optional[tuple]:
+        """The saved aggregator and offset, or None if the log no longer matches them."""
+        try:
+            summary = json.loads(self.summary_file.read_text(encoding='utf-8'))
+            checkpoint = summary["checkpoint"]
+            offset = int(checkpoint["offset"])
+            tail_start = max(0, offset - CHECKPOINT_TAIL_BYTES)
+            if os.fstat(f.fileno()).st_size < offset:
+                return None  # truncated or replaced
+            f.seek(tail_start)
+            if hashlib.sha256(f.read(offset - tail_start)).hexdigest() != checkpoint["tail_sha256"]:
+                return None
+            return TokenAggregator.from_summary(summary, checkpoint["state"]), offset
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _fold_lines(self, f, aggregator: TokenAggregator, offset: int) -> Dict[str, Any]:
+        """Fold every line from the current position into `aggregator` and return the new checkpoint.
         
-        # Count unique iterations
-        iterations = len(set(u.iteration for u in usages if u.iteration is not None))
-        if iterations == 0:
-            iterations = 1  # At least one iteration
+        A last line without a newline that is not valid JSON yet is still
+        being written, so it is left for the next read.
+        """
+        for line in f:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if line.endswith(b"\n"):
+                        raise
+                    break
+                aggregator.add(record)
+            offset += len(line)
+        tail_start = max(0, offset - CHECKPOINT_TAIL_BYTES)
+        f.seek(tail_start)
+        return {
+            "offset": offset,
+            "tail_sha256": hashlib.sha256(f.read(offset - tail_start)).hexdigest(),
+            "state": aggregator.to_state(),
+        }
+    
+    def convert_to_binary(self, *, keep_jsonl: bool = False) -> int:
+        """Move the run's log from `tokens.jsonl` to `tokens.bin` and return the records converted.
         
-        return RunTokenStats(
-            run_id=run_id,
-            phase=phase,
-            total_input_tokens=total_input,
-            total_output_tokens=total_output,
-            total_tokens=total_input + total_output,
-            total_cost_usd=total_cost,
-            iterations=iterations,
-            operations=usages
+        Later `log_usage` calls append to the binary log. `tokens.jsonl` is
+        removed unless `keep_jsonl` is set; a kept copy is no longer updated.
+        """
+        self.close()
+        mtime_before_ns = self._run_dir_mtime_ns()
+        size_before = self._file_size(self.tokens_file)
+        count = convert_jsonl_log(self.tokens_file, self.binary_log.path)
+        if not keep_jsonl:
+            self.tokens_file.unlink()
+        size_after = (
+            self._file_size(self.tokens_file)
+            + self._file_size(self.binary_log.path)
+            + self._file_size(self.binary_log.strings_path)
         )
+        note_run_write(self.run_dir, size_after - size_before, mtime_before_ns)
+        return count
     
     def save_summary(self, stats: RunTokenStats) -> None:
         """Save summary statistics to JSON."""
@@ -167,56 +650,17 @@ class TokenTracker:
             "iterations": stats.iterations,
             "avg_tokens_per_iteration": round(stats.avg_tokens_per_iteration, 2),
             "cost_per_iteration": round(stats.cost_per_iteration, 4),
-            "breakdown_by_operation": self._breakdown_by_operation(stats.operations),
-            "breakdown_by_iteration": self._breakdown_by_iteration(stats.operations),
+            "breakdown_by_operation": stats.breakdown_by_operation,
+            "breakdown_by_iteration": stats.breakdown_by_iteration,
         }
+        if stats.checkpoint is not None:
+            summary["checkpoint"] = stats.checkpoint
         
+        mtime_before_ns = self._run_dir_mtime_ns()
+        size_before = self._file_size(self.summary_file)
         with open(self.summary_file, 'w', encoding='utf-8') as f:
             json.dump(summary, f, indent=2)
-    
-    def _breakdown_by_operation(self, operations: List[TokenUsage]) -> Dict:
-        """Break down usage by operation type."""
-        breakdown = {}
-        for op in operations:
-            if op.operation not in breakdown:
-                breakdown[op.operation] = {
-                    "count": 0,
-                    "total_tokens": 0,
-                    "total_cost": 0.0
-                }
-            breakdown[op.operation]["count"] += 1
-            breakdown[op.operation]["total_tokens"] += op.total_tokens
-            breakdown[op.operation]["total_cost"] += op.cost_estimate
-        
-        # Round costs
-        for op_type in breakdown:
-            breakdown[op_type]["total_cost"] = round(breakdown[op_type]["total_cost"], 4)
-        
-        return breakdown
-    
-    def _breakdown_by_iteration(self, operations: List[TokenUsage]) -> Dict:
-        """Break down usage by iteration."""
-        breakdown = {}
-        for op in operations:
-            if op.iteration is None:
-                continue
-            
-            iter_key = str(op.iteration)
-            if iter_key not in breakdown:
-                breakdown[iter_key] = {
-                    "total_tokens": 0,
-                    "total_cost": 0.0,
-                    "operations": []
-                }
-            breakdown[iter_key]["total_tokens"] += op.total_tokens
-            breakdown[iter_key]["total_cost"] += op.cost_estimate
-            breakdown[iter_key]["operations"].append(op.operation)
-        
-        # Round costs
-        for iter_key in breakdown:
-            breakdown[iter_key]["total_cost"] = round(breakdown[iter_key]["total_cost"], 4)
-        
-        return breakdown
+        note_run_write(self.run_dir, self._file_size(self.summary_file) - size_before, mtime_before_ns)
     
     def print_summary(self, stats: RunTokenStats) -> None:
         """Print a formatted summary to console."""
@@ -233,7 +677,7 @@ class TokenTracker:
         print(f"  Avg tokens/iteration: {stats.avg_tokens_per_iteration:,.0f}")
         
         # Breakdown by operation
-        breakdown = self._breakdown_by_operation(stats.operations)
+        breakdown = stats.breakdown_by_operation
         if breakdown:
             print(f"\nBreakdown by operation:")
             for op_type, data in sorted(breakdown.items()):